@@ -0,0 +1,69 @@
+"""Benchmark of `nlglib.binary` against pickle and the JSON formats.
+
+"pickle" is pickling the attributes of each element as it was done
+before elements were pickled in the binary format.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_binary
+
+"""
+
+import io
+import pickle
+import timeit
+
+from nlglib import binary, codec
+from nlglib.macroplanning import Document, Paragraph
+from nlglib.microplanning import Clause, Element, ElementList, NP, VP, PP
+
+NUMBER = 20
+
+
+class PlainPickler(pickle.Pickler):
+    """Pickles elements and documents without `nlglib.binary`. """
+
+    def reducer_override(self, obj):
+        if isinstance(obj, (Element, ElementList, Document, Paragraph)):
+            return object.__reduce_ex__(obj, pickle.HIGHEST_PROTOCOL)
+        return NotImplemented
+
+
+def plain_dumps(obj):
+    fp = io.BytesIO()
+    PlainPickler(fp, pickle.HIGHEST_PROTOCOL).dump(obj)
+    return fp.getvalue()
+
+
+def make_clause(i):
+    return Clause(NP('the', 'man'), VP('put', NP('the', 'piano%d' % i), PP('into', NP('the', 'truck'))))
+
+
+def make_paragraph(n=100):
+    return Paragraph(*[make_clause(i) for i in range(n)])
+
+
+def run():
+    formats = [
+        ('pickle', plain_dumps, pickle.loads),
+        ('binary', binary.dumps, binary.loads),
+        ('codec', codec.dumps, codec.loads),
+        ('to_json', Element.to_json, Element.from_json),
+    ]
+    for name, obj in [('clause', make_clause(0)), ('paragraph', make_paragraph())]:
+        print(name)
+        print('{:<10} {:>10} {:>12} {:>12}'.format('format', 'size (B)', 'dump (ms)', 'load (ms)'))
+        for fmt, dumps, loads in formats:
+            try:
+                data = dumps(obj)
+            except TypeError:
+                # `to_json()` is a method of elements
+                continue
+            dump_time = min(timeit.repeat(lambda: dumps(obj), number=NUMBER, repeat=3))
+            load_time = min(timeit.repeat(lambda: loads(data), number=NUMBER, repeat=3))
+            print('{:<10} {:>10} {:>12.3f} {:>12.3f}'.format(
+                fmt, len(data), dump_time / NUMBER * 1e3, load_time / NUMBER * 1e3))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,47 @@
+"""Benchmark of `Element.clone()` against `copy.deepcopy()`.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_clone
+
+"""
+
+import timeit
+
+from copy import deepcopy
+
+from nlglib.microplanning import Clause, Coordination, NounPhrase, NP, VP, PP
+
+NUMBER = 20
+
+
+def make_clause(i):
+    return Clause(NP('the', 'man'), VP('put', NP('the', 'piano%d' % i), PP('into', NP('the', 'truck'))))
+
+
+def make_wide_tree(width=100):
+    return Coordination(*[make_clause(i) for i in range(width)])
+
+
+def make_deep_tree(depth=150):
+    # deepcopy recurses several frames per level so keep it below the recursion limit
+    np = NounPhrase('x')
+    for _ in range(depth):
+        parent = NounPhrase('x')
+        parent.postmodifiers.append(np)
+        np = parent
+    return np
+
+
+def run():
+    print('{:<12} {:>14} {:>14}'.format('tree', 'deepcopy (ms)', 'clone (ms)'))
+    for name, tree in [('clause', make_clause(0)),
+                       ('wide', make_wide_tree()),
+                       ('deep', make_deep_tree())]:
+        dc = min(timeit.repeat(lambda: deepcopy(tree), number=NUMBER, repeat=3))
+        cl = min(timeit.repeat(lambda: tree.clone(), number=NUMBER, repeat=3))
+        print('{:<12} {:>14.3f} {:>14.3f}'.format(name, dc / NUMBER * 1e3, cl / NUMBER * 1e3))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,53 @@
+"""Benchmark of `nlglib.codec` against `Element.to_json()`/`Element.from_json()`.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_codec
+
+"""
+
+import timeit
+
+from nlglib import codec
+from nlglib.microplanning import Clause, Coordination, Element, NounPhrase, NP, VP, PP
+
+NUMBER = 20
+
+
+def make_clause(i):
+    return Clause(NP('the', 'man'), VP('put', NP('the', 'piano%d' % i), PP('into', NP('the', 'truck'))))
+
+
+def make_wide_tree(width=100):
+    return Coordination(*[make_clause(i) for i in range(width)])
+
+
+def make_deep_tree(depth=100):
+    # the old format nests the JSON so keep it below the recursion limit
+    np = NounPhrase('x')
+    for _ in range(depth):
+        parent = NounPhrase('x')
+        parent.postmodifiers.append(np)
+        np = parent
+    return np
+
+
+def run():
+    print('{:<8} {:>10} {:>10} {:>12} {:>12} {:>12} {:>12}'.format(
+        'tree', 'old (B)', 'new (B)', 'old enc (ms)', 'new enc (ms)', 'old dec (ms)', 'new dec (ms)'))
+    for name, tree in [('clause', make_clause(0)),
+                       ('wide', make_wide_tree()),
+                       ('deep', make_deep_tree())]:
+        old = tree.to_json()
+        new = codec.dumps(tree)
+        times = [
+            min(timeit.repeat(f, number=NUMBER, repeat=3)) / NUMBER * 1e3
+            for f in (tree.to_json, lambda: codec.dumps(tree),
+                      lambda: Element.from_json(old), lambda: codec.loads(new))
+        ]
+        print('{:<8} {:>10} {:>10} {:>12.3f} {:>12.3f} {:>12.3f} {:>12.3f}'.format(
+            name, len(old), len(new), *times))
+
+
+if __name__ == '__main__':
+    run()
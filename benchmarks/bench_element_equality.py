@@ -0,0 +1,41 @@
+"""Benchmark of comparing syntax trees and of sentence aggregation.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_element_equality
+
+"""
+
+import timeit
+
+from nlglib.aggregation import SentenceAggregator
+from nlglib.microplanning import Clause, NP, VP, PP
+
+NUMBER = 2000
+
+
+def make_clause(noun, place='truck'):
+    return Clause(NP('the', 'man'), VP('put', NP('the', noun), PP('into', NP('the', place))))
+
+
+def run():
+    a, b = make_clause('piano'), make_clause('piano')
+    c = make_clause('piano', 'van')
+    fa, fb, fc = a.clone().freeze(), b.clone().freeze(), c.clone().freeze()
+    aggregator = SentenceAggregator()
+    clauses = [make_clause(noun) for noun in ('piano', 'drum', 'guitar')]
+    timings = [
+        ('equal clauses (us)', NUMBER, lambda: a == b),
+        ('unequal clauses (us)', NUMBER, lambda: a == c),
+        ('equal frozen (us)', NUMBER, lambda: fa == fb),
+        ('unequal frozen (us)', NUMBER, lambda: fa == fc),
+        ('try_to_aggregate (us)', 20, lambda: aggregator.try_to_aggregate(a, c)),
+        ('synt_aggregation (us)', 20, lambda: aggregator.synt_aggregation(clauses)),
+    ]
+    for name, number, fn in timings:
+        best = min(timeit.repeat(fn, number=number, repeat=5))
+        print('{:<24} {:>10.1f}'.format(name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    run()
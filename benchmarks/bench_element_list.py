@@ -0,0 +1,40 @@
+"""Benchmark of constructing and traversing phrases (and their element lists).
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_element_list
+
+"""
+
+import timeit
+
+from nlglib.microplanning import Clause, Coordination, NounPhrase, NP, VP, PP, walk
+
+NUMBER = 200
+
+
+def make_clause(i):
+    return Clause(NP('the', 'man'), VP('put', NP('the', 'piano%d' % i), PP('into', NP('the', 'truck'))))
+
+
+def make_modified(i):
+    return NounPhrase('piano%d' % i, 'the', premodifiers=['big', 'black'], postmodifiers=['here'])
+
+
+def run():
+    tree = Coordination(*[make_clause(i) for i in range(100)])
+    timings = [
+        ('empty phrases', lambda: [NounPhrase() for _ in range(100)]),
+        ('modified phrases', lambda: [make_modified(i) for i in range(100)]),
+        ('clauses', lambda: [make_clause(i) for i in range(100)]),
+        ('walk', lambda: sum(1 for _ in walk(tree))),
+        ('iterate lists', lambda: sum(len(c.predicate.complements) for c in tree.coords)),
+    ]
+    print('{:<18} {:>12}'.format('operation (x100)', 'time (ms)'))
+    for name, fn in timings:
+        best = min(timeit.repeat(fn, number=NUMBER, repeat=5))
+        print('{:<18} {:>12.3f}'.format(name, best / NUMBER * 1e3))
+
+
+if __name__ == '__main__':
+    run()
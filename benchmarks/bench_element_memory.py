@@ -0,0 +1,51 @@
+"""Memory used by a single node of each `Element` class.
+
+The numbers include everything a node allocates when it is created
+(its feature set, the element lists of phrases, empty placeholders, ...).
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_element_memory
+
+"""
+
+import tracemalloc
+
+from nlglib.microplanning import (
+    Element, String, Word, Var, Coordination, Phrase, NounPhrase, VerbPhrase, Clause
+)
+
+NUMBER = 10000
+
+FACTORIES = [
+    ('Element', lambda: Element()),
+    ('String', lambda: String('dog')),
+    ('Word', lambda: Word('dog', 'NOUN')),
+    ('Var', lambda: Var('x', 'dog')),
+    ('Coordination', lambda: Coordination()),
+    ('Phrase', lambda: Phrase()),
+    ('NounPhrase', lambda: NounPhrase()),
+    ('VerbPhrase', lambda: VerbPhrase()),
+    ('Clause', lambda: Clause()),
+]
+
+
+def bytes_per_node(factory):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory() for _ in range(NUMBER)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nodes
+    # do not count the list holding the nodes
+    return (after - before) / NUMBER - 8
+
+
+def run():
+    print('{:<14} {:>10}'.format('class', 'bytes/node'))
+    for name, factory in FACTORIES:
+        print('{:<14} {:>10.0f}'.format(name, bytes_per_node(factory)))
+
+
+if __name__ == '__main__':
+    run()
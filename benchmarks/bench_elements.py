@@ -0,0 +1,35 @@
+"""Benchmark of iterating through the constituents of syntax trees.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_elements
+
+"""
+
+import timeit
+
+from nlglib.microplanning import Clause, Coordination, NP, VP, PP, Var
+
+NUMBER = 2000
+
+
+def make_clause():
+    return Clause(NP('the', Var('who')), VP('put', NP('the', Var('what')), PP('into', NP('the', 'truck'))))
+
+
+def run():
+    clause = make_clause()
+    wide = Coordination(*[make_clause() for _ in range(20)])
+    timings = [
+        ('clause.elements() (us)', lambda: list(clause.elements())),
+        ('clause recursive (us)', lambda: list(clause.elements(recursive=True))),
+        ('clause.arguments() (us)', lambda: clause.arguments()),
+        ('wide.arguments() (us)', lambda: wide.arguments()),
+    ]
+    for name, fn in timings:
+        best = min(timeit.repeat(fn, number=NUMBER, repeat=5))
+        print('{:<26} {:>10.1f}'.format(name, best / NUMBER * 1e6))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,95 @@
+"""Memory and comparison time of interned features.
+
+The benchmark builds the feature sets of a synthetic document with
+100k clauses (each clause has a subject, a predicate, an object
+and their heads) and compares interned `Feature` instances with
+the previous implementation that allocated a new instance every time.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_feature_interning
+
+"""
+
+import timeit
+import tracemalloc
+
+from nlglib.features import Feature, FeatureGroup, FeatureSet
+
+CLAUSES = 100000
+
+# features of the nodes of a clause: Clause, NP, head, VP, head, NP, head
+CLAUSE_FEATURES = [
+    {'TENSE': 'past', 'ASPECT': 'progressive'},
+    {'DISCOURSE_FUNCTION': 'subject', 'NUMBER': 'singular'},
+    {'DISCOURSE_FUNCTION': 'head', 'GENDER': 'masculine', 'NOUN_TYPE': 'proper'},
+    {'DISCOURSE_FUNCTION': 'predicate', 'NUMBER': 'singular', 'TENSE': 'past'},
+    {'DISCOURSE_FUNCTION': 'head'},
+    {'DISCOURSE_FUNCTION': 'object', 'NUMBER': 'plural'},
+    {'DISCOURSE_FUNCTION': 'head', 'NUMBER': 'plural'},
+]
+
+
+class LegacyFeature(object):
+    """The feature implementation before interning (for comparison)."""
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def __eq__(self, other):
+        if isinstance(other, LegacyFeature):
+            return self.name.lower() == other.name.lower() and self.value == other.value
+        elif isinstance(other, FeatureGroup):
+            return self.name.lower() == other.name.lower()
+        else:
+            return False
+
+    def __hash__(self):
+        return hash(self.name)
+
+
+def build_document(feature_cls, clauses=CLAUSES):
+    document = []
+    for _ in range(clauses):
+        for features in CLAUSE_FEATURES:
+            fs = FeatureSet()
+            for k, v in features.items():
+                fs.replace(feature_cls(k, v))
+            document.append(fs)
+    return document
+
+
+def measure_memory(feature_cls):
+    tracemalloc.start()
+    document = build_document(feature_cls)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return document, size
+
+
+def run():
+    legacy, legacy_size = measure_memory(LegacyFeature)
+    del legacy
+    interned, interned_size = measure_memory(Feature)
+    print('document memory: legacy {:.1f} MB, interned {:.1f} MB ({:.0%} saved)'.format(
+        legacy_size / 2 ** 20, interned_size / 2 ** 20, 1 - interned_size / legacy_size))
+
+    number = 1000000
+    a, b = LegacyFeature('NUMBER', 'plural'), LegacyFeature('NUMBER', 'plural')
+    legacy_eq = timeit.timeit(lambda: a == b, number=number)
+    c, d = Feature('NUMBER', 'plural'), Feature('NUMBER', 'plural')
+    interned_eq = timeit.timeit(lambda: c == d, number=number)
+    print('feature ==: legacy {:.0f} ns, interned {:.0f} ns'.format(
+        legacy_eq / number * 1e9, interned_eq / number * 1e9))
+
+    fs1, fs2 = build_document(Feature, 1)[2], build_document(Feature, 1)[2]
+    legacy1, legacy2 = build_document(LegacyFeature, 1)[2], build_document(LegacyFeature, 1)[2]
+    legacy_set_eq = timeit.timeit(lambda: legacy1 == legacy2, number=number // 10)
+    interned_set_eq = timeit.timeit(lambda: fs1 == fs2, number=number // 10)
+    print('FeatureSet ==: legacy {:.0f} ns, interned {:.0f} ns'.format(
+        legacy_set_eq / number * 1e10, interned_set_eq / number * 1e10))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,39 @@
+"""Microbenchmark of `FeatureSet` lookups and replacements.
+
+The cost of a lookup, a replacement and a membership test should stay
+flat as the number of features in the set grows.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_feature_set
+
+"""
+
+import timeit
+
+from nlglib.features import Feature, FeatureGroup, FeatureSet
+
+SIZES = (1, 10, 100, 1000)
+NUMBER = 100000
+
+
+def make_feature_set(size):
+    groups = [FeatureGroup('GROUP_%d' % i, 'a', 'b') for i in range(size)]
+    fs = FeatureSet(g.a for g in groups)
+    return fs, groups[-1]
+
+
+def run():
+    print('{:>8} {:>12} {:>12} {:>12}'.format('features', 'get (ns)', 'replace (ns)', 'in (ns)'))
+    for size in SIZES:
+        fs, group = make_feature_set(size)
+        feature = Feature(group.name, 'b')
+        get = timeit.timeit(lambda: fs[group], number=NUMBER)
+        replace = timeit.timeit(lambda: fs.replace(feature), number=NUMBER)
+        contains = timeit.timeit(lambda: feature in fs, number=NUMBER)
+        print('{:>8} {:>12.0f} {:>12.0f} {:>12.0f}'.format(
+            size, get / NUMBER * 1e9, replace / NUMBER * 1e9, contains / NUMBER * 1e9))
+
+
+if __name__ == '__main__':
+    run()
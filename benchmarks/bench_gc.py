@@ -0,0 +1,72 @@
+"""Garbage collector pauses when building and dropping many documents
+in each parent mode (see `set_parent_mode()`).
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_gc
+
+"""
+
+import gc
+import time
+
+from nlglib.macroplanning import Document
+from nlglib.microplanning import Clause, NP, VP, PP, set_parent_mode
+
+BATCHES = 20
+DOCUMENTS = 50
+
+
+def make_clause(i):
+    return Clause(NP('the', 'man'), VP('put', NP('the', 'piano%d' % i), PP('into', NP('the', 'truck'))))
+
+
+def make_document(i):
+    return Document('Report %d' % i, *[make_clause(j) for j in range(10)])
+
+
+def run_batches():
+    """Return the total time and the pauses of full collections in milliseconds. """
+    pauses = []
+    started = []
+
+    def callback(phase, info):
+        if info['generation'] != 2:
+            return
+        if phase == 'start':
+            started.append(time.perf_counter())
+        else:
+            pauses.append((time.perf_counter() - started.pop()) * 1e3)
+
+    gc.collect()
+    gc.callbacks.append(callback)
+    start = time.perf_counter()
+    try:
+        # keep some documents alive across the batches, like a report cache
+        kept = []
+        for batch in range(BATCHES):
+            documents = [make_document(i) for i in range(DOCUMENTS)]
+            kept.extend(documents[:5])
+            del documents
+        del kept
+        gc.collect()
+    finally:
+        gc.callbacks.remove(callback)
+    return (time.perf_counter() - start) * 1e3, pauses
+
+
+def run():
+    print('{:<8} {:>10} {:>12} {:>14} {:>14}'.format(
+        'mode', 'time (ms)', 'full GCs', 'max GC (ms)', 'total GC (ms)'))
+    for mode in ('strong', 'weak', 'none'):
+        previous = set_parent_mode(mode)
+        try:
+            total, pauses = run_batches()
+        finally:
+            set_parent_mode(previous)
+        print('{:<8} {:>10.1f} {:>12} {:>14.2f} {:>14.2f}'.format(
+            mode, total, len(pauses), max(pauses, default=0), sum(pauses)))
+
+
+if __name__ == '__main__':
+    run()
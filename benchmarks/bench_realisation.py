@@ -0,0 +1,52 @@
+"""Benchmark of the simple `RealisationVisitor` and of feature group access.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_realisation
+
+"""
+
+import timeit
+
+from nlglib.features import MODAL, NEGATED, NUMBER, TENSE
+from nlglib.microplanning import Clause, NP, VP, Adjective
+from nlglib.realisation.basic import RealisationVisitor
+
+NUMBER_OF_RUNS = 20000
+
+
+def make_clause():
+    subject = NP('the', 'dog', features={'NUMBER': 'plural'})
+    subject.premodifiers.append(Adjective('big'))
+    return Clause(
+        subject,
+        VP('be', NP('a', 'problem'), features={'TENSE': 'past'}),
+        features={'NEGATED': 'true'},
+    )
+
+
+def realise(clause):
+    v = RealisationVisitor()
+    clause.accept(v)
+    return str(v)
+
+
+def run():
+    clause = make_clause()
+    vp = clause.predicate
+    print(realise(clause))
+    timings = [
+        ('RealisationVisitor (us)', 1e6, lambda: realise(clause)),
+        ('NUMBER.plural (ns)', 1e9, lambda: NUMBER.plural),
+        ('TENSE.PAST (ns)', 1e9, lambda: TENSE.PAST),
+        ("'must' in MODAL (ns)", 1e9, lambda: 'must' in MODAL),
+        ('NEGATED.true in vp (ns)', 1e9, lambda: NEGATED.true in vp),
+        ("'MODAL' in vp (ns)", 1e9, lambda: 'MODAL' in vp),
+    ]
+    for name, scale, fn in timings:
+        best = min(timeit.repeat(fn, number=NUMBER_OF_RUNS, repeat=5))
+        print('{:<28} {:>10.2f}'.format(name, best / NUMBER_OF_RUNS * scale))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,59 @@
+"""Rewriting a large syntax tree with several rules in separate passes
+(one `Rewriter` per rule) and in a single pass (one `Rewriter` with all rules).
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_rewrite
+
+"""
+
+import timeit
+
+from nlglib.features import NUMBER, category
+from nlglib.microplanning import Clause, Coordination, NP, VP, PP, Word, String
+from nlglib.microplanning import NounPhrase, Rewriter, REMOVE
+
+NUMBER_OF_RUNS = 5
+
+RULES = [
+    # lexical choice
+    ((category.WORD, lambda x: x.word == 'man'), lambda x: Word('woman', x.pos)),
+    # agreement
+    (NounPhrase, lambda x: x.features.replace(NUMBER.plural)),
+    # drop canned adverbs
+    (String, lambda x: REMOVE),
+]
+
+
+def make_clause(i):
+    return Clause(NP('the', 'man'),
+                  VP('put', NP('the', 'piano%d' % i), PP('into', NP('the', 'truck')), 'quickly'))
+
+
+def make_tree(n=2000):
+    return Coordination(*[make_clause(i) for i in range(n)])
+
+
+def run():
+    tree = make_tree()
+    separate = [Rewriter([rule]) for rule in RULES]
+    single = Rewriter(RULES)
+
+    def passes():
+        t = tree.clone()
+        for rewriter in separate:
+            rewriter(t)
+
+    cases = [
+        ('clone', lambda: tree.clone()),
+        ('3 passes', passes),
+        ('1 pass', lambda: single(tree.clone())),
+    ]
+    print('{:<10} {:>10}'.format('rewrite', 'time (ms)'))
+    for name, fn in cases:
+        t = min(timeit.repeat(fn, number=NUMBER_OF_RUNS, repeat=3))
+        print('{:<10} {:>10.1f}'.format(name, t / NUMBER_OF_RUNS * 1e3))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,59 @@
+"""Memory of documents before and after sharing equal subtrees
+with `SubtreeTable`.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_sharing
+
+"""
+
+import time
+import tracemalloc
+
+from nlglib.macroplanning import Document
+from nlglib.microplanning import Clause, NP, VP, PP, SubtreeTable
+
+DOCUMENTS = 100
+PRODUCTS = ['Acme Widget', 'Acme Gadget', 'Acme Gizmo', 'Acme Doohickey']
+
+
+def make_clause(i):
+    return Clause(NP('the', 'customer', features={'NUMBER': 'plural'}),
+                  VP('buy', NP(PRODUCTS[i % len(PRODUCTS)]),
+                     PP('in', NP('the', 'store')), features={'TENSE': 'past'}))
+
+
+def make_document(i):
+    return Document('Report %d' % (i % 10), *[make_clause(j) for j in range(i, i + 20)])
+
+
+def measure(intern):
+    """Return the memory of the documents in kB and the time to build them in ms. """
+    tracemalloc.start()
+    start = time.perf_counter()
+    table = SubtreeTable() if intern else None
+    documents = []
+    for i in range(DOCUMENTS):
+        document = make_document(i)
+        if intern:
+            table.intern(document)
+        documents.append(document)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if intern:
+        print('interned {} subtrees into {} shared ones'.format(table.seen, len(table)))
+    return current / 1024, elapsed * 1e3
+
+
+def run():
+    before, before_time = measure(False)
+    after, after_time = measure(True)
+    print('{:<10} {:>12} {:>10}'.format('', 'memory (kB)', 'time (ms)'))
+    print('{:<10} {:>12.1f} {:>10.1f}'.format('plain', before, before_time))
+    print('{:<10} {:>12.1f} {:>10.1f}'.format('shared', after, after_time))
+    print('saved {:.1%} of memory'.format(1 - after / before))
+
+
+if __name__ == '__main__':
+    run()
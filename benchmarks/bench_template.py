@@ -0,0 +1,56 @@
+"""Benchmark of instantiating a template by `clone()` and `replace()`
+against `replaced()` of a frozen template and of `replace_arguments()`.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_template
+
+"""
+
+import timeit
+
+from nlglib.microplanning import Clause, Coordination, NP, VP, PP, Var
+
+NUMBER = 200
+
+
+def make_template(width=50):
+    # a wide template with the variable in the first clause
+    clauses = [Clause(NP('the', 'man'), VP('put', NP('the', 'piano'), PP('into', NP('the', 'truck'))))
+               for _ in range(width)]
+    clauses[0].subject = Var('who')
+    return Coordination(*clauses)
+
+
+def instantiate(template):
+    rv = template.clone()
+    rv.replace(Var('who'), NP('the', 'woman'))
+    return rv
+
+
+def make_slotted_template(width=50, slots=10):
+    # a wide template with a variable in each of the first `slots` clauses
+    template = make_template(width)
+    for i in range(slots):
+        template.coords[i].predicate.complements[0].head = Var('what%d' % i)
+    return template
+
+
+def run():
+    slotted = make_slotted_template()
+    values = {'what%d' % i: NP('the', 'drum') for i in range(10)}
+    template = make_template()
+    frozen = make_template().freeze()
+    assert instantiate(template) == frozen.replaced(Var('who'), NP('the', 'woman'))
+    timings = [
+        ('clone + replace (us)', lambda: instantiate(template)),
+        ('frozen replaced (us)', lambda: frozen.replaced(Var('who'), NP('the', 'woman'))),
+        ('replace_arguments (us)', lambda: slotted.clone().replace_arguments(**values)),
+    ]
+    for name, fn in timings:
+        best = min(timeit.repeat(fn, number=NUMBER, repeat=5))
+        print('{:<24} {:>10.1f}'.format(name, best / NUMBER * 1e6))
+
+
+if __name__ == '__main__':
+    run()
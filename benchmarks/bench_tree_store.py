@@ -0,0 +1,50 @@
+"""Memory used by a corpus of clauses as `Element` objects and in a `TreeStore`
+and the time to realise them.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_tree_store
+
+"""
+
+import timeit
+import tracemalloc
+
+from nlglib.microplanning import Clause, NP, VP, PP, TreeStore
+from nlglib.realisation.basic import Realiser
+
+NUMBER = 2000
+
+
+def make_clause(i):
+    return Clause(NP('the', 'man'), VP('put', NP('the', 'piano%d' % (i % 50)), PP('into', NP('the', 'truck'))))
+
+
+def allocated(factory):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rv = factory()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return rv, after - before
+
+
+def run():
+    clauses, element_bytes = allocated(lambda: [make_clause(i) for i in range(NUMBER)])
+    store, store_bytes = allocated(lambda: TreeStore(clauses))
+    print('{:<24} {:>10}'.format('', 'bytes/clause'))
+    print('{:<24} {:>10.0f}'.format('elements', element_bytes / NUMBER))
+    print('{:<24} {:>10.0f}'.format('tree store', store_bytes / NUMBER))
+    realiser = Realiser()
+    timings = [
+        ('realise elements (us)', lambda: [realiser(c) for c in clauses[:100]]),
+        ('realise views (us)', lambda: [realiser(v) for v in list(store)[:100]]),
+        ('to elements (us)', lambda: [store.element(r) for r in store.roots[:100]]),
+    ]
+    for name, fn in timings:
+        best = min(timeit.repeat(fn, number=5, repeat=3))
+        print('{:<24} {:>10.1f}'.format(name, best / 500 * 1e6))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,65 @@
+"""Full-tree visits of a large syntax tree by the visitors.
+
+"count" is a visitor that only counts the nodes, i.e., it measures
+the cost of `Element.accept()` itself.
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_visitors
+
+"""
+
+import timeit
+
+from nlglib.microplanning import Clause, Coordination, NP, VP, PP
+from nlglib.microplanning import XmlVisitor, ReprVisitor, StrVisitor, SimpleStrVisitor, Visitor
+from nlglib.realisation.basic import RealisationVisitor
+
+NUMBER = 20
+
+
+class CountVisitor(Visitor):
+
+    def __init__(self):
+        self.count = 0
+
+    def _leaf(self, node):
+        self.count += 1
+
+    element = string = word = var = _leaf
+
+    def _phrase(self, node):
+        self.count += 1
+        for x in node.elements():
+            x.accept(self)
+
+    clause = noun_phrase = verb_phrase = preposition_phrase = _phrase
+    adjective_phrase = adverb_phrase = coordination = _phrase
+
+
+def make_clause(i):
+    return Clause(NP('the', 'man'), VP('put', NP('the', 'piano%d' % i), PP('into', NP('the', 'truck'))))
+
+
+def make_tree(n=200):
+    return Coordination(*[make_clause(i) for i in range(n)])
+
+
+def run():
+    tree = make_tree()
+    visitors = [
+        ('count', CountVisitor),
+        ('xml', XmlVisitor),
+        ('repr', ReprVisitor),
+        ('str', StrVisitor),
+        ('simple str', SimpleStrVisitor),
+        ('realisation', RealisationVisitor),
+    ]
+    print('{:<12} {:>10}'.format('visitor', 'time (ms)'))
+    for name, cls in visitors:
+        t = min(timeit.repeat(lambda: tree.accept(cls()), number=NUMBER, repeat=10))
+        print('{:<12} {:>10.3f}'.format(name, t / NUMBER * 1e3))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,75 @@
+"""XML serialisation of a large syntax tree by `XmlVisitor` and of
+a report (one request per sentence, as the SimpleNLG realiser does).
+
+Run from the root of the repository::
+
+    python -m benchmarks.bench_xml
+
+"""
+
+import io
+import timeit
+
+from nlglib.microplanning import Clause, Coordination, NP, NNP, VP, PP, XmlVisitor
+
+NUMBER = 5
+PRODUCTS = ['Acme Widget', 'Acme Gadget', 'Acme Gizmo', 'Acme Doohickey']
+
+
+def make_clause(i):
+    return Clause(NP('the', 'man'), VP('put', NP('the', 'piano%d' % i), PP('into', NP('the', 'truck'))))
+
+
+def make_tree(n=2000):
+    return Coordination(*[make_clause(i) for i in range(n)])
+
+
+def make_report(n=500):
+    """Return sentences about a few products like the ones of a generated report. """
+    return [Clause(NP('the', 'customer', features={'NUMBER': 'plural'}),
+                   VP('buy', NNP(PRODUCTS[i % len(PRODUCTS)]),
+                      PP('in', NP('the', 'store')), features={'TENSE': 'past'}))
+            for i in range(n)]
+
+
+def write_report(sentences):
+    for s in sentences:
+        XmlVisitor(sink=io.StringIO(), compact=True).write_request(s)
+
+
+def to_xml(tree, **kwargs):
+    v = XmlVisitor(**kwargs)
+    tree.accept(v)
+    return v.to_xml()
+
+
+def to_sink(tree, **kwargs):
+    sink = io.StringIO()
+    XmlVisitor(sink=sink, **kwargs).write_request(tree)
+    return sink.getvalue()
+
+
+def run():
+    tree = make_tree()
+    cases = [
+        ('to_xml', to_xml, {}),
+        ('sink', to_sink, {}),
+        ('compact', to_sink, {'compact': True}),
+    ]
+    print('{:<10} {:>10} {:>10}'.format('output', 'size (B)', 'time (ms)'))
+    for name, fn, kwargs in cases:
+        try:
+            size = len(fn(tree, **kwargs).encode('utf-8'))
+        except TypeError:
+            # no sinks before the streaming visitor
+            continue
+        t = min(timeit.repeat(lambda: fn(tree, **kwargs), number=NUMBER, repeat=5))
+        print('{:<10} {:>10} {:>10.1f}'.format(name, size, t / NUMBER * 1e3))
+
+    report = make_report()
+    t = min(timeit.repeat(lambda: write_report(report), number=NUMBER, repeat=5))
+    print('{:<10} {:>10} {:>10.1f}'.format('report', len(report), t / NUMBER * 1e3))
+
+
+if __name__ == '__main__':
+    run()
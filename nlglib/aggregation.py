@@ -21,6 +21,40 @@ class AggregationError(Exception):
     pass
 
 
+def _copy(element):
+    """Return a deep copy of `element`; elements use the faster `clone()`.
+
+    As in `deepcopy()`, the subjects and predicates of the copied clauses
+    are set again so that empty ones are raised to phrases.
+
+    """
+    if not isinstance(element, Element):
+        return deepcopy(element)
+    rv = element.clone()
+    clauses = [x for x in rv.elements(recursive=True, itself='first') if isinstance(x, Clause)]
+    for clause in clauses:
+        clause.subject = clause.subject
+        clause.predicate = clause.predicate
+    return rv
+
+
+def _locate(element, node):
+    """Return the path to `node` in `element` (see `Element.locate()`). """
+    if isinstance(element, Element):
+        return element.locate(node)
+    return None
+
+
+def _replace(element, path, one, another):
+    """Replace the constituent at `path` by `another`
+    or the first constituent equal to `one` if there is no path.
+
+    """
+    if path:
+        return element.replace_at(path, another)
+    return element.replace(one, another)
+
+
 class SentenceAggregator:
     """Sentence aggregator looks for similarly looking syntactic structures
     and aggregates them together to decrease repetition.
@@ -50,6 +84,10 @@ class SentenceAggregator:
         if msg is None:
             return None
 
+        if isinstance(msg, Element) and msg.frozen:
+            # aggregation changes the elements in place
+            msg = msg.clone()
+
         if hasattr(msg, 'aggregate'):
             return msg.aggregate(self, **kwargs)
 
@@ -95,7 +133,7 @@ class SentenceAggregator:
         obj = self.aggregate(clause.complements, **kwargs)
         vp = self.aggregate(clause.predicate, **kwargs)
         vp.features.update(clause.predicate.features)
-        c = deepcopy(clause)
+        c = _copy(clause)
         c.subject = subj
         c.predicate = vp
         c.complements = obj
@@ -116,8 +154,8 @@ class SentenceAggregator:
         if lhs.category == rhs.category == category.NOUN_PHRASE:
             return self.aggregate_noun_phrase(lhs, rhs, **kwargs)
 
-        e1 = deepcopy(lhs)
-        e2 = deepcopy(rhs)
+        e1 = _copy(lhs)
+        e2 = _copy(rhs)
 
         if e1.category == category.COORDINATION:
             cc = e1
@@ -137,15 +175,15 @@ class SentenceAggregator:
         """Aggregate two noun phrases"""
         del kwargs  # unused for now
         if lhs.head == rhs.head:
-            rv = deepcopy(lhs)
+            rv = _copy(lhs)
             rv.premodifiers.extend(rhs.premodifiers)
             return rv
         elif lhs.premodifiers == rhs.premodifiers:
-            rv = deepcopy(lhs)
-            rv.head = CC(deepcopy(lhs.head), deepcopy(rhs.head), features={'NUMBER': 'plural'})
+            rv = _copy(lhs)
+            rv.head = CC(_copy(lhs.head), _copy(rhs.head), features={'NUMBER': 'plural'})
             return rv
         else:
-            return CC(deepcopy(lhs), deepcopy(rhs), features={'NUMBER': 'plural'})
+            return CC(_copy(lhs), _copy(rhs), features={'NUMBER': 'plural'})
 
     def try_to_aggregate(self, sent1, sent2, marker='and', **kwargs):
         """ Attempt to combine two elements into one by replacing the differing
@@ -159,17 +197,19 @@ class SentenceAggregator:
 
         replacement = Var("REPLACEMENT", "REPLACEMENT")
         for e1 in sentence_iterator(sent1):
-            s1 = deepcopy(sent1)
-            s1.replace(e1, replacement)  # replace one element
+            # the copies have the same structure so the paths lead to the copied elements
+            path1 = _locate(sent1, e1)
+            s1 = _copy(sent1)
+            _replace(s1, path1, e1, replacement)  # replace one element
 
             for e2 in sentence_iterator(sent2):
-                s2 = deepcopy(sent2)
-                s2.replace(e2, replacement)  # replace one element
+                s2 = _copy(sent2)
+                _replace(s2, _locate(sent2, e2), e2, replacement)  # replace one element
 
                 if s1 == s2:
                     self.logger.debug('Aggregating:\n\t%s\n\t%s' % (str(s1), str(s2)))
                     cc = self.add_elements(e1, e2, conj=marker)
-                    s1.replace(replacement, cc)
+                    _replace(s1, path1, replacement, cc)
                     self.logger.debug('Result of aggregation:\n%s' % repr(s1))
                     return s1
         return None
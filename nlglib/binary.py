@@ -0,0 +1,492 @@
+"""This module contains a compact binary format for syntax trees and documents.
+
+It is used to pickle elements, element lists, documents, paragraphs,
+rhetorical relations and message specifications (see their `__reduce_ex__()`)
+so that trees sent between processes or cached on disk do not carry
+the attributes and parents of every node.
+
+The encoding starts with a header (`MAGIC` and `VERSION`) followed by
+a table of all the strings of the tree (each stored once) and the nodes
+in post-order, so the constituents of a node precede it and the last node
+is the encoded object. Integers are varints (7 bits per byte) and strings
+and constituents are referred to by their position in the tables.
+A node starts with the index of its class (see `_TYPES`) and a bit telling
+if it is frozen, followed by its fields in the order of the schema
+of `nlglib.codec`:
+
+* values are a tag (`_V_*`) followed by the value
+* features are a bitset of the features of the closed feature groups
+  (`nlglib.features.default._REGISTERED_GROUPS`) followed by the others
+* constituents are 0 for None, 1 for an empty placeholder and
+  the position of the node + 2 otherwise
+* lists are their length (shifted left by one bit telling if the list
+  has features), the positions of the items and the features
+
+Other `RhetRel` and `MsgSpec` objects (including subclasses)
+are stored as the name of their class and the values of their attributes.
+Values that the format does not know are pickled. Objects referred to
+from several places are stored once.
+
+As with pickle, only load data from trusted sources.
+
+"""
+
+import importlib
+import pickle
+import struct
+
+from nlglib.codec import _SCHEMA, _VALUE, _FEATURES, _ELEMENT, _LIST, _NODES, _is_default
+from nlglib.features import DISCOURSE_FUNCTION, Feature
+from nlglib.features.default import _REGISTERED_GROUPS
+from nlglib.macroplanning import MsgSpec, RhetRel
+from nlglib.microplanning import Element, ElementList
+from nlglib.microplanning.struct import _FrozenElementList, _mutable_class, _new_list
+
+__all__ = ['MAGIC', 'VERSION', 'dumps', 'loads', 'dump', 'load']
+
+MAGIC = b'NLGB'
+VERSION = 1
+
+_HEADER = MAGIC + bytes([VERSION])
+
+# classes with a schema in the order of their indices;
+# the other objects are stored as `_OBJECT` and top-level element lists as `_ELEMENT_LIST`
+_TYPES = tuple(_SCHEMA)
+_TYPE_INDEX = {cls: i for i, cls in enumerate(_TYPES)}
+_OBJECT = len(_TYPES)
+_ELEMENT_LIST = _OBJECT + 1
+
+# features stored as bits (the position in the tuple is the index of the bit)
+_BIT_FEATURES = tuple(
+    getattr(group, group.transform(value)) for group in _REGISTERED_GROUPS for value in group.values
+)
+# the bits by the `id()` of the features as they are interned (and kept by their groups)
+_FEATURE_BITS = {id(f): 1 << i for i, f in enumerate(_BIT_FEATURES)}
+
+# tags of values
+_V_NONE = 0
+_V_FALSE = 1
+_V_TRUE = 2
+_V_INT = 3
+_V_FLOAT = 4
+_V_STR = 5
+_V_LIST = 6
+_V_TUPLE = 7
+_V_DICT = 8
+_V_NODE = 9
+_V_FEATURE = 10
+_V_PICKLE = 11
+
+_DOUBLE = struct.Struct('<d')
+
+
+def _is_node(value):
+    return isinstance(value, (Element, ElementList, RhetRel, MsgSpec)) or type(value) in _TYPE_INDEX
+
+
+def _nested_nodes(value, rv):
+    """Append the nodes in the attribute `value` of an object to the list `rv`. """
+    if _is_node(value):
+        rv.append(value)
+    elif type(value) in (list, tuple):
+        for x in value:
+            _nested_nodes(x, rv)
+    elif type(value) is dict:
+        for k, v in value.items():
+            _nested_nodes(k, rv)
+            _nested_nodes(v, rv)
+
+
+def _fields(obj):
+    """Return the schema fields of `obj` or None if it is stored as an `_OBJECT`. """
+    try:
+        return _SCHEMA[_mutable_class(type(obj))][1]
+    except KeyError:
+        pass
+    if isinstance(obj, (RhetRel, MsgSpec)):
+        return None
+    raise TypeError('Cannot encode {}'.format(type(obj).__name__))
+
+
+def _constituents(obj):
+    """Return the nodes referred to by `obj` in the order they are encoded. """
+    if isinstance(obj, ElementList):
+        return list(obj)
+    fields = _fields(obj)
+    rv = []
+    if fields is None:
+        _nested_nodes(vars(obj), rv)
+        return rv
+    for key, name, kind, default in fields:
+        if key is None:
+            continue
+        value = getattr(obj, name)
+        if kind == _ELEMENT:
+            if value is not None and not _is_default(kind, value, default):
+                rv.append(value)
+        elif kind == _LIST or kind == _NODES:
+            rv.extend(value)
+    return rv
+
+
+def _post_order(obj):
+    """Return a list of the nodes of `obj` in post-order (each node once). """
+    positions = {}
+    # the nodes on the path to the current node
+    visiting = set()
+    rv = []
+    stack = [(obj, False)]
+    while stack:
+        node, expanded = stack.pop()
+        key = id(node)
+        if expanded:
+            visiting.discard(key)
+            positions[key] = len(rv)
+            rv.append(node)
+            continue
+        if key in positions:
+            continue
+        if key in visiting:
+            raise ValueError('Cannot encode {} referring to itself'.format(type(node).__name__))
+        visiting.add(key)
+        stack.append((node, True))
+        stack.extend((x, False) for x in reversed(_constituents(node)) if id(x) not in positions)
+    return rv
+
+
+class _Writer(object):
+    """Encodes nodes into a `bytearray` and collects their strings. """
+
+    __slots__ = ('out', 'strings', 'positions')
+
+    def __init__(self, positions):
+        self.out = bytearray()
+        self.strings = {}
+        self.positions = positions
+
+    def varint(self, n):
+        out = self.out
+        if n < 0x80:
+            out.append(n)
+            return
+        while n > 0x7f:
+            out.append(n & 0x7f | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def string(self, s):
+        strings = self.strings
+        i = strings.get(s)
+        if i is None:
+            i = strings[s] = len(strings)
+        self.varint(i)
+
+    def value(self, value):
+        out = self.out
+        if value is None:
+            out.append(_V_NONE)
+        elif value is False:
+            out.append(_V_FALSE)
+        elif value is True:
+            out.append(_V_TRUE)
+        elif type(value) is str:
+            out.append(_V_STR)
+            self.string(value)
+        elif type(value) is int:
+            out.append(_V_INT)
+            self.varint(value << 1 if value >= 0 else (-value << 1) - 1)
+        elif type(value) is float:
+            out.append(_V_FLOAT)
+            out.extend(_DOUBLE.pack(value))
+        elif type(value) is list or type(value) is tuple:
+            out.append(_V_LIST if type(value) is list else _V_TUPLE)
+            self.varint(len(value))
+            for x in value:
+                self.value(x)
+        elif type(value) is dict:
+            out.append(_V_DICT)
+            self.varint(len(value))
+            for k, v in value.items():
+                self.value(k)
+                self.value(v)
+        elif id(value) in self.positions and _is_node(value):
+            out.append(_V_NODE)
+            self.varint(self.positions[id(value)])
+        elif isinstance(value, Feature):
+            out.append(_V_FEATURE)
+            self.value(value.name)
+            self.value(value.value)
+        else:
+            out.append(_V_PICKLE)
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            self.varint(len(data))
+            out.extend(data)
+
+    def features(self, features):
+        bits = 0
+        other = []
+        for f in features:
+            bit = _FEATURE_BITS.get(id(f))
+            if bit is None:
+                other.append(f)
+            else:
+                bits |= bit
+        self.varint(bits)
+        self.varint(len(other))
+        for f in other:
+            self.value(f.name)
+            self.value(f.value)
+
+    def items(self, items):
+        positions = self.positions
+        out = self.out
+        for x in items:
+            n = positions[id(x)]
+            if n < 0x80:
+                out.append(n)
+            else:
+                self.varint(n)
+
+    def node(self, obj):
+        frozen = getattr(obj, 'frozen', False)
+        if isinstance(obj, ElementList):
+            self.varint(_ELEMENT_LIST << 1 | frozen)
+            self.element_list(obj)
+            return
+        fields = _fields(obj)
+        if fields is None:
+            self.varint(_OBJECT << 1)
+            cls = type(obj)
+            self.string(cls.__module__)
+            self.string(cls.__qualname__)
+            self.value(vars(obj))
+            return
+        self.varint(_TYPE_INDEX[_mutable_class(type(obj))] << 1 | frozen)
+        positions = self.positions
+        for key, name, kind, default in fields:
+            if key is None:
+                continue
+            value = getattr(obj, name)
+            if kind == _VALUE:
+                self.value(value)
+            elif kind == _FEATURES:
+                self.features(value)
+            elif kind == _ELEMENT:
+                if value is None:
+                    self.varint(0)
+                elif _is_default(kind, value, default):
+                    self.varint(1)
+                else:
+                    self.varint(positions[id(value)] + 2)
+            elif kind == _LIST:
+                self.element_list(value)
+            else:
+                self.varint(len(value))
+                self.items(value)
+
+    def element_list(self, value):
+        features = value._features
+        self.varint(len(value) << 1 | bool(features))
+        self.items(value)
+        if features:
+            self.features(features)
+
+    def getvalue(self):
+        header = _Writer(None)
+        header.out.extend(_HEADER)
+        header.varint(len(self.strings))
+        for s in self.strings:
+            data = s.encode('utf-8', 'surrogatepass')
+            header.varint(len(data))
+            header.out.extend(data)
+        return bytes(header.out + self.out)
+
+
+class _Reader(object):
+    """Decodes the nodes written by `_Writer`. """
+
+    __slots__ = ('data', 'pos', 'strings', 'nodes')
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = len(_HEADER)
+        self.nodes = []
+        self.strings = []
+        strings = self.strings
+        for _ in range(self.varint()):
+            n = self.varint()
+            strings.append(str(data[self.pos:self.pos + n], 'utf-8', 'surrogatepass'))
+            self.pos += n
+
+    def varint(self):
+        data = self.data
+        pos = self.pos
+        b = data[pos]
+        pos += 1
+        if b < 0x80:
+            self.pos = pos
+            return b
+        rv = b & 0x7f
+        shift = 7
+        while True:
+            b = data[pos]
+            pos += 1
+            rv |= (b & 0x7f) << shift
+            if b < 0x80:
+                self.pos = pos
+                return rv
+            shift += 7
+
+    def value(self):
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == _V_STR:
+            return self.strings[self.varint()]
+        if tag == _V_NONE:
+            return None
+        if tag == _V_FALSE:
+            return False
+        if tag == _V_TRUE:
+            return True
+        if tag == _V_INT:
+            n = self.varint()
+            return n >> 1 if not n & 1 else -((n + 1) >> 1)
+        if tag == _V_FLOAT:
+            rv, = _DOUBLE.unpack_from(self.data, self.pos)
+            self.pos += _DOUBLE.size
+            return rv
+        if tag == _V_LIST or tag == _V_TUPLE:
+            rv = [self.value() for _ in range(self.varint())]
+            return rv if tag == _V_LIST else tuple(rv)
+        if tag == _V_DICT:
+            return {self.value(): self.value() for _ in range(self.varint())}
+        if tag == _V_NODE:
+            return self.nodes[self.varint()]
+        if tag == _V_FEATURE:
+            return Feature(self.value(), self.value())
+        if tag == _V_PICKLE:
+            n = self.varint()
+            rv = pickle.loads(self.data[self.pos:self.pos + n])
+            self.pos += n
+            return rv
+        raise ValueError('Unknown value tag {}'.format(tag))
+
+    def features(self, cls):
+        bits = self.varint()
+        features = []
+        while bits:
+            low = bits & -bits
+            features.append(_BIT_FEATURES[low.bit_length() - 1])
+            bits ^= low
+        for _ in range(self.varint()):
+            features.append(Feature(self.value(), self.value()))
+        return cls(features)
+
+    def element_list(self, parent):
+        n = self.varint()
+        nodes = self.nodes
+        items = [nodes[self.varint()] for _ in range(n >> 1)]
+        features = self.features(Element.feature_set_class) if n & 1 else None
+        if parent is not None:
+            for x in items:
+                if not x.frozen:
+                    object.__setattr__(x, 'parent', parent)
+        return _new_list(ElementList, items, parent, features)
+
+    def node(self):
+        code = self.varint()
+        index, frozen = code >> 1, code & 1
+        if index == _ELEMENT_LIST:
+            rv = self.element_list(None)
+            if frozen:
+                rv.__class__ = _FrozenElementList
+            return rv
+        if index == _OBJECT:
+            module = importlib.import_module(self.strings[self.varint()])
+            cls = module
+            for name in self.strings[self.varint()].split('.'):
+                cls = getattr(cls, name)
+            rv = object.__new__(cls)
+            # the attributes can refer to the object itself only through pickled values
+            vars(rv).update(self.value())
+            return rv
+        try:
+            cls = _TYPES[index]
+        except IndexError:
+            raise ValueError('Unknown type index {}'.format(index)) from None
+        rv = object.__new__(cls)
+        parent = rv if isinstance(rv, Element) else None
+        if parent is not None:
+            object.__setattr__(rv, 'parent', None)
+        nodes = self.nodes
+        for key, name, kind, default in _SCHEMA[cls][1]:
+            if key is None:
+                value = default
+            elif kind == _VALUE:
+                value = self.value()
+            elif kind == _FEATURES:
+                value = self.features(Element.feature_set_class)
+                value._owner = rv
+            elif kind == _ELEMENT:
+                n = self.varint()
+                if n == 0:
+                    value = None
+                elif n == 1:
+                    value = Element()
+                    value[DISCOURSE_FUNCTION] = default
+                else:
+                    value = nodes[n - 2]
+                if value is not None and parent is not None and not value.frozen:
+                    object.__setattr__(value, 'parent', parent)
+            elif kind == _LIST:
+                value = self.element_list(parent)
+            else:
+                value = [nodes[self.varint()] for _ in range(self.varint())]
+            object.__setattr__(rv, name, value)
+        if frozen:
+            rv.freeze()
+        return rv
+
+
+def dumps(obj):
+    """Return `obj` (an element, element list, document, paragraph,
+    rhetorical relation or message specification) encoded as bytes.
+
+    :raises TypeError: if `obj` contains elements of classes without a schema
+
+    """
+    nodes = _post_order(obj)
+    writer = _Writer({id(x): i for i, x in enumerate(nodes)})
+    writer.varint(len(nodes))
+    for x in nodes:
+        writer.node(x)
+    return writer.getvalue()
+
+
+def loads(data):
+    """Return the object encoded in the bytes `data` by `dumps()`.
+
+    :raises ValueError: if `data` is not in a supported version of the format
+
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('Not an encoded syntax tree')
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError('Unsupported version of the encoding: {!r}'.format(data[len(MAGIC)]))
+    reader = _Reader(data)
+    nodes = reader.nodes
+    for _ in range(reader.varint()):
+        nodes.append(reader.node())
+    if not nodes:
+        raise ValueError('No nodes to decode')
+    return nodes[-1]
+
+
+def dump(obj, fp):
+    """Write the encoding of `obj` to the binary file-like object `fp` (see `dumps()`). """
+    fp.write(dumps(obj))
+
+
+def load(fp):
+    """Return the object encoded in the binary file-like object `fp` (see `loads()`). """
+    return loads(fp.read())
@@ -0,0 +1,327 @@
+"""This module contains a compact JSON format for elements and documents.
+
+An object is encoded as a flat list of nodes in post-order so the
+constituents of a node precede it and the last node is the object itself::
+
+    {"version": 1, "nodes": [{"t": "S", "v": "dog"}, {"t": "NP", "h": 0}]}
+
+Each node is a dict with a short type tag (`t`) and short keys of its fields.
+Constituents are referred to by their position in the list. Fields with
+default values (no id, no features, empty lists and empty placeholders)
+are omitted unless `omit_defaults` is False.
+
+As the nodes are not nested, trees of any depth can be encoded and decoded
+and the encoding can be written node by node (see `iterencode()`).
+A stream of objects is written as JSON lines by `dump_all()` and read
+one object at a time by `load_all()`.
+
+"""
+
+import json
+
+from nlglib.features import DISCOURSE_FUNCTION, Feature, FeatureSet, category
+from nlglib.macroplanning import Document, Paragraph
+from nlglib.microplanning import (
+    Element, ElementList, ElementDecoder, String, Word, Var, Coordination, Phrase,
+    NounPhrase, VerbPhrase, PrepositionPhrase, AdverbPhrase, AdjectivePhrase, Clause,
+)
+from nlglib.microplanning.struct import _mutable_class, _new_list
+
+__all__ = ['VERSION', 'dumps', 'loads', 'dump', 'load', 'iterencode', 'dump_all', 'load_all']
+
+VERSION = 1
+
+# kinds of fields
+_VALUE = 0
+_FEATURES = 1
+_ELEMENT = 2
+_LIST = 3
+_NODES = 4
+
+# The fields of the encoded classes as tuples (key, attribute, kind, default).
+# The default of an element is the discourse function of an empty `Element`
+# used as a placeholder (or None). Fields without a key are not encoded
+# and are always set to the default.
+_ELEMENT_FIELDS = (
+    ('id', 'id', _VALUE, None),
+    ('f', '_features', _FEATURES, None),
+    (None, 'hash', _VALUE, -1),
+)
+
+_PHRASE_FIELDS = _ELEMENT_FIELDS + (
+    ('pre', 'premodifiers', _LIST, None),
+    ('h', '_head', _ELEMENT, DISCOURSE_FUNCTION.head),
+    ('c', 'complements', _LIST, None),
+    ('post', 'postmodifiers', _LIST, None),
+)
+
+_SCHEMA = {
+    Element: ('E', _ELEMENT_FIELDS),
+    String: ('S', _ELEMENT_FIELDS + (
+        ('v', 'value', _VALUE, ''),
+    )),
+    Word: ('W', _ELEMENT_FIELDS + (
+        ('w', 'word', _VALUE, None),
+        ('pos', 'pos', _VALUE, category.ANY),
+        ('inf', 'do_inflection', _VALUE, False),
+    )),
+    Var: ('V', _ELEMENT_FIELDS + (
+        ('v', 'value', _ELEMENT, None),
+    )),
+    Coordination: ('CC', _ELEMENT_FIELDS + (
+        ('cs', 'coords', _LIST, None),
+        ('cat', 'coordinate_category', _VALUE, None),
+        ('cj', 'conj', _ELEMENT, None),
+    )),
+    Phrase: ('P', _PHRASE_FIELDS),
+    NounPhrase: ('NP', _PHRASE_FIELDS + (
+        ('spec', '_spec', _ELEMENT, DISCOURSE_FUNCTION.specifier),
+    )),
+    VerbPhrase: ('VP', _PHRASE_FIELDS),
+    PrepositionPhrase: ('PP', _PHRASE_FIELDS),
+    AdverbPhrase: ('AdvP', _PHRASE_FIELDS),
+    AdjectivePhrase: ('AdjP', _PHRASE_FIELDS),
+    Clause: ('C', _ELEMENT_FIELDS + (
+        ('front', 'front_modifiers', _LIST, None),
+        ('subj', '_subject', _ELEMENT, DISCOURSE_FUNCTION.subject),
+        ('pre', 'premodifiers', _LIST, None),
+        ('pred', '_predicate', _ELEMENT, DISCOURSE_FUNCTION.predicate),
+        ('c', 'complements', _LIST, None),
+        ('post', 'postmodifiers', _LIST, None),
+        # the head of a clause is the predicate
+        (None, '_head', _VALUE, None),
+    )),
+    Document: ('Doc', (
+        ('title', '_title', _ELEMENT, None),
+        ('s', '_sections', _NODES, None),
+    )),
+    Paragraph: ('Par', (
+        ('s', '_sentences', _NODES, None),
+    )),
+}
+
+# classes and fields by type tag
+_CLASSES = {tag: (cls, fields) for cls, (tag, fields) in _SCHEMA.items()}
+
+_COMPACT = (',', ':')
+
+
+def _schema(obj):
+    try:
+        return _SCHEMA[_mutable_class(type(obj))]
+    except KeyError:
+        raise TypeError('Cannot encode {}'.format(type(obj).__name__)) from None
+
+
+def _encode_features(features):
+    rv = features.as_dict()
+    if len(rv) < len(features):
+        # some groups have several features
+        return [[f.name, f.value] for f in features]
+    return rv
+
+
+def _is_default(kind, value, default):
+    if kind == _VALUE:
+        return value is default or (type(value) is type(default) and value == default)
+    if kind == _FEATURES:
+        return not value
+    if kind == _LIST:
+        return not value and not value._features
+    if kind == _NODES:
+        return not value
+    if default is None:
+        return value is None
+    return (
+        _mutable_class(type(value)) is Element and value.id is None and
+        len(value.features) == 1 and default in value.features
+    )
+
+
+def _encode_nodes(obj, omit_defaults=True):
+    """Yield the nodes of `obj` as dicts in post-order. """
+    # the positions of the encoded nodes not yet referred to by their parents
+    done = []
+    count = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if type(item) is tuple:
+            # all constituents of the node were encoded
+            node, references, n = item
+            positions = iter(done[len(done) - n:])
+            del done[len(done) - n:]
+            for key, items, size in references:
+                if items is None:
+                    node[key] = next(positions)
+                else:
+                    items.extend(next(positions) for _ in range(size))
+            done.append(count)
+            count += 1
+            yield node
+            continue
+        tag, fields = _schema(item)
+        node = {'t': tag}
+        # (key, list of positions or None for an element, number of constituents)
+        references = []
+        constituents = []
+        for key, name, kind, default in fields:
+            if key is None:
+                continue
+            value = getattr(item, name)
+            if omit_defaults and _is_default(kind, value, default):
+                continue
+            if kind == _VALUE:
+                node[key] = value
+            elif kind == _FEATURES:
+                node[key] = _encode_features(value)
+            elif kind == _ELEMENT:
+                if value is None:
+                    node[key] = None
+                else:
+                    references.append((key, None, 1))
+                    constituents.append(value)
+            else:
+                items = []
+                if kind == _LIST and value._features:
+                    # a list with features is a dict with the items in `i`
+                    node[key] = {'i': items, 'f': _encode_features(value._features)}
+                else:
+                    node[key] = items
+                references.append((key, items, len(value)))
+                constituents.extend(value)
+        stack.append((node, references, len(constituents)))
+        stack.extend(reversed(constituents))
+
+
+def _decode_features(data, feature_set_class):
+    rv = feature_set_class()
+    if isinstance(data, dict):
+        rv.update(data)
+    else:
+        # several features of a group; `update()` would keep only the last one
+        for name, value in data:
+            rv.add(Feature(name, value))
+    return rv
+
+
+def _decode_nodes(nodes):
+    """Return the object encoded as `nodes` (see `_encode_nodes()`). """
+    decoded = []
+    feature_set_class = Element.feature_set_class
+    for data in nodes:
+        try:
+            cls, fields = _CLASSES[data['t']]
+        except KeyError:
+            raise ValueError('Unknown type tag {!r}'.format(data.get('t'))) from None
+        rv = object.__new__(cls)
+        parent = rv if isinstance(rv, Element) else None
+        if parent is not None:
+            object.__setattr__(rv, 'parent', None)
+        for key, name, kind, default in fields:
+            value = data.get(key, default) if key is not None else default
+            if kind == _FEATURES:
+                value = feature_set_class() if value is None else _decode_features(
+                    value, feature_set_class)
+                value._owner = rv
+            elif kind == _ELEMENT:
+                if isinstance(value, int):
+                    value = decoded[value]
+                elif isinstance(value, Feature):
+                    # an omitted placeholder
+                    function = value
+                    value = Element()
+                    value[DISCOURSE_FUNCTION] = function
+                if value is not None and parent is not None:
+                    object.__setattr__(value, 'parent', parent)
+            elif kind == _LIST:
+                features = None
+                if isinstance(value, dict):
+                    features = _decode_features(value['f'], FeatureSet)
+                    value = value['i']
+                items = [decoded[i] for i in value or ()]
+                for x in items:
+                    object.__setattr__(x, 'parent', parent)
+                value = _new_list(ElementList, items, parent, features)
+            elif kind == _NODES:
+                value = [decoded[i] for i in value or ()]
+            object.__setattr__(rv, name, value)
+        decoded.append(rv)
+    if not decoded:
+        raise ValueError('No nodes to decode')
+    return decoded[-1]
+
+
+def iterencode(obj, omit_defaults=True):
+    """Return a generator of strings making up the encoding of `obj`.
+
+    Only the nodes on the current path through the tree are kept
+    in memory so the encoding can be written as it is produced.
+
+    """
+    yield '{"version":%d,"nodes":[' % VERSION
+    separator = ''
+    for node in _encode_nodes(obj, omit_defaults):
+        yield separator
+        yield json.dumps(node, separators=_COMPACT)
+        separator = ','
+    yield ']}'
+
+
+def dumps(obj, omit_defaults=True):
+    """Return `obj` (an element, a document or a paragraph) encoded as a JSON string.
+
+    :param omit_defaults: leave out the fields with default values
+
+    """
+    return ''.join(iterencode(obj, omit_defaults))
+
+
+def loads(s):
+    """Return the object encoded in the JSON string `s`.
+
+    Strings in the format of `Element.to_json()` are decoded as well.
+
+    :raises ValueError: if the version of the encoding is not supported
+
+    """
+    data = json.loads(s)
+    if isinstance(data, dict) and '__class__' in data:
+        return json.loads(s, cls=ElementDecoder)
+    return _decode(data)
+
+
+def _decode(data):
+    version = data.get('version') if isinstance(data, dict) else None
+    if version != VERSION:
+        raise ValueError('Unsupported version of the encoding: {!r}'.format(version))
+    return _decode_nodes(data['nodes'])
+
+
+def dump(obj, fp, omit_defaults=True):
+    """Write the encoding of `obj` to the file-like object `fp` (see `dumps()`). """
+    for chunk in iterencode(obj, omit_defaults):
+        fp.write(chunk)
+
+
+def load(fp):
+    """Return the object encoded in the file-like object `fp` (see `loads()`). """
+    return loads(fp.read())
+
+
+def dump_all(objects, fp, omit_defaults=True):
+    """Write the encodings of `objects` to `fp`, one per line. """
+    for obj in objects:
+        dump(obj, fp, omit_defaults)
+        fp.write('\n')
+
+
+def load_all(fp):
+    """Return a generator of the objects written to `fp` by `dump_all()`.
+
+    The objects are read and decoded one at a time.
+
+    """
+    for line in fp:
+        if line.strip():
+            yield _decode(json.loads(line))
@@ -5,7 +5,7 @@ If you are defining your own features, use the `Feature` and
 
 """
 
-from nlglib.features.feature import FeatureGroup
+from nlglib.features.feature import FeatureGroup, register_feature_group
 
 CASE = FeatureGroup(
     'CASE',
@@ -236,6 +236,15 @@ DISCOURSE_FUNCTION = FeatureGroup(
     transform='lower'
 )
 
+# closed groups stored as bits by `CompactFeatureSet` (and `nlglib.binary`)
+_REGISTERED_GROUPS = (
+    CASE, NUMBER, GENDER, PERSON, TENSE, ASPECT, MOOD, MODAL, VOICE, FORM, INTERROGATIVE_TYPE,
+    REGISTER, CLAUSE, NOUN_TYPE, PRONOUN_TYPE, PRONOUN_USE, NEGATED, ELIDED, INFLECTED,
+    DISCOURSE_FUNCTION,
+)
+for _group in _REGISTERED_GROUPS:
+    register_feature_group(_group)
+
 # features that are excluded from equality comparison
 NON_COMPARABLE_FEATURES = [DISCOURSE_FUNCTION]
 
@@ -8,17 +8,70 @@ not found in others.
 """
 
 import copy
-from collections import MutableSet
+import weakref
 
-__all__ = ['Feature', 'FeatureGroup', 'FeatureSet']
+from collections.abc import MutableSet
+from itertools import chain
+
+__all__ = [
+    'Feature',
+    'FeatureGroup',
+    'FeatureSet',
+    'CompactFeatureSet',
+    'register_feature_group',
+]
 
 
 class Feature(object):
-    """Represents individual features -- a pair of feature group name + value"""
+    """Represents individual features -- a pair of feature group name + value
 
-    def __init__(self, name, value):
-        self.name = name
-        self.value = value
+    Features are immutable. Features with string name and value are interned
+    so that each (name, value) pair exists only once and comparing two
+    features is usually just an identity check.
+
+    >>> Feature('NUMBER', 'plural') is Feature('NUMBER', 'plural')
+    True
+
+    """
+
+    __slots__ = ('name', 'value', '_lname', '_hash', '_bit', '__weakref__')
+
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, name, value):
+        interned = isinstance(name, str) and isinstance(value, str)
+        if interned:
+            rv = cls._interned.get((cls, name, value))
+            if rv is not None:
+                return rv
+        rv = super(Feature, cls).__new__(cls)
+        object.__setattr__(rv, 'name', name)
+        object.__setattr__(rv, 'value', value)
+        object.__setattr__(rv, '_lname', name.lower())
+        # hash uses only the name so that we can compare with FeatureGroup
+        object.__setattr__(rv, '_hash', hash(name))
+        # index of the bit representing the feature in `CompactFeatureSet` (see `register_feature_group`)
+        object.__setattr__(rv, '_bit', -1)
+        if interned:
+            cls._interned[(cls, name, value)] = rv
+        return rv
+
+    def __setattr__(self, key, value):
+        raise AttributeError('Feature is immutable')
+
+    def __delattr__(self, item):
+        raise AttributeError('Feature is immutable')
+
+    def __reduce__(self):
+        return self.__class__, (self.name, self.value)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        if isinstance(self.value, str):
+            return self
+        return self.__class__(self.name, copy.deepcopy(self.value, memo))
 
     def __str__(self):
         return '{0}: {1}'.format(self.name, self.value)
@@ -31,27 +84,38 @@ class Feature(object):
         or if it is a `FeatureGroup` with the same name
 
         """
+        if self is other:
+            return True
         if isinstance(other, Feature):
-            return self.name.lower() == other.name.lower() and self.value == other.value
+            return self._lname == other._lname and self.value == other.value
         elif isinstance(other, FeatureGroup):
-            return self.name.lower() == other.name.lower()
+            return self._lname == other.name.lower()
         else:
             return False
 
     def __hash__(self):
-        # hash uses only the name so that we can compare with FeatureGroup
-        return hash(self.name)
+        return self._hash
+
+
+def _identity(x):
+    return x
 
 
 class FeatureGroup(object):
-    """Represents a group of features such as NUMBER or TENSE. """
+    """Represents a group of features such as NUMBER or TENSE.
+
+    The value features are also stored in the instance dict under
+    the spellings used so far, so that accessing `NUMBER.plural`
+    is a plain attribute lookup.
 
-    # TODO: consider using metaclasses and __slots__
+    """
+
+    __slots__ = ('name', 'values', 'transform', '_features', '_value_set', '__dict__')
 
     def __init__(self, name, *values, transform=None):
         """Create a feature group with given values as Feature instances.
 
-        The values are accessible as instance attributes. The values are
+        The values are accessible as attributes. The values are
         also stored in an instance variable (list) `values`.
 
         Note that the order of values matters! (intentionally)
@@ -65,18 +129,20 @@ class FeatureGroup(object):
         <Feature NUMBER: singular>
 
         """
-
-        def ident(x):
-            return x
-
-        fn = ident
+        fn = _identity
         if transform:
             fn = getattr(str, transform)
         self.transform = fn
         self.name = name
         self.values = list(values)
-        for v in values:
-            setattr(self, fn(v), Feature(name, fn(v)))
+        self._features = {fn(v): Feature(name, fn(v)) for v in values}
+        self._value_set = frozenset(values)
+        # values named like attributes of groups (e.g., 'name') are only in `_features`
+        self.__dict__.update((k, v) for k, v in self._features.items() if not _reserved(k))
+
+    def __reduce__(self):
+        transform = None if self.transform is _identity else self.transform.__name__
+        return _make_feature_group, (self.name, tuple(self.values), transform)
 
     def __str__(self):
         return self.name
@@ -92,9 +158,9 @@ class FeatureGroup(object):
 
     def __contains__(self, item):
         if isinstance(item, str):
-            return item in self.values
+            return item in self._value_set
         elif isinstance(item, Feature):
-            return item.name == self.name and item.value in self.values
+            return item.name == self.name and item.value in self._value_set
         else:
             return False
 
@@ -115,37 +181,89 @@ class FeatureGroup(object):
         return hash(self.name)
 
     def __getattr__(self, item):
-        item = self.transform(item)
-        return super(FeatureGroup, self).__getattribute__(item)
+        # only called when `item` is not a value as it is (eg NUMBER.PLURAL)
+        if item.startswith('_'):
+            raise AttributeError(item)
+        rv = self._features.get(self.transform(item))
+        if rv is None:
+            raise AttributeError(item)
+        # remember the spelling so that the next lookup does not end up here
+        if not _reserved(item):
+            self.__dict__[item] = rv
+        return rv
+
+
+def _reserved(name):
+    """Return True if `name` cannot be an attribute holding a value of a feature group. """
+    return not isinstance(name, str) or name.startswith('_') or hasattr(FeatureGroup, name)
+
+
+def _make_feature_group(name, values, transform):
+    return FeatureGroup(name, *values, transform=transform)
 
 
 class FeatureSet(MutableSet):
-    """Represents a set of features"""
-    __slots__ = ['__s']
+    """Represents a set of features
+
+    The features are kept in a dict keyed by the name of their group
+    (eg NUMBER or TENSE) so that lookups and replacements do not have
+    to scan the whole set. The values of the dict are tuples as a group
+    can (rarely) hold more than one feature.
+
+    Copies share the storage until one of them is modified (copy-on-write).
+    As features are immutable, `deepcopy()` is the same as `copy()`.
+
+    """
+    __slots__ = ['_groups', '_shared', '_fingerprint', '_owner']
 
     def __init__(self, seq=()):
-        self.__s = set(seq)
+        self._groups = {}
+        self._shared = False
+        self._fingerprint = None
+        # an object notified (by calling its `_invalidate()`) when the set changes
+        self._owner = None
+        for f in seq:
+            self.add(f)
 
     def __repr__(self):
-        return '<FeatureSet {0}>'.format(str(self.__s))
+        if not self._groups:
+            return '<FeatureSet set()>'
+        return '<FeatureSet {{{0}}}>'.format(', '.join(repr(f) for f in self))
 
     def __str__(self):
-        features = sorted(self.__s, key=lambda f: (f.name, f.value))
+        features = sorted(self, key=lambda f: (f.name, f.value))
         return '{' + ', '.join(
             '{k}: {v}'.format(k=repr(f.name), v=repr(f.value)) for f in features
         ) + '}'
 
     def __len__(self):
-        return len(self.__s)
+        return sum(len(fs) for fs in self._groups.values())
+
+    def __bool__(self):
+        return bool(self._groups)
 
     def __iter__(self):
-        return iter(self.__s)
+        return chain.from_iterable(self._groups.values())
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return super().__eq__(other)
+        d, od = self._groups, other._groups
+        if d == od:
+            return True
+        if d.keys() != od.keys():
+            return False
+        # groups with several features can store them in a different order
+        for name, fs in d.items():
+            ofs = od[name]
+            if len(fs) != len(ofs) or any(f not in ofs for f in fs):
+                return False
+        return True
 
     def __contains__(self, x):
         """Return True if the feature set contains either given feature or given feature group
 
-        This function relies on the fact that FeatureGroup and Feature compare as equal
-        if their names match. This is to allow, for example, NUMBER.plural == NUMBER return True.
+        A string is treated as a name of a feature group.
 
         >>> NUMBER = FeatureGroup('NUMBER', 'singular', 'plural')
         >>> fs = FeatureSet([NUMBER.plural])
@@ -158,8 +276,12 @@ class FeatureSet(MutableSet):
 
         """
         if isinstance(x, str):
-            x = FeatureGroup(x)
-        return x in self.__s
+            return x in self._groups
+        if isinstance(x, Feature):
+            return x in self._groups.get(x.name, ())
+        if isinstance(x, FeatureGroup):
+            return x.name in self._groups
+        return False
 
     def __getitem__(self, feature):
         """Return the value of the corresponding feature group (eg NUMBER or TENSE) or None
@@ -170,10 +292,8 @@ class FeatureSet(MutableSet):
 
         """
         name = feature if isinstance(feature, str) else feature.name
-        for f in self.__s:
-            if name == f.name:
-                return f
-        return None
+        fs = self._groups.get(name)
+        return fs[0] if fs else None
 
     def __setitem__(self, key, value):
         """Add the given `value` using `self.replace`; `key` is used only if `value` is a string.
@@ -198,10 +318,12 @@ class FeatureSet(MutableSet):
         >>> fs = FeatureSet([Feature('NUMBER', 'singular')])
         >>> fs.add(Feature('NUMBER', 'plural'))
         >>> repr(fs)
-        '<FeatureSet {<Feature NUMBER: plural>, <Feature NUMBER: singular>}>'
+        '<FeatureSet {<Feature NUMBER: singular>, <Feature NUMBER: plural>}>'
 
         """
-        self.__s.add(value)
+        fs = self._groups.get(value.name, ())
+        if value not in fs:
+            self._writable()[value.name] = fs + (value,)
 
     def replace(self, value):
         """Add a feature into the set, replacing other feature(s) of the same group
@@ -214,26 +336,24 @@ class FeatureSet(MutableSet):
         """
         if not value:
             return
-        self.discard(value)
-        self.add(value)
+        self._writable()[value.name] = (value,)
 
     def discard(self, value):
         """Discard a given value from the set (doesn't raise KeyError if not found)
 
+        Note that all features of the same group are discarded.
+
         >>> fs = FeatureSet([Feature('NUMBER', 'singular')])
         >>> fs.discard(Feature('NUMBER', 'plural'))
         {<Feature NUMBER: singular>}
         >>> repr(fs)
-        '<FeatureSet {<Feature NUMBER: singular>}>'
-        >>> fs.discard(FeatureGroup('NUMBER'))
-        >>> repr(fs)
         '<FeatureSet set()>'
 
         """
         feature = value if isinstance(value, str) else value.name
-        to_del = set(x for x in self.__s if x.name == feature)
-        self.__s -= to_del
-        return to_del
+        if feature not in self._groups:
+            return set()
+        return set(self._writable().pop(feature))
 
     def get(self, feature, default=None):
         """Get the value of a given feature group or return `default` if it is not present
@@ -245,7 +365,8 @@ class FeatureSet(MutableSet):
         'some-default'
 
         """
-        return self[feature] if self[feature] is not None else default
+        rv = self[feature]
+        return rv if rv is not None else default
 
     def as_dict(self):
         """Return given feature set as a dictionary;
@@ -253,18 +374,18 @@ class FeatureSet(MutableSet):
         The method is assuming that each feature belongs to a different group.
 
         """
-        return {f.name: f.value for f in self.__s}
+        return {f.name: f.value for f in self}
 
     def keys(self):
-        for f in self.__s:
+        for f in self:
             yield f.name
 
     def values(self):
-        for f in self.__s:
+        for f in self:
             yield f.value
 
     def items(self):
-        for f in self.__s:
+        for f in self:
             yield (f.name, f.value)
 
     def update(self, other):
@@ -274,7 +395,7 @@ class FeatureSet(MutableSet):
             for k, v in other.items():
                 self.replace(Feature(k, v))
         elif isinstance(other, FeatureSet):
-            for f in other.__s:
+            for f in other:
                 self.replace(f)
         elif isinstance(other, (list, tuple, set)):
             for x in other:
@@ -289,5 +410,214 @@ class FeatureSet(MutableSet):
 
     def copy(self):
         rv = FeatureSet()
-        rv.__s = copy.copy(self.__s)
+        rv._groups = self._groups
+        rv._shared = self._shared = True
+        rv._fingerprint = self._fingerprint
+        return rv
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def fingerprint(self, exclude=()):
+        """Return a frozenset of the features except for the groups in `exclude`.
+
+        The result is cached until the set is modified. The cache is keyed
+        by the identity of `exclude` so pass the same list each time
+        (eg `NON_COMPARABLE_FEATURES`).
+
+        >>> NUMBER = FeatureGroup('NUMBER', 'singular', 'plural')
+        >>> TENSE = FeatureGroup('TENSE', 'present', 'past')
+        >>> fs = FeatureSet([NUMBER.plural, TENSE.past])
+        >>> fs.fingerprint([TENSE]) == FeatureSet([NUMBER.plural]).fingerprint()
+        True
+
+        """
+        cached = self._fingerprint
+        if cached is not None and cached[0] is exclude:
+            return cached[1]
+        names = {f if isinstance(f, str) else f.name for f in exclude}
+        rv = frozenset(f for f in self if f.name not in names)
+        self._fingerprint = (exclude, rv)
+        return rv
+
+    def _modified(self):
+        self._fingerprint = None
+        if self._owner is not None:
+            self._owner._invalidate()
+
+    def _writable(self):
+        """Return the storage for modification; if it is shared with
+        a copy, make a private copy of it first.
+
+        """
+        self._modified()
+        if self._shared:
+            # the tuples are immutable so a shallow copy is enough
+            self._groups = self._groups.copy()
+            self._shared = False
+        return self._groups
+
+
+# registered features indexed by their bit in `CompactFeatureSet`
+_registered_features = []
+# masks with bits of all registered features of a group (indexed by group name)
+_group_masks = {}
+
+
+def register_feature_group(group):
+    """Assign bits to the features of `group` so that `CompactFeatureSet`
+    can store them in an integer. Registering a group again is harmless.
+
+    >>> ANIMACY = register_feature_group(FeatureGroup('ANIMACY', 'animate', 'inanimate'))
+    >>> CompactFeatureSet([ANIMACY.animate])._bits != 0
+    True
+
+    """
+    for value in group.values:
+        feature = getattr(group, group.transform(value))
+        if feature._bit < 0:
+            object.__setattr__(feature, '_bit', len(_registered_features))
+            _registered_features.append(feature)
+        _group_masks[feature.name] = _group_masks.get(feature.name, 0) | 1 << feature._bit
+    return group
+
+
+def _lowest_feature(bits):
+    """Return the registered feature represented by the lowest set bit in `bits`."""
+    return _registered_features[(bits & -bits).bit_length() - 1]
+
+
+class CompactFeatureSet(FeatureSet):
+    """Represents a set of features where the features of registered
+    feature groups are encoded as bits of a single integer.
+
+    Membership tests, replacements and comparisons of registered features
+    are integer operations. Features of groups that were not registered
+    (or values that are not part of a registered group) are stored
+    the same way as in `FeatureSet`.
+
+    >>> NUMBER = register_feature_group(FeatureGroup('NUMBER', 'singular', 'plural'))
+    >>> fs = CompactFeatureSet([NUMBER.plural, Feature('foo', 'bar')])
+    >>> NUMBER.plural in fs, NUMBER.singular in fs, 'foo' in fs
+    (True, False, True)
+    >>> fs.replace(NUMBER.singular)
+    >>> fs[NUMBER]
+    <Feature NUMBER: singular>
+
+    """
+    __slots__ = ['_bits']
+
+    def __init__(self, seq=()):
+        self._bits = 0
+        super().__init__(seq)
+
+    def __len__(self):
+        return bin(self._bits).count('1') + super().__len__()
+
+    def __bool__(self):
+        return self._bits != 0 or bool(self._groups)
+
+    def __iter__(self):
+        bits = self._bits
+        registered = []
+        while bits:
+            low = bits & -bits
+            registered.append(_registered_features[low.bit_length() - 1])
+            bits ^= low
+        return chain(registered, super().__iter__())
+
+    def __eq__(self, other):
+        if type(other) is not CompactFeatureSet:
+            return super().__eq__(other)
+        return self._bits == other._bits and (
+            self._groups == other._groups or super().__eq__(other))
+
+    def __contains__(self, x):
+        if isinstance(x, Feature):
+            bit = x._bit
+            if bit >= 0:
+                return self._bits >> bit & 1 == 1
+            return x in self._groups.get(x.name, ())
+        if isinstance(x, str):
+            name = x
+        elif isinstance(x, FeatureGroup):
+            name = x.name
+        else:
+            return False
+        return self._bits & _group_masks.get(name, 0) != 0 or name in self._groups
+
+    def __getitem__(self, feature):
+        name = feature if isinstance(feature, str) else feature.name
+        mask = _group_masks.get(name)
+        if mask is not None:
+            bits = self._bits & mask
+            if bits:
+                return _registered_features[(bits & -bits).bit_length() - 1]
+        fs = self._groups.get(name)
+        return fs[0] if fs else None
+
+    def add(self, value):
+        if isinstance(value, Feature) and value._bit >= 0:
+            self._modified()
+            self._bits |= 1 << value._bit
+        else:
+            super().add(value)
+
+    def replace(self, value):
+        if not value:
+            return
+        name = value.name
+        mask = _group_masks.get(name)
+        if mask is not None:
+            self._modified()
+            self._bits &= ~mask
+            bit = getattr(value, '_bit', -1)
+            if bit >= 0:
+                self._bits |= 1 << bit
+                if name in self._groups:
+                    del self._writable()[name]
+                return
+        self._writable()[name] = (value,)
+
+    def discard(self, value):
+        name = value if isinstance(value, str) else value.name
+        mask = _group_masks.get(name, 0)
+        removed = super().discard(name)
+        if self._bits & mask:
+            bits = self._bits & mask
+            self._modified()
+            self._bits &= ~mask
+            while bits:
+                removed.add(_lowest_feature(bits))
+                bits &= bits - 1
+        return removed
+
+    def copy(self):
+        rv = CompactFeatureSet()
+        rv._bits = self._bits
+        rv._groups = self._groups
+        rv._shared = self._shared = True
+        rv._fingerprint = self._fingerprint
+        return rv
+
+    def to_bits(self):
+        """Return the registered features as an integer and the others as a frozenset.
+
+        >>> NUMBER = register_feature_group(FeatureGroup('NUMBER', 'singular', 'plural'))
+        >>> bits, other = CompactFeatureSet([NUMBER.plural, Feature('foo', 'bar')]).to_bits()
+        >>> CompactFeatureSet.from_bits(bits, other) == CompactFeatureSet(
+        ...     [NUMBER.plural, Feature('foo', 'bar')])
+        True
+
+        """
+        return self._bits, frozenset(super().__iter__())
+
+    @classmethod
+    def from_bits(cls, bits, other=()):
+        """Return a new set with the features returned by `to_bits()`. """
+        rv = cls(other)
+        rv._bits = bits
         return rv
@@ -22,7 +22,8 @@ class Lexicaliser(object):
     
     """
 
-    default_templates = {'string_message_spec': Clause(subject=Var('val'))}
+    # frozen templates are shared instead of being copied for each message
+    default_templates = {'string_message_spec': Clause(subject=Var('val')).freeze()}
 
     def __init__(self, templates=None, logger=None):
         """Create a new lexicaliser.
@@ -78,9 +79,10 @@ class Lexicaliser(object):
         
         The replacement is looked up in self.templates and kwargs['templates']
         using the `key` of the argument (`Var` instance).
+        A frozen `element` is not copied; the result shares its unchanged parts.
         
         """
-        rv = deepcopy(element)
+        rv = element if element.frozen else element.clone()
         # find arguments
         args = rv.arguments()
         # if there are any variables, replace them by values from templates
@@ -96,7 +98,10 @@ class Lexicaliser(object):
             else:
                 # allow nested templates
                 lexicalised_arg = self.lexicalise(template, **kwargs)
-                rv.replace(arg, lexicalised_arg)
+                if rv.frozen:
+                    rv = rv.replaced(arg, lexicalised_arg)
+                else:
+                    rv.replace_argument(arg.id, lexicalised_arg)
         return rv
 
     def message_specification(self, msg, **kwargs):
@@ -129,7 +134,10 @@ class Lexicaliser(object):
                 lex_val = self(val, **kwargs)
                 log_msg = 'Replacement value for {0}: {1}'
                 self.logger.info(log_msg.format(str(arg), repr(lex_val)))
-                template.replace(arg, lex_val)
+                if template.frozen:
+                    template = template.replaced(arg, lex_val)
+                else:
+                    template.replace_argument(arg.id, lex_val)
             return template
         except Exception as e:
             self.logger.exception('Error in lexicalising MsgSpec: %s', e)
@@ -271,7 +279,13 @@ class Lexicaliser(object):
             key = item.value
         else:
             key = item.id
-        template = deepcopy(available_templates.get(key))
+        template = available_templates.get(key)
+        if isinstance(template, Element):
+            # frozen templates can be shared; `replaced()` copies what it changes
+            if not template.frozen:
+                template = template.clone()
+        else:
+            template = deepcopy(template)
         if template is None:
             self.logger.warning('No template for key "%s" (item %s)', key, item)
             rv = String(item)
@@ -291,10 +305,10 @@ class Lexicaliser(object):
             rv = String(rv)
 
         if not isinstance(item, str):
-            rv.features.update(deepcopy(item.features))
+            rv = _add_features(rv, item.features)
 
         if 'features' in kwargs:
-            rv.features.update(kwargs['features'])
+            rv = _add_features(rv, kwargs['features'])
 
         return rv
 
@@ -311,3 +325,13 @@ class Lexicaliser(object):
             else:
                 raise Exception('Unexpected type "{}".'.format(type(item)))
         return rv
+
+
+def _add_features(element, features):
+    """Add `features` to `element`; a frozen element is copied first. """
+    if not features:
+        return element
+    if element.frozen:
+        return element.with_features(features)
+    element.features.update(features)
+    return element
@@ -2,6 +2,7 @@ import inspect
 
 from nlglib.features import category, NEGATED
 from nlglib.microplanning import String, Element
+from nlglib.microplanning.struct import _binary_reduce_ex
 
 
 class SignatureError(Exception):
@@ -9,6 +10,13 @@ class SignatureError(Exception):
     pass
 
 
+def _copy_attributes(obj):
+    """Return a shallow copy of `obj` (the same as `copy()` without `__copy__()`). """
+    rv = object.__new__(type(obj))
+    rv.__dict__.update(obj.__dict__)
+    return rv
+
+
 class Document:
     """Document represents a container holding information about a document.
 
@@ -40,6 +48,12 @@ class Document:
     def __hash__(self):
         return hash(str(self))
 
+    def __copy__(self):
+        return _copy_attributes(self)
+
+    def __reduce_ex__(self, protocol):
+        return _binary_reduce_ex(self, protocol)
+
     def __repr__(self):
         title = self.title if self.title is not None else 'No title'
         sections = '\n'.join(repr(s) for s in self.sections)
@@ -127,6 +141,12 @@ class Paragraph:
     def __hash__(self):
         return hash(str(self))
 
+    def __copy__(self):
+        return _copy_attributes(self)
+
+    def __reduce_ex__(self, protocol):
+        return _binary_reduce_ex(self, protocol)
+
     def __repr__(self):
         sentences = '\n\t'.join(repr(s) for s in self.sentences)
         return '<Paragraph ({}):\n\t{}>'.format(len(self.sentences), sentences)
@@ -211,6 +231,12 @@ class RhetRel:
             # e.g., [self.nucleus, self.satellite]
             self.order = [getattr(self, attr) for attr in self.element_order]
 
+    def __copy__(self):
+        return _copy_attributes(self)
+
+    def __reduce_ex__(self, protocol):
+        return _binary_reduce_ex(self, protocol)
+
     def __repr__(self):
         elements = ' '.join(repr(x) for x in self.order)
         return '<RhetRel ({}): {}>'.format(self.relation, elements)
@@ -287,6 +313,12 @@ class MsgSpec:
         self.name = name
         self.features = features or {}
 
+    def __copy__(self):
+        return _copy_attributes(self)
+
+    def __reduce_ex__(self, protocol):
+        return _binary_reduce_ex(self, protocol)
+
     def __repr__(self):
         return 'MsgSpec({0}, {1})'.format(self.name, self.features)
 
@@ -312,7 +344,46 @@ class MsgSpec:
 
     # TODO: extract to `Visitable` mixin class
     def accept(self, visitor, element='Element'):
-        """Implementation of the Visitor pattern."""
+        """Implementation of the Visitor pattern.
+
+        Methods defined on the class of the visitor and whether they take
+        `element` are looked up once per class of visitor and class of message.
+        Other handlers (e.g., static methods or ones set on the visitor)
+        are looked up on the visitor on each visit.
+
+        """
+        key = (type(visitor), type(self))
+        try:
+            name, m, takes_element = _msg_handlers[key]
+        except KeyError:
+            name, m, takes_element = _msg_handlers[key] = self._handler(visitor)
+        if m is None or name in getattr(visitor, '__dict__', ()):
+            return self._accept(visitor, element)
+        if takes_element is None:
+            return None
+        if takes_element:
+            return m(visitor, self, element)
+        return m(visitor, self)
+
+    def _handler(self, visitor):
+        """Return the name of the method of `visitor` handling `self`,
+        the function defined on its class (or None if it is not a plain function)
+        and whether it takes the element (None if it cannot be called with `self`).
+
+        """
+        visitor_name = 'visit_' + self.category.lower()
+        m = inspect.getattr_static(type(visitor), visitor_name, None)
+        if not inspect.isfunction(m):
+            return visitor_name, None, None
+        sig = inspect.signature(getattr(visitor, visitor_name))
+        if len(sig.parameters) == 1:
+            return visitor_name, m, False
+        if len(sig.parameters) == 2:
+            return visitor_name, m, True
+        return visitor_name, m, None
+
+    def _accept(self, visitor, element):
+        """Call the method of `visitor` handling `self` looked up on the visitor. """
         visitor_name = 'visit_' + self.category.lower()
         # get the appropriate method of the visitor instance
         m = getattr(visitor, visitor_name)
@@ -332,6 +403,10 @@ class MsgSpec:
             yield self
 
 
+# the handlers of `MsgSpec.accept()` by the classes of visitors and messages
+_msg_handlers = {}
+
+
 class StringMsg(MsgSpec):
     """ Use this as a simple message that contains canned text. """
 
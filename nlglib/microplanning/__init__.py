@@ -3,3 +3,6 @@
 from nlglib.microplanning.struct import *
 from nlglib.microplanning.visitors import *
 from nlglib.microplanning.factories import *
+from nlglib.microplanning.store import *
+from nlglib.microplanning.sharing import *
+from nlglib.microplanning.rewrite import *
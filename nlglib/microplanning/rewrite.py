@@ -0,0 +1,140 @@
+"""This module contains a tree-rewrite engine applying rules to syntax trees in one traversal."""
+
+from nlglib.microplanning.struct import Element, raise_to_element, _mutable_class
+
+__all__ = ['Rewriter', 'REMOVE']
+
+
+class _Remove(object):
+    """The type of `REMOVE`. """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'REMOVE'
+
+
+# returned by an action to remove the element from its parent
+REMOVE = _Remove()
+
+
+class Rewriter(object):
+    """A set of rules (pattern -> action) applied to the elements of trees.
+
+    A pattern is an element class (matching its subclasses and their frozen
+    counterparts), a category (e.g., `category.NOUN_PHRASE`) or a pair
+    of either and a predicate taking the element. An action takes a matching
+    element and returns None to keep it (the action can change it in place),
+    an element (or a string) replacing it or `REMOVE`. Removed elements
+    are deleted from element lists and replaced by `Element()` elsewhere.
+
+    The rules are compiled into a tuple of actions per element class
+    when the class is first encountered. `rewrite()` applies all rules
+    in a single post-order traversal, so the actions see the already rewritten
+    constituents of the element. The actions matching an element are called
+    in the order of the rules until one of them replaces or removes it;
+    replacements are not rewritten.
+
+    >>> from nlglib.features import category
+    >>> from nlglib.microplanning import Word, Clause, NP, VP
+    >>> rewriter = Rewriter()
+    >>> @rewriter.rule((category.WORD, lambda x: x.word == 'dog'))
+    ... def cat(word):
+    ...     return Word('cat', word.pos)
+    >>> str(rewriter(Clause(NP('the', 'dog'), VP('run'))))
+    'the cat run'
+
+    """
+
+    __slots__ = ('_rules', '_dispatch')
+
+    def __init__(self, rules=()):
+        # (class or category, predicate or None, action)
+        self._rules = []
+        # actions (pairs of a predicate and an action) by element class
+        self._dispatch = {}
+        for pattern, action in rules:
+            self.add(pattern, action)
+
+    def add(self, pattern, action):
+        """Add a rule applying `action` to the elements matching `pattern`. """
+        predicate = None
+        if isinstance(pattern, tuple):
+            pattern, predicate = pattern
+        if not isinstance(pattern, (str, type)):
+            raise TypeError('The pattern {!r} is not a class or a category'.format(pattern))
+        self._rules.append((pattern, predicate, action))
+        self._dispatch.clear()
+
+    def rule(self, pattern):
+        """Return a decorator adding the decorated function as the action of `pattern`. """
+        def decorator(action):
+            self.add(pattern, action)
+            return action
+        return decorator
+
+    def _compile(self, cls):
+        """Return the actions of the rules matching elements of the class `cls`. """
+        mutable = _mutable_class(cls)
+        rv = tuple((predicate, action)
+                   for pattern, predicate, action in self._rules
+                   if (mutable.category == pattern if isinstance(pattern, str)
+                       else issubclass(mutable, pattern)))
+        self._dispatch[cls] = rv
+        return rv
+
+    def rewrite(self, element):
+        """Apply the rules to `element` and its constituents and return the result.
+
+        The tree is changed in place unless it is frozen; a frozen tree
+        is cloned first (see `Element.clone()`).
+
+        """
+        element = raise_to_element(element)
+        if element.frozen:
+            element = element.clone()
+        dispatch = self._dispatch
+        rv = element
+        # steps of the removed items of element lists by the id of their parent
+        removed = {}
+        # (node, parent, step of the node in the parent, whether the constituents were pushed)
+        stack = [(element, None, None, False)]
+        while stack:
+            node, parent, step, expanded = stack.pop()
+            cls = type(node)
+            if not expanded:
+                stack.append((node, parent, step, True))
+                if cls._constituent_attributes:
+                    constituents = [(x, node, s, False) for s, x in node._constituents()]
+                    stack.extend(reversed(constituents))
+                continue
+            steps = removed.pop(id(node), None)
+            if steps:
+                for name, i in reversed(steps):
+                    items = getattr(node, name)
+                    items[i].parent = None
+                    del items[i]
+            try:
+                actions = dispatch[cls]
+            except KeyError:
+                actions = self._compile(cls)
+            result = None
+            for predicate, action in actions:
+                if predicate is None or predicate(node):
+                    result = action(node)
+                    if result is not None:
+                        break
+            if result is None or result is node:
+                continue
+            if result is REMOVE:
+                if parent is not None and step[1] is not None:
+                    removed.setdefault(id(parent), []).append(step)
+                    continue
+                result = Element()
+            if parent is None:
+                rv = raise_to_element(result)
+            else:
+                parent.replace_at((step,), result)
+        return rv
+
+    __call__ = rewrite
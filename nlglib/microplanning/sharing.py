@@ -0,0 +1,133 @@
+"""This module contains hash-consing of syntax trees (sharing equal subtrees)."""
+
+from nlglib.microplanning.struct import Element, ElementList, Var
+from nlglib.microplanning.struct import _mutable_class, _slot_names
+
+__all__ = ['SubtreeTable']
+
+
+class SubtreeTable(object):
+    """A table of shared frozen subtrees.
+
+    `intern()` returns a frozen copy of a tree in which each ground subtree
+    (one without `Var`s, e.g., words, strings and noun phrases of names)
+    is the first equal subtree interned into the same table. Trees interned
+    into one table (e.g., all documents of a report batch) therefore keep
+    a single instance of each repeated subtree.
+
+    Subtrees are only shared if they are identical including the features
+    that are not compared by `==` (e.g., DISCOURSE_FUNCTION) and their ids.
+    As shared subtrees are frozen, they cannot be changed through one
+    of the trees; use `replaced()` or `clone()` to derive new trees.
+
+    >>> from nlglib.microplanning import Clause, NounPhrase, VerbPhrase
+    >>> table = SubtreeTable()
+    >>> c1 = table.intern(Clause(NounPhrase('John'), VerbPhrase('run')))
+    >>> c2 = table.intern(Clause(NounPhrase('John'), VerbPhrase('walk')))
+    >>> c1.subject is c2.subject
+    True
+
+    """
+
+    __slots__ = ('_nodes', 'seen')
+
+    def __init__(self):
+        # shared nodes by their keys (see `_key()`)
+        self._nodes = {}
+        # the number of ground nodes interned (including the shared ones)
+        self.seen = 0
+
+    def __len__(self):
+        """Return the number of distinct subtrees in the table. """
+        return len(self._nodes)
+
+    def intern(self, obj):
+        """Intern the element `obj` or the elements of a document or paragraph.
+
+        The shared frozen element is returned. A mutable `obj` is not changed;
+        a frozen copy of it is interned (see `Element.freeze()`). A frozen
+        `obj` is interned as it is (it is returned unless an equal element
+        was interned before) and its constituents are replaced by the shared
+        ones. Sections of documents and sentences of paragraphs are replaced
+        in place by the shared elements and `obj` is returned.
+
+        """
+        if isinstance(obj, Element):
+            return self._intern_tree(obj if obj.frozen else obj.clone().freeze())
+        from nlglib.macroplanning import Document, Paragraph
+        if isinstance(obj, Document):
+            if obj.title is not None:
+                obj._title = self.intern(obj.title)
+            obj._sections = [self.intern(x) for x in obj.sections]
+        elif isinstance(obj, Paragraph):
+            obj._sentences = [self.intern(x) for x in obj.sentences]
+        return obj
+
+    def _intern_tree(self, element):
+        # the shared node of each node of the tree (by id) and the ids of non-ground nodes
+        shared = {}
+        not_ground = set()
+        stack = [(element, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in shared:
+                continue
+            if not expanded:
+                stack.append((node, True))
+                for name in _slot_names(type(node)):
+                    value = getattr(node, name)
+                    if isinstance(value, Element):
+                        stack.append((value, False))
+                    elif isinstance(value, ElementList):
+                        stack.extend((x, False) for x in value)
+                continue
+            key = self._key(node, shared, not_ground)
+            if key is None:
+                not_ground.add(id(node))
+                shared[id(node)] = node
+            else:
+                self.seen += 1
+                shared[id(node)] = self._nodes.setdefault(key, node)
+        return shared[id(element)]
+
+    @staticmethod
+    def _key(node, shared, not_ground):
+        """Replace the constituents of `node` by the shared ones and return
+        the key of `node` or None if the node cannot be shared.
+
+        As the constituents are shared, they are compared by identity.
+
+        """
+        ground = _mutable_class(type(node)) is not Var
+        parts = [_mutable_class(type(node))]
+        for name in _slot_names(type(node)):
+            if name == 'hash':
+                continue
+            value = getattr(node, name)
+            if isinstance(value, Element):
+                x = shared[id(value)]
+                if x is not value:
+                    object.__setattr__(node, name, x)
+                ground = ground and id(x) not in not_ground
+                parts.append(id(x))
+            elif isinstance(value, ElementList):
+                for i, item in enumerate(value):
+                    x = shared[id(item)]
+                    if x is not item:
+                        list.__setitem__(value, i, x)
+                    ground = ground and id(x) not in not_ground
+                parts.append(tuple(id(x) for x in value))
+                parts.append(frozenset(value._features or ()))
+            elif name == '_features':
+                parts.append(frozenset(value))
+            else:
+                parts.append(value)
+        if not ground:
+            return None
+        key = tuple(parts)
+        try:
+            hash(key)
+        except TypeError:
+            # e.g., an id that is a list
+            return None
+        return key
@@ -0,0 +1,309 @@
+"""This module contains a columnar store for large collections of syntax trees."""
+
+from array import array
+
+from nlglib.features import category, CompactFeatureSet
+from nlglib.microplanning.struct import Element, ElementList, Phrase
+from nlglib.microplanning.struct import _mutable_class, _new_list, _slot_names
+from nlglib.microplanning.visitors import SimpleStrVisitor
+
+__all__ = ['TreeStore', 'StoredElement']
+
+# markers of the slots (in `TreeStore.extras`) holding the text of a node or an element list
+_TEXT = object()
+_LIST = object()
+
+# attributes of elements that are properties backed by a slot
+_PROPERTIES = {'head': '_head', 'specifier': '_spec', 'subject': '_subject', 'predicate': '_predicate'}
+
+
+class TreeStore(object):
+    """A store of syntax trees kept in parallel arrays instead of `Element` objects.
+
+    Each node of a tree is a position in the arrays (the columns):
+
+    * `kinds` - index of the class of the node in `classes`
+    * `parents` - index of the parent node (-1 for roots)
+    * `slots` - index of the name of the slot of the parent holding the node in `values`
+    * `first_child`, `child_count` - the range of the children of the node;
+      the nodes of each tree are added breadth-first so the children are contiguous
+    * `texts` - index of the word or string of the node in `values` (-1 if none)
+    * `ids` - index of the id of the node in `values` (-1 for None)
+    * `features` - index of the features in `values` as a pair of
+      an integer with the bits of registered features and a frozenset of the others
+    * `extras` - index of the other slots of the node in `values`
+
+    All values (strings, feature pairs, ...) are interned in `values` so each
+    of them is stored once for the whole store. Trees are added by `add()`,
+    converted back to elements by `element()` and walked by visitors
+    through the lightweight views returned by `node()`.
+
+    """
+
+    def __init__(self, elements=()):
+        self.kinds = array('H')
+        self.parents = array('l')
+        self.slots = array('l')
+        self.first_child = array('l')
+        self.child_count = array('l')
+        self.texts = array('l')
+        self.ids = array('l')
+        self.features = array('l')
+        self.extras = array('l')
+        self.roots = array('l')
+        self.classes = []
+        self.values = []
+        # features of non-empty element lists indexed by (node, slot name)
+        self.list_features = {}
+        self._class_ids = {}
+        self._value_ids = {}
+        for e in elements:
+            self.add(e)
+
+    def __len__(self):
+        """Return the number of nodes in the store. """
+        return len(self.kinds)
+
+    def __iter__(self):
+        """Iterate over views of the stored trees. """
+        for root in self.roots:
+            yield StoredElement(self, root)
+
+    def _intern(self, value):
+        # the type is part of the key so that e.g. 1 and True are different values
+        key = (type(value), value)
+        try:
+            return self._value_ids[key]
+        except KeyError:
+            self._value_ids[key] = len(self.values)
+        except TypeError:
+            # unhashable values (e.g., a list held by a Var) are stored without interning
+            pass
+        self.values.append(value)
+        return len(self.values) - 1
+
+    def add(self, element):
+        """Add a tree to the store and return the index of its root. """
+        root = len(self.kinds)
+        pending = [element]
+        self._append(element, -1, -1)
+        i = root
+        while i < len(self.kinds):
+            node = pending[i - root]
+            self.first_child[i] = len(self.kinds)
+            extras = []
+            for name in _slot_names(type(node)):
+                if name in ('_features', 'id', 'hash'):
+                    continue
+                value = getattr(node, name)
+                if isinstance(value, Element):
+                    pending.append(value)
+                    self._append(value, i, self._intern(name))
+                elif isinstance(value, ElementList):
+                    extras.append((name, _LIST))
+                    if value._features:
+                        self.list_features[(i, name)] = self._features_id(value._features)
+                    for x in value:
+                        pending.append(x)
+                        self._append(x, i, self._intern(name))
+                elif isinstance(value, str) and name in ('word', 'value'):
+                    self.texts[i] = self._intern(value)
+                    extras.append((name, _TEXT))
+                else:
+                    extras.append((name, value))
+            if getattr(node, '__dict__', None):
+                raise TypeError('Cannot store attributes outside of __slots__ of {}'
+                                .format(type(node).__name__))
+            self.extras[i] = self._intern(tuple(extras))
+            self.child_count[i] = len(self.kinds) - self.first_child[i]
+            i += 1
+        self.roots.append(root)
+        return root
+
+    def _append(self, element, parent, slot):
+        cls = _mutable_class(type(element))
+        kind = self._class_ids.get(cls)
+        if kind is None:
+            kind = self._class_ids[cls] = len(self.classes)
+            self.classes.append(cls)
+        self.kinds.append(kind)
+        self.parents.append(parent)
+        self.slots.append(slot)
+        self.first_child.append(-1)
+        self.child_count.append(0)
+        self.texts.append(-1)
+        self.ids.append(-1 if element.id is None else self._intern(element.id))
+        self.features.append(self._features_id(element.features))
+        self.extras.append(-1)
+
+    def _features_id(self, features):
+        if type(features) is not CompactFeatureSet:
+            features = CompactFeatureSet(features)
+        return self._intern(features.to_bits())
+
+    def feature_set(self, index):
+        """Return a new feature set with the features of the node at `index`. """
+        bits, other = self.values[self.features[index]]
+        return _feature_set(bits, other)
+
+    def children(self, index):
+        """Return the range of indices of the children of the node at `index`. """
+        first = self.first_child[index]
+        return range(first, first + self.child_count[index])
+
+    def node(self, index):
+        """Return a view of the node at `index`. """
+        return StoredElement(self, index)
+
+    def element(self, index):
+        """Return the node at `index` and its descendants as `Element` instances. """
+        rv = object.__new__(self.classes[self.kinds[index]])
+        object.__setattr__(rv, 'parent', None)
+        stack = [(index, rv)]
+        while stack:
+            i, node = stack.pop()
+            values = self.values
+            object.__setattr__(node, 'id', None if self.ids[i] == -1 else values[self.ids[i]])
+            object.__setattr__(node, 'hash', -1)
+            node.features = self.feature_set(i)
+            for name, value in values[self.extras[i]]:
+                if value is _TEXT:
+                    value = values[self.texts[i]]
+                elif value is _LIST:
+                    features_id = self.list_features.get((i, name))
+                    features = None if features_id is None else _feature_set(*values[features_id])
+                    value = _new_list(ElementList, (), node, features)
+                object.__setattr__(node, name, value)
+            for c in self.children(i):
+                child = object.__new__(self.classes[self.kinds[c]])
+                object.__setattr__(child, 'parent', node)
+                name = values[self.slots[c]]
+                current = getattr(node, name, None)
+                if isinstance(current, ElementList):
+                    list.append(current, child)
+                else:
+                    object.__setattr__(node, name, child)
+                stack.append((c, child))
+        return rv
+
+    def elements(self):
+        """Return a generator of the stored trees as `Element` instances. """
+        for root in self.roots:
+            yield self.element(root)
+
+
+def _feature_set(bits, other):
+    if Element.feature_set_class is CompactFeatureSet:
+        return CompactFeatureSet.from_bits(bits, other)
+    rv = Element.feature_set_class(other)
+    rv.update(list(CompactFeatureSet.from_bits(bits)))
+    return rv
+
+
+class StoredElement(object):
+    """A view of a node in a `TreeStore` that visitors can walk instead of an `Element`.
+
+    The views provide the attributes of the corresponding elements
+    (e.g., `head`, `complements` or `word`). They are created as the tree
+    is walked and cache their features and constituents, so visitors that
+    change features while walking (like the basic `RealisationVisitor`)
+    work as they do on elements; the changes are not written to the store.
+
+    """
+
+    __slots__ = ('store', 'index', '_features', '_attributes')
+
+    frozen = False
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        self._features = None
+        self._attributes = None
+
+    @property
+    def category(self):
+        return self.store.classes[self.store.kinds[self.index]].category
+
+    @property
+    def id(self):
+        i = self.store.ids[self.index]
+        return None if i == -1 else self.store.values[i]
+
+    @property
+    def features(self):
+        if self._features is None:
+            self._features = self.store.feature_set(self.index)
+        return self._features
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if self._attributes is None:
+            self._attributes = self._load_attributes()
+        try:
+            return self._attributes[name]
+        except KeyError:
+            msg = '{} has no attribute {}'.format(self.category, name)
+            raise AttributeError(msg) from None
+
+    def _load_attributes(self):
+        store, index = self.store, self.index
+        rv = {}
+        for name, value in store.values[store.extras[index]]:
+            if value is _TEXT:
+                value = store.values[store.texts[index]]
+            elif value is _LIST:
+                value = []
+            rv[name] = value
+        for c in store.children(index):
+            name = store.values[store.slots[c]]
+            if isinstance(rv.get(name), list):
+                rv[name].append(StoredElement(store, c))
+            else:
+                rv[name] = StoredElement(store, c)
+        for public, private in _PROPERTIES.items():
+            if private in rv:
+                rv[public] = rv[private]
+        if '_predicate' in rv:
+            # the predicate is the head of a clause
+            rv['head'] = rv['_predicate']
+        return rv
+
+    def __bool__(self):
+        cls = self.store.classes[self.store.kinds[self.index]]
+        if issubclass(cls, Phrase):
+            return any(StoredElement(self.store, c) for c in self.store.children(self.index))
+        if cls.category == category.STRING:
+            return len(self.value) > 0
+        if cls.category == category.COORDINATION:
+            return len(self.coords) > 0
+        return cls.category != category.ELEMENT
+
+    def __contains__(self, feature_name):
+        return feature_name in self.features
+
+    def __getitem__(self, feature_name):
+        return self.features.get(feature_name)
+
+    def __setitem__(self, feature_name, feature_value):
+        self.features[feature_name] = feature_value
+
+    def __delitem__(self, feature_name):
+        self.features.discard(feature_name)
+
+    def __repr__(self):
+        return '<StoredElement {} #{}>'.format(self.category, self.index)
+
+    def __str__(self):
+        v = SimpleStrVisitor()
+        self.accept(v)
+        return str(v)
+
+    def accept(self, visitor, **kwargs):
+        """Implementation of the Visitor pattern (see `Element.accept()`). """
+        return getattr(visitor, self.category.lower())(self, **kwargs)
+
+    def element(self):
+        """Return the node as an `Element` (see `TreeStore.element()`). """
+        return self.store.element(self.index)
@@ -4,16 +4,20 @@
 # TODO: check deepcopy
 # TODO: create module `element_algebra` and pud add/iadd into it
 
-import collections
 import json
+import pickle
+import weakref
 
 from copy import deepcopy
 from functools import wraps
+from itertools import islice
 
 from nlglib.features import NON_COMPARABLE_FEATURES, TRANSFERABLE_FEATURES
-from nlglib.features import FeatureSet, DISCOURSE_FUNCTION, category
+from nlglib.features import FeatureSet, CompactFeatureSet, DISCOURSE_FUNCTION, category
 
 _sentinel = object()
+# `id()`, as the name is shadowed by the arguments of many methods
+_object_id = id
 
 __all__ = [
     'Element',
@@ -38,6 +42,12 @@ __all__ = [
     'is_phrase_type',
     'is_clause_type',
     'raise_to_element',
+    'walk',
+    'ParentIndex',
+    'PARENT_MODES',
+    'set_parent_mode',
+    'get_parent_mode',
+    'reset_parents',
     'raise_to_phrase',
     'raise_to_np',
     'raise_to_vp',
@@ -57,15 +67,52 @@ class Element(object):
 
     """
 
+    # `_arguments` caches the list returned by `arguments()`;
+    # `__weakref__` allows weak parents (see `set_parent_mode()`)
+    __slots__ = ('_features', 'parent', 'id', 'hash', '_arguments', '__weakref__')
+
     category = category.ELEMENT
+    # the type of feature sets of new elements; set to `CompactFeatureSet`
+    # to store features of the registered groups as bits
+    feature_set_class = FeatureSet
+    # True for the frozen counterparts of the classes (see `freeze()`)
+    frozen = False
 
     def __init__(self, features=None, parent=None, id=None):
-        self.features = FeatureSet()
-        self.features.update(features)
+        if type(features) is self.feature_set_class:
+            # copy-on-write; the storage is shared until one of the sets changes
+            self.features = features.copy()
+        else:
+            self.features = self.feature_set_class()
+            self.features.update(features)
         self.parent = parent
         self.id = id
         self.hash = -1
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name == 'hash' or name == 'parent':
+            return
+        if type(value) is ElementList and value.parent is not self:
+            # keep the parent chain intact so that changes of the list
+            # and its elements invalidate the hash of `self`
+            value.parent = self
+            for x in value:
+                x.parent = self
+        if getattr(self, 'hash', -1) != -1:
+            self._invalidate()
+
+    @property
+    def features(self):
+        return self._features
+
+    @features.setter
+    def features(self, value):
+        if value._owner is not None and value._owner is not self:
+            value = value.copy()
+        value._owner = self
+        object.__setattr__(self, '_features', value)
+
     def __copy__(self):
         rv = self.__class__(features=self.features, parent=self.parent, id=self.id)
         return rv
@@ -74,25 +121,167 @@ class Element(object):
     def __deepcopy__(self, memo):
         rv = self.__class__(features=None, parent=None, id=self.id)
         memo[id(self)] = rv
-        rv.features = deepcopy(self.features, memo=memo)
+        rv.features = self.features.copy()
         rv.parent = memo.get(id(self.parent), None)
         return rv
 
+    def __reduce_ex__(self, protocol):
+        return _binary_reduce_ex(self, protocol)
+
+    def clone(self):
+        """Return a deep copy of the element and its constituents.
+
+        Unlike `deepcopy()`, the tree is copied in a single pass without
+        recursion, memo or calling constructors. The parent of each copied
+        constituent is the copy of the element that contains it.
+        The copy of a frozen element is mutable.
+
+        """
+        rv = object.__new__(_mutable_class(type(self)))
+        object.__setattr__(rv, 'parent', None)
+        stack = [(self, rv)]
+        while stack:
+            src, dst = stack.pop()
+            for name in _slot_names(type(src)):
+                value = getattr(src, name)
+                object.__setattr__(dst, name, _clone_value(value, dst, stack))
+            if hasattr(src, '__dict__'):
+                for name, value in src.__dict__.items():
+                    dst.__dict__[name] = _clone_value(value, dst, stack)
+        return rv
+
+    def freeze(self):
+        """Make the element and its constituents immutable and return the element.
+
+        Frozen elements raise `AttributeError` when they are changed,
+        so they can be shared by several trees (and threads). Use `replaced()`
+        and `with_features()` to derive new trees from them or `clone()`
+        to get a mutable copy. The `parent` of frozen elements is None.
+
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.frozen:
+                continue
+            values = [getattr(node, name) for name in _slot_names(type(node))]
+            values.extend(getattr(node, '__dict__', {}).values())
+            for value in values:
+                if isinstance(value, Element):
+                    stack.append(value)
+                elif isinstance(value, ElementList) and not value.frozen:
+                    value.parent = None
+                    value.__class__ = _FrozenElementList
+                    stack.extend(value)
+            object.__setattr__(node, 'parent', None)
+            # the hash of a mutable element can be stale
+            object.__setattr__(node, 'hash', -1)
+            object.__setattr__(node, '__class__', _frozen_class(type(node)))
+        return self
+
+    def replaced(self, one, another, key=lambda x: x):
+        """Return a copy of the element with the first occurrence of `one`
+        replaced by `another` (see `replace()`).
+
+        If the element is frozen, the result is frozen as well and only
+        the constituents on the path to `one` are copied; the rest of the tree
+        is shared with the element. A mutable element is cloned.
+
+        """
+        if not self.frozen:
+            rv = self.clone()
+            rv.replace(one, another, key)
+            return rv
+        if not isinstance(one, Element):
+            one = raise_to_element(one)
+        rv = self._replaced(one, raise_to_element(another), key)
+        return self if rv is None else rv
+
+    def with_features(self, features):
+        """Return a copy of the element with `features` added.
+
+        Only the element itself is copied if it is frozen;
+        the constituents are shared with the original.
+
+        """
+        if not self.frozen:
+            rv = self.clone()
+            rv.features.update(features)
+            return rv
+        rv = self.features.copy()
+        rv.update(features)
+        return self._frozen_copy(_features=rv)
+
+    def _replaced(self, one, another, key):
+        """Return a frozen copy of the element with `one` replaced
+        or None if `one` is not among the constituents.
+
+        """
+        return None
+
+    def _frozen_copy(self, **slots):
+        """Return a shallow copy of a frozen element with some of the slots changed. """
+        rv = object.__new__(type(self))
+        for name in _slot_names(type(self)):
+            object.__setattr__(rv, name, slots[name] if name in slots else getattr(self, name))
+        if hasattr(self, '__dict__'):
+            rv.__dict__.update(self.__dict__)
+        object.__setattr__(rv, 'parent', None)
+        object.__setattr__(rv, 'hash', -1)
+        if '_features' in slots:
+            rv.features._owner = rv
+        return rv
+
     def __bool__(self):
         """Because Element is abstract, it will evaluate to false. """
         return False
 
     def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Element):
+            return False
+        # the cached structural hashes of frozen elements cannot be stale
+        # (a mutable constituent can have several parents and only one of them
+        # is invalidated) so most unequal frozen elements are rejected
+        # without walking their constituents
+        if self.frozen and other.frozen and hash(self) != hash(other):
+            return False
         return (
-            isinstance(other, Element) and self.id == other.id and
+            self.id == other.id and
             self.category == other.category and
-            comparable_features(self.features) == comparable_features(other.features)
+            self.features.fingerprint(NON_COMPARABLE_FEATURES) ==
+            other.features.fingerprint(NON_COMPARABLE_FEATURES)
         )
 
     def __hash__(self):
-        if self.hash == -1:
-            self.hash = hash(str(self))
-        return self.hash
+        rv = self.hash
+        if rv == -1:
+            rv = self.hash = self._structural_hash()
+        return rv
+
+    def _structural_hash(self):
+        """Return a hash computed from the hashes of the constituents.
+
+        Only the parts compared by `__eq__` can be used.
+
+        """
+        fingerprint = self.features.fingerprint(NON_COMPARABLE_FEATURES)
+        try:
+            return hash((self.category, self.id, fingerprint))
+        except TypeError:
+            # an unhashable id; equal elements still get equal hashes
+            return hash((self.category, fingerprint))
+
+    def _invalidate(self):
+        """Reset the cached hash of the element and of its ancestors. """
+        node = self
+        # a computed hash of a parent implies computed hashes of its children
+        # so we can stop at the first node without a hash
+        while node is not None and getattr(node, 'hash', -1) != -1:
+            object.__setattr__(node, 'hash', -1)
+            object.__setattr__(node, '_arguments', None)
+            node = getattr(node, 'parent', None)
 
     def __repr__(self):
         from . import visitors
@@ -144,9 +333,21 @@ class Element(object):
     @classmethod
     def from_dict(cls, dct):
         o = cls(None, None, None)
-        o.__dict__.update(dct)
+        for k, v in dct.items():
+            setattr(o, k, v)
         return o
 
+    def to_dict(self):
+        """Return the attributes of the element as a dict (without `parent`). """
+        rv = {'features': self.features}
+        for klass in reversed(type(self).__mro__):
+            for k in klass.__dict__.get('__slots__', ()):
+                if k not in ('_features', 'parent', '_arguments', '__weakref__'):
+                    rv[k] = getattr(self, k)
+        rv.update(getattr(self, '__dict__', {}))
+        rv['parent'] = None
+        return rv
+
     @classmethod
     def from_json(cls, s):
         return json.loads(s, cls=ElementDecoder)
@@ -164,7 +365,22 @@ class Element(object):
             return str(visitor.xml)
 
     def accept(self, visitor, **kwargs):
-        """Implementation of the Visitor pattern."""
+        """Implementation of the Visitor pattern.
+
+        The handlers of visitors derived from `visitors.Visitor` are looked up
+        once per class of visitor and class of element.
+
+        """
+        try:
+            m = type(visitor)._handlers[type(self)]
+        except KeyError:
+            m = type(visitor).handler(type(self))
+        except AttributeError:
+            return self._accept(visitor, **kwargs)
+        return m(visitor, self, **kwargs)
+
+    def _accept(self, visitor, **kwargs):
+        """Call the method of `visitor` handling `self` (visitors not derived from `Visitor`). """
         visitor_method_name = self.category.lower()
         # get the appropriate method of the visitor instance
         m = getattr(visitor, visitor_method_name)
@@ -182,19 +398,43 @@ class Element(object):
         :param str itself: yield `self` as one of the elements; values in (None, 'first', 'last')
 
         """
-        if itself or recursive and self.category != category.ELEMENT:
+        if recursive:
+            yield from walk(self, itself)
+        elif itself:
             yield self
 
+    # composite elements define a method pushing their constituents
+    # onto the stack of `walk()` in reverse order
+    _push_constituents = None
+
     def arguments(self):
         """Return any arguments (vars) from the element as a list. """
-        return [x for x in self.elements(recursive=True) if x.category == category.VAR]
+        return list(self._argument_list())
+
+    def _argument_list(self):
+        """Return the cached list of arguments; the list is dropped
+        by `_invalidate()` when the element or its constituents change.
+
+        """
+        rv = getattr(self, '_arguments', None)
+        if rv is None:
+            rv = []
+            # changes of constituents only reach elements with a computed hash;
+            # hashing in post-order computes each hash from cached ones
+            for x in walk(self, 'last'):
+                hash(x)
+                if x.category == category.VAR:
+                    rv.append(x)
+            object.__setattr__(self, '_arguments', rv)
+        return rv
 
-    def replace(self, one, another, key=lambda x: x):
+    def replace(self, one, another, key=lambda x: x, recursive=True):
         """Replace the first occurrence of `one` by `another`.
 
         :param one: a constituent to replace; will be raised to element
         :param another: a replacement element; will be raised to element
         :param key: a key function for comparison; default is identity
+        :param recursive: also look for `one` in the constituents of constituents
         :returns: True if replacement occurred; False otherwise
         
         """
@@ -204,11 +444,40 @@ class Element(object):
         """Replace an argument with given `id` by `replacement`
         if such argument exists.
 
+        The argument is looked up in the cached `arguments()` and replaced
+        in its parent so the rest of the tree is not searched.
+
         """
-        for a in self.arguments():
+        args = self._argument_list()
+        for i, a in enumerate(args):
             if a.id == id:
-                return self.replace(a, replacement)
-        return False
+                break
+        else:
+            return False
+        parent = a.parent
+        node = parent
+        while node is not None and node is not self:
+            node = node.parent
+        if node is None or self.frozen:
+            # `a` is `self` or the parents can't be followed
+            return self.replace(a, replacement)
+        another = raise_to_element(replacement)
+        if not parent.replace(a, another, key=_object_id, recursive=False):
+            return self.replace(a, replacement)
+        # the replacement dropped the cached list; update and keep it
+        new_args = []
+        for x in walk(another, 'last'):
+            hash(x)
+            if x.category == category.VAR:
+                new_args.append(x)
+        args[i:i + 1] = new_args
+        node = parent
+        while node is not self:
+            hash(node)
+            node = node.parent
+        hash(self)
+        object.__setattr__(self, '_arguments', args)
+        return True
 
     def replace_arguments(self, **kwargs):
         """Replace arguments with ids in the kwargs 
@@ -218,6 +487,96 @@ class Element(object):
         for k, v in kwargs.items():
             self.replace_argument(k, v)
 
+    # names of the attributes holding the constituents of composite elements;
+    # the steps of the paths returned by `locate()` refer to them
+    _constituent_attributes = ()
+
+    def _constituents(self):
+        """Yield pairs of a path step and a constituent (see `locate()`). """
+        for name in self._constituent_attributes:
+            value = getattr(self, name)
+            if isinstance(value, ElementList):
+                for i, x in enumerate(value):
+                    yield (name, i), x
+            elif isinstance(value, Element):
+                yield (name, None), value
+
+    def locate(self, node):
+        """Return the path from the element to its constituent `node`
+        or None if `node` is not in the element.
+
+        A path is a tuple of steps `(attribute, index)` where `index`
+        is the position in an element list or None for other attributes,
+        e.g., `(('predicate', None), ('complements', 0))`. The constituent
+        is found by identity so structurally equal constituents have
+        different paths. The parents of `node` are followed if they lead
+        to the element; otherwise the element is searched.
+
+        """
+        if node is self:
+            return ()
+        path = []
+        child, parent = node, getattr(node, 'parent', None)
+        while parent is not None:
+            step = next((s for s, x in parent._constituents() if x is child), None)
+            if step is None:
+                break
+            path.append(step)
+            if parent is self:
+                return tuple(reversed(path))
+            child, parent = parent, parent.parent
+        # the parents can't be followed (e.g., frozen or shared constituents)
+        stack = [((), self)]
+        while stack:
+            path, element = stack.pop()
+            constituents = list(element._constituents())
+            for step, x in constituents:
+                if x is node:
+                    return path + (step,)
+            stack.extend((path + (step,), x) for step, x in reversed(constituents))
+        return None
+
+    def element_at(self, path):
+        """Return the constituent at `path` (see `locate()`).
+
+        :raises AttributeError, IndexError: if the path is not in the element
+
+        """
+        node = self
+        for name, i in path:
+            node = getattr(node, name)
+            if i is not None:
+                node = node[i]
+        return node
+
+    def replace_at(self, path, another):
+        """Replace the constituent at `path` (see `locate()`) by `another`.
+
+        Unlike `replace()`, only the parent of the constituent is searched
+        and constituents equal to the replaced one are never affected.
+
+        :returns: True if replacement occurred; False if the path is empty
+
+        """
+        if not path:
+            return False
+        parent = self.element_at(path[:-1])
+        name, i = path[-1]
+        one = parent.element_at(path[-1:])
+        another = raise_to_element(another)
+        if parent.replace(one, another, key=_object_id, recursive=False):
+            return True
+        # `replace()` doesn't look at some constituents (e.g., front modifiers)
+        if one.parent is parent:
+            one.parent = None
+        transfer_features(one, another)
+        if i is None:
+            another.parent = parent
+            setattr(parent, name, another)
+        else:
+            getattr(parent, name)[i] = another
+        return True
+
     @property
     def string(self):
         """Return the string inside the value. """
@@ -229,6 +588,92 @@ class Element(object):
             self.parent = parent
 
 
+def _binary_reduce_ex(obj, protocol):
+    """Return the arguments for pickling `obj` in the format of `nlglib.binary`.
+
+    The parents of `obj` are not pickled. Objects that the format cannot
+    encode (e.g. instances of subclasses of elements) are pickled as usual.
+
+    """
+    from nlglib import binary
+    try:
+        return binary.loads, (binary.dumps(obj),)
+    except (TypeError, AttributeError, pickle.PicklingError):
+        return object.__reduce_ex__(obj, protocol)
+
+
+# slots of element classes (other than `parent` and the cached `_arguments`)
+# copied by `Element.clone()`
+_clone_slots = {}
+
+
+def _slot_names(cls):
+    try:
+        return _clone_slots[cls]
+    except KeyError:
+        names = tuple(
+            name
+            for klass in reversed(cls.__mro__)
+            for name in klass.__dict__.get('__slots__', ())
+            if name not in ('parent', '_arguments', '__weakref__')
+        )
+        _clone_slots[cls] = names
+        return names
+
+
+def _mutable_class(cls):
+    """Return the mutable counterpart of a frozen class (or `cls`). """
+    return getattr(cls, '_mutable_class', cls)
+
+
+def _clone_node(element, parent, stack):
+    rv = object.__new__(_mutable_class(type(element)))
+    object.__setattr__(rv, 'parent', parent)
+    stack.append((element, rv))
+    return rv
+
+
+def _clone_value(value, parent, stack):
+    """Return a copy of an attribute `value` of an element being cloned;
+    elements are only allocated here and filled in later from `stack`.
+
+    """
+    if isinstance(value, Element):
+        return _clone_node(value, parent, stack)
+    if isinstance(value, ElementList):
+        items = [_clone_node(x, parent, stack) for x in value]
+        return _new_list(_mutable_class(type(value)), items, parent, _copy_features(value._features))
+    if isinstance(value, FeatureSet):
+        rv = value.copy()
+        rv._owner = parent
+        return rv
+    return value
+
+
+def _adopted(old, another, function=None, raise_fn=None):
+    """Return a frozen copy of `another` prepared to replace `old`
+    the same way `replace()` prepares it.
+
+    """
+    rv = another.clone()
+    transfer_features(old, rv)
+    if raise_fn is not None:
+        rv = raise_fn(rv)
+    if function is not None:
+        rv[DISCOURSE_FUNCTION] = function
+    return rv.freeze()
+
+
+def _frozen_list(lst, i, value):
+    """Return a copy of the frozen list `lst` with the item at `i`
+    replaced by `value` or removed if `value` is None.
+
+    """
+    items = list(lst)
+    items[i:i + 1] = [] if value is None else [value]
+    return _new_list(type(lst), items, None, lst._features)
+
+
 # decorator
 def str_or_element(fn):
 
@@ -246,71 +691,157 @@ def str_or_element(fn):
     return helper
 
 
-class ElementList(collections.UserList):
+class ElementList(list):
+    """A list of the constituents of an element (e.g., the premodifiers of a phrase).
+
+    Items are raised to elements when they are added and their `parent`
+    is set to the `parent` of the list. The `features` of the list
+    are added to the items; the feature set is only created when used.
+
+    """
+
+    __slots__ = ('parent', '_features')
+
     category = category.ELEMENT_LIST
+    frozen = False
 
-    def __init__(self, lst=None, parent=None, features=FeatureSet()):
+    def __init__(self, lst=None, parent=None, features=None):
         super().__init__()
         self.parent = parent
-        self.features = FeatureSet()
-        self.features.update(features)
-        for o in lst or []:
-            self.append(o)
+        self._features = None
+        if features:
+            self.features.update(features)
+        if lst:
+            self.extend(lst)
+
+    @property
+    def features(self):
+        if self._features is None:
+            self._features = FeatureSet()
+        return self._features
+
+    @features.setter
+    def features(self, value):
+        self._features = value
+
+    @property
+    def data(self):
+        """The list itself (for compatibility with `collections.UserList`). """
+        return self
+
+    def _attach(self, items):
+        """Raise `items` to elements and make them constituents of the parent. """
+        items = [raise_to_element(x) for x in items]
+        parent, features = self.parent, self._features
+        for x in items:
+            x.parent = parent
+            if features:
+                x.features.update(features)
+        return items
 
     def append(self, item):
-        item = raise_to_element(item)
-        item.parent = self.parent
-        item.features.update(self.features)
-        super().append(item)
+        super().append(self._attach((item,))[0])
+        self._invalidate()
 
     def insert(self, i, item):
-        item = raise_to_element(item)
-        item.parent = self.parent
-        item.features.update(self.features)
-        super().insert(i, item)
+        super().insert(i, self._attach((item,))[0])
+        self._invalidate()
+
+    def extend(self, other):
+        super().extend(self._attach(other))
+        self._invalidate()
 
     def remove(self, item):
         raised_item = raise_to_element(item)
         super().remove(raised_item)
+        self._invalidate()
+
+    def pop(self, i=-1):
+        rv = super().pop(i)
+        self._invalidate()
+        return rv
+
+    def clear(self):
+        super().clear()
+        self._invalidate()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._invalidate()
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate()
+
+    def copy(self):
+        return _new_list(ElementList, self, None, _copy_features(self._features))
+
+    def __copy__(self):
+        return _new_list(type(self), self, self.parent, self._features)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return _new_list(ElementList, super().__getitem__(i), None,
+                             _copy_features(self._features))
+        return super().__getitem__(i)
+
+    def __delitem__(self, i):
+        super().__delitem__(i)
+        self._invalidate()
 
     def __contains__(self, item):
         raised_item = raise_to_element(item)
         return super().__contains__(raised_item)
 
     def __iadd__(self, other):
-        if isinstance(other, (ElementList, list, tuple)):
-            for x in other:
-                self.append(x)
+        if isinstance(other, (list, tuple)):
+            self.extend(other)
         else:
             self.append(other)
         return self
 
     def __add__(self, other):
-        rv = ElementList(self, parent=self.parent, features=self.features)
+        rv = ElementList(self, parent=self.parent, features=self._features)
         rv += other
         return rv
 
     def __setitem__(self, i, value):
-        value = raise_to_element(value)
-        value.parent = self.parent
-        value.features.update(self.features)
-        super().__setitem__(i, value)
+        if isinstance(i, slice):
+            super().__setitem__(i, self._attach(value))
+        else:
+            super().__setitem__(i, self._attach((value,))[0])
+        self._invalidate()
+
+    def __reduce_ex__(self, protocol):
+        return _binary_reduce_ex(self, protocol)
+
+    def __reduce__(self):
+        # used if the list cannot be pickled by `_binary_reduce_ex()`;
+        # the items are restored by `__setstate__()` instead of `extend()`
+        # so that frozen lists can be unpickled
+        return _new_list, (type(self),), (list(self), self.parent, self._features)
+
+    def __setstate__(self, state):
+        items, self.parent, self._features = state
+        super().extend(items)
 
     # noinspection PyArgumentList
     def __deepcopy__(self, memo):
         rv = self.__class__()
         memo[id(self)] = rv
         rv.parent = memo.get(id(self.parent), None)
-        rv.features = deepcopy(self.features, memo)
+        rv.features = self.features.copy()
         for o in self:
             rv.append(deepcopy(o, memo))
         return rv
 
     @classmethod
     def from_dict(cls, dct):
-        o = cls()
-        o.__dict__.update(dct)
-        return o
+        return _new_list(cls, dct.get('data', ()), dct.get('parent'), dct.get('features'))
+
+    def to_dict(self):
+        """Return the attributes of the list as a dict (without `parent`). """
+        return {'data': list(self), 'parent': None, 'features': self.features}
 
     @classmethod
     def from_json(cls, s):
@@ -330,11 +861,9 @@ class ElementList(collections.UserList):
 
         """
         if recursive:
-            for e in self:
-                yield from e.elements(recursive, itself)
+            yield from walk(self, itself)
         else:
-            for e in self:
-                yield e
+            yield from self
 
     def update_parents(self, parent=_sentinel):
         if parent is not _sentinel:
@@ -342,6 +871,32 @@ class ElementList(collections.UserList):
         for x in self:
             x.update_parents(parent=parent)
 
+    def _invalidate(self):
+        """Reset the cached hash of the element owning the list. """
+        if self.parent is not None:
+            self.parent._invalidate()
+
+
+def _new_list(cls, items=(), parent=None, features=None):
+    """Return an element list of class `cls` holding `items` as they are. """
+    rv = list.__new__(cls)
+    list.extend(rv, items)
+    rv.parent = parent
+    rv._features = features
+    return rv
+
+
+def _copy_features(features):
+    return None if features is None else features.copy()
+
+
+def _items(value):
+    """Return `value` as a sequence of items to add to an element list
+    (a single item unless it is a list or a tuple; see `ElementList.__iadd__()`).
+
+    """
+    return value if isinstance(value, (list, tuple)) else (value,)
+
 
 class Var(Element):
     """An element used as a place-holder in a sentence. The purpose of this
@@ -354,6 +909,8 @@ class Var(Element):
 
     """
 
+    __slots__ = ('value',)
+
     category = category.VAR
 
     def __init__(self, id=None, obj=None, features=None, parent=None):
@@ -369,24 +926,36 @@ class Var(Element):
         return super().__eq__(other) and self.value == other.value
 
     def __hash__(self):
-        if self.hash == -1:
-            self.hash = hash(str(self))
-        return self.hash
+        rv = self.hash
+        if rv == -1:
+            rv = self.hash = self._structural_hash()
+        return rv
+
+    def _structural_hash(self):
+        try:
+            return hash((super()._structural_hash(), self.value))
+        except TypeError:
+            # an unhashable value (e.g., a dict)
+            return super()._structural_hash()
 
     def __copy__(self):
         return self.__class__(self.id, self.value, self.features, self.parent)
 
     # noinspection PyArgumentList
     def __deepcopy__(self, memo):
-        rv = self.__class__(self.id, self.value)
+        rv = self.__class__(self.id, deepcopy(self.value, memo=memo))
         memo[id(self)] = rv
-        rv.features = deepcopy(self.features, memo=memo)
+        rv.features = self.features.copy()
         rv.parent = memo.get(id(self.parent), None)
         return rv
 
     def set_value(self, val):
         if val is None: val = Word(str(self.id), 'NOUN')
-        self.value = String(val) if isinstance(val, str) else val
+        val = String(val) if isinstance(val, str) else val
+        if isinstance(val, Element) and not val.frozen:
+            # changes of the value invalidate the hash of the variable
+            val.parent = self
+        self.value = val
 
     @property
     def string(self):
@@ -397,6 +966,8 @@ class Var(Element):
 class String(Element):
     """String is a basic element representing canned text. """
 
+    __slots__ = ('value',)
+
     category = category.STRING
 
     def __init__(self, value='', features=None, parent=None, id=None):
@@ -411,9 +982,13 @@ class String(Element):
         return super().__eq__(other) and self.value == other.value
 
     def __hash__(self):
-        if self.hash == -1:
-            self.hash = hash(str(self))
-        return self.hash
+        rv = self.hash
+        if rv == -1:
+            rv = self.hash = self._structural_hash()
+        return rv
+
+    def _structural_hash(self):
+        return hash((super()._structural_hash(), self.value))
 
     def __copy__(self):
         return self.__class__(self.value, self.features, self.parent, self.id)
@@ -422,7 +997,7 @@ class String(Element):
     def __deepcopy__(self, memo):
         rv = self.__class__(self.value, None, None, self.id)
         memo[id(self)] = rv
-        rv.features = deepcopy(self.features, memo=memo)
+        rv.features = self.features.copy()
         rv.parent = memo.get(id(self.parent), None)
         return rv
 
@@ -435,6 +1010,8 @@ class String(Element):
 class Word(Element):
     """Word represents word and its corresponding POS (Part-of-Speech) tag. """
 
+    __slots__ = ('word', 'pos', 'do_inflection')
+
     category = category.WORD
 
     def __init__(self, word, pos=None, features=None, parent=None, id=None):
@@ -451,9 +1028,13 @@ class Word(Element):
         return super().__eq__(other) and self.word == other.word and self.pos == other.pos
 
     def __hash__(self):
-        if self.hash == -1:
-            self.hash = hash(str(self))
-        return self.hash
+        rv = self.hash
+        if rv == -1:
+            rv = self.hash = self._structural_hash()
+        return rv
+
+    def _structural_hash(self):
+        return hash((super()._structural_hash(), self.word, self.pos))
 
     def __copy__(self):
         # pos is in features
@@ -466,7 +1047,7 @@ class Word(Element):
         # pos is in features
         rv = self.__class__(self.word, pos=self.pos, features=None, parent=None, id=self.id)
         memo[id(self)] = rv
-        rv.features = deepcopy(self.features, memo=memo)
+        rv.features = self.features.copy()
         rv.parent = memo.get(id(self.parent), None)
         return rv
 
@@ -483,7 +1064,10 @@ class Coordination(Element):
     
     """
 
+    __slots__ = ('coords', 'coordinate_category', 'conj')
+
     category = category.COORDINATION
+    _constituent_attributes = ('coords', 'conj')
 
     def __init__(self, *coords, conj=None, features=None, parent=None, id=None):
         super().__init__(features, parent, id)
@@ -502,9 +1086,13 @@ class Coordination(Element):
         return super().__eq__(other) and self.coords == other.coords
 
     def __hash__(self):
-        if self.hash == -1:
-            self.hash = hash(str(self))
-        return self.hash
+        rv = self.hash
+        if rv == -1:
+            rv = self.hash = self._structural_hash()
+        return rv
+
+    def _structural_hash(self):
+        return hash((super()._structural_hash(), tuple(self.coords)))
 
     def __copy__(self):
         return self.__class__(
@@ -517,7 +1105,7 @@ class Coordination(Element):
         rv = self.__class__(features=None, parent=None, id=self.id)
         memo[id(self)] = rv
         rv.conj = deepcopy(self.conj, memo=memo)
-        rv.features = deepcopy(self.features, memo=memo)
+        rv.features = self.features.copy()
         rv.coords = deepcopy(self.coords, memo=memo)
         rv.parent = memo.get(id(self.parent), None)
         return rv
@@ -528,7 +1116,7 @@ class Coordination(Element):
 
         """
         if isinstance(other, Coordination):
-            rv = Coordination(self, other, features=deepcopy(self.features))
+            rv = Coordination(self, other, features=self.features)
         else:
             rv = deepcopy(self)
             rv.coords.append(other)
@@ -572,8 +1160,7 @@ class Coordination(Element):
 
     def add_coordinates(self, *elts):
         """Add one or more elements as a co-ordinate in the clause. """
-        for e in [raise_to_element(elt) for elt in elts if elt is not None]:
-            self.coords.append(e)
+        self.coords.extend(elt for elt in elts if elt is not None)
             # cat = self.coords[0].cat
             # if not all(x.coordinate_category == cat \
             #            if isinstance(x, Coordination) else x.cat == cat for x in self.coords):
@@ -588,25 +1175,31 @@ class Coordination(Element):
         :param str itself: yield `self` as one of the elements; values in (None, 'first', 'last')
 
         """
+        if recursive:
+            yield from walk(self, itself)
+            return
+
         if itself == 'first':
             yield self
 
         for i, e in enumerate(self.coords, start=1):
             if i == len(self.coords) and self.conj:
-                if recursive:
-                    yield from self.conj.elements(recursive, itself)
-                else:
-                    if self.conj:
-                        yield self.conj
-            if recursive:
-                yield from e.elements(recursive, itself)
-            else:
-                yield e
+                yield self.conj
+            yield e
 
         if itself == 'last':
             yield self
 
-    def replace(self, one, another, key=lambda x: x):
+    def _push_constituents(self, stack):
+        coords = self.coords
+        if coords:
+            # the conjunction precedes the last coordinate
+            stack.append(coords[-1])
+            if self.conj:
+                stack.append(self.conj)
+            stack.extend(islice(reversed(coords), 1, None))
+
+    def replace(self, one, another, key=lambda x: x, recursive=True):
         """Replace first occurrence of `one` with `another`.
         
         Return True if successful, False if `one` not found. 
@@ -626,10 +1219,20 @@ class Coordination(Element):
                     del self.coords[i]
                 return True
             else:
-                if o.replace(one, another):
+                if recursive and o.replace(one, another, key):
                     return True
         return False
 
+    def _replaced(self, one, another, key):
+        for i, o in enumerate(self.coords):
+            if key(o) == key(one):
+                value = _adopted(o, another) if another else None
+                return self._frozen_copy(coords=_frozen_list(self.coords, i, value))
+            rv = o._replaced(one, another, key)
+            if rv is not None:
+                return self._frozen_copy(coords=_frozen_list(self.coords, i, rv))
+        return None
+
 
 class Phrase(Element):
     """A base class for all kinds of phrases - elements containing other
@@ -638,15 +1241,18 @@ class Phrase(Element):
 
     """
 
-    _head = Element()
+    __slots__ = ('premodifiers', '_head', 'complements', 'postmodifiers')
+
     category = category.PHRASE
+    _constituent_attributes = ('premodifiers', 'head', 'complements', 'postmodifiers')
 
     def __init__(self, features=None, parent=None, id=None, **kwargs):
+        self._head = None
         super().__init__(features, parent, id)
-        self.premodifiers = (ElementList(parent=self) + kwargs.pop('premodifiers', []))
+        self.premodifiers = ElementList(_items(kwargs.pop('premodifiers', ())), parent=self)
         self.head = kwargs.pop('head', None)
-        self.complements = (ElementList(parent=self) + kwargs.pop('complements', []))
-        self.postmodifiers = (ElementList(parent=self) + kwargs.pop('postmodifiers', []))
+        self.complements = ElementList(_items(kwargs.pop('complements', ())), parent=self)
+        self.postmodifiers = ElementList(_items(kwargs.pop('postmodifiers', ())), parent=self)
 
     def __bool__(self):
         """Return True """
@@ -660,9 +1266,16 @@ class Phrase(Element):
         )
 
     def __hash__(self):
-        if self.hash == -1:
-            self.hash = hash(str(self))
-        return self.hash
+        rv = self.hash
+        if rv == -1:
+            rv = self.hash = self._structural_hash()
+        return rv
+
+    def _structural_hash(self):
+        return hash((
+            super()._structural_hash(), tuple(self.premodifiers), self.head,
+            tuple(self.complements), tuple(self.postmodifiers)
+        ))
 
     def __copy__(self):
         rv = self.__class__(features=self.features, parent=self.parent, id=self.id)
@@ -677,7 +1290,7 @@ class Phrase(Element):
         rv = self.__class__(id=self.id)
         memo[id(self)] = rv
         rv.parent = memo.get(id(self.parent), None)
-        rv.features = deepcopy(self.features, memo=memo)
+        rv.features = self.features.copy()
         rv.premodifiers = deepcopy(self.premodifiers, memo=memo)
         rv.head = deepcopy(self.head, memo=memo)
         rv.complements = deepcopy(self.complements, memo=memo)
@@ -718,22 +1331,29 @@ class Phrase(Element):
         :param str itself: yield `self` as one of the elements; values in (None, 'first', 'last')
 
         """
+        if recursive:
+            yield from walk(self, itself)
+            return
+
         if itself == 'first':
             yield self
 
-        yield from self.premodifiers.elements(recursive, itself)
-        if recursive:
-            yield from self.head.elements(recursive, itself)
-        else:
-            if self.head != Element():
-                yield self.head
-        yield from self.complements.elements(recursive, itself)
-        yield from self.postmodifiers.elements(recursive, itself)
+        yield from self.premodifiers
+        if self.head != _EMPTY_ELEMENT:
+            yield self.head
+        yield from self.complements
+        yield from self.postmodifiers
 
         if itself == 'last':
             yield self
 
-    def _replace_in_list(self, lst, one, another, key):
+    def _push_constituents(self, stack):
+        stack.extend(reversed(self.postmodifiers))
+        stack.extend(reversed(self.complements))
+        stack.append(self.head)
+        stack.extend(reversed(self.premodifiers))
+
+    def _replace_in_list(self, lst, one, another, key, recursive=True):
         for i, o in enumerate(lst):
             if key(o) == key(one):
                 if another is None:
@@ -745,11 +1365,11 @@ class Phrase(Element):
                     lst[i] = another
                 return True
             else:
-                if o.replace(one, another, key):
+                if recursive and o.replace(one, another, key):
                     return True
         return False
 
-    def replace(self, one, another, key=lambda x: x):
+    def replace(self, one, another, key=lambda x: x, recursive=True):
         """Replace first occurrence of `one` with `another`.
         
         Return True if successful.
@@ -759,7 +1379,7 @@ class Phrase(Element):
         one = raise_to_element(one)
         another = raise_to_element(another)
 
-        if self._replace_in_list(self.premodifiers, one, another, key):
+        if self._replace_in_list(self.premodifiers, one, another, key, recursive):
             return True
         # TODO: unify when replacement is a phrase of the same kind?
         if key(self.head) == key(one):
@@ -771,14 +1391,43 @@ class Phrase(Element):
             self.head = another
             self.features.update(another.features)
             return True
-        if self.head.replace(one, another, key):
+        if recursive and self.head.replace(one, another, key):
             return True
-        if self._replace_in_list(self.complements, one, another, key):
+        if self._replace_in_list(self.complements, one, another, key, recursive):
             return True
-        if self._replace_in_list(self.postmodifiers, one, another, key):
+        if self._replace_in_list(self.postmodifiers, one, another, key, recursive):
             return True
         return False
 
+    def _replaced_in_lists(self, names, one, another, key):
+        for name in names:
+            lst = getattr(self, name)
+            for i, o in enumerate(lst):
+                if key(o) == key(one):
+                    value = _adopted(o, another)
+                    return self._frozen_copy(**{name: _frozen_list(lst, i, value)})
+                rv = o._replaced(one, another, key)
+                if rv is not None:
+                    return self._frozen_copy(**{name: _frozen_list(lst, i, rv)})
+        return None
+
+    def _replaced(self, one, another, key):
+        rv = self._replaced_in_lists(('premodifiers',), one, another, key)
+        if rv is not None:
+            return rv
+        if key(self.head) == key(one):
+            head = _adopted(self.head, another, DISCOURSE_FUNCTION.head)
+            features = self.features.copy()
+            for k in self.head.features.keys():
+                if k in features:
+                    del features[k]
+            features.update(head.features)
+            return self._frozen_copy(_head=head, _features=features)
+        rv = self.head._replaced(one, another, key)
+        if rv is not None:
+            return self._frozen_copy(_head=rv)
+        return self._replaced_in_lists(('complements', 'postmodifiers'), one, another, key)
+
     def update_parents(self, parent=_sentinel):
         if parent is not _sentinel:
             self.parent = parent
@@ -803,23 +1452,29 @@ class NounPhrase(Phrase):
      
      """
 
-    _spec = Element()
+    __slots__ = ('_spec',)
+
     category = category.NOUN_PHRASE
+    _constituent_attributes = ('specifier',) + Phrase._constituent_attributes
 
     def __init__(self, head=None, specifier=None, features=None, parent=None, id=None, **kwargs):
+        self._spec = None
         super().__init__(features, parent, id, **kwargs)
         self.specifier = specifier
         self.head = head
 
     def __eq__(self, other):
-        return (
-            super().__eq__(other) and self.specifier == other.specifier and self.head == other.head
-        )
+        # the head is compared by `Phrase.__eq__`
+        return super().__eq__(other) and self.specifier == other.specifier
 
     def __hash__(self):
-        if self.hash == -1:
-            self.hash = hash(str(self))
-        return self.hash
+        rv = self.hash
+        if rv == -1:
+            rv = self.hash = self._structural_hash()
+        return rv
+
+    def _structural_hash(self):
+        return hash((super()._structural_hash(), self.specifier))
 
     def __copy__(self):
         rv = self.__class__(
@@ -859,27 +1514,29 @@ class NounPhrase(Phrase):
         :param str itself: yield `self` as one of the elements; values in (None, 'first', 'last')
 
         """
+        if recursive:
+            yield from walk(self, itself)
+            return
+
         if itself == 'first':
             yield self
 
-        if recursive:
-            yield from self.specifier.elements(recursive, itself)
-        else:
-            if self.specifier != Element():
-                yield self.specifier
-        yield from self.premodifiers.elements(recursive, itself)
-        if recursive:
-            yield from self.head.elements(recursive, itself)
-        else:
-            if self.head != Element():
-                yield self.head
-        yield from self.complements.elements(recursive, itself)
-        yield from self.postmodifiers.elements(recursive, itself)
+        if self.specifier != _EMPTY_ELEMENT:
+            yield self.specifier
+        yield from self.premodifiers
+        if self.head != _EMPTY_ELEMENT:
+            yield self.head
+        yield from self.complements
+        yield from self.postmodifiers
 
         if itself == 'last':
             yield self
 
-    def replace(self, one, another, key=lambda x: x):
+    def _push_constituents(self, stack):
+        super()._push_constituents(stack)
+        stack.append(self.specifier)
+
+    def replace(self, one, another, key=lambda x: x, recursive=True):
         """Replace first occurrence of one with another.
         Return True if successful.
 
@@ -893,9 +1550,18 @@ class NounPhrase(Phrase):
             transfer_features(self.specifier, another)
             self.specifier = another
             return True
-        if self.specifier.replace(one, another, key):
+        if recursive and self.specifier.replace(one, another, key):
             return True
-        return super().replace(one, another, key)
+        return super().replace(one, another, key, recursive)
+
+    def _replaced(self, one, another, key):
+        if key(self.specifier) == key(one):
+            specifier = _adopted(self.specifier, another, DISCOURSE_FUNCTION.specifier)
+            return self._frozen_copy(_spec=specifier)
+        rv = self.specifier._replaced(one, another, key)
+        if rv is not None:
+            return self._frozen_copy(_spec=rv)
+        return super()._replaced(one, another, key)
 
     def update_parents(self, parent=_sentinel):
         if parent is not _sentinel:
@@ -915,6 +1581,8 @@ class VerbPhrase(Phrase):
 
      """
 
+    __slots__ = ()
+
     category = category.VERB_PHRASE
 
     def __init__(self, head=None, *compl, features=None, parent=None, **kwargs):
@@ -971,6 +1639,8 @@ class VerbPhrase(Phrase):
 
 
 class PrepositionPhrase(Phrase):
+    __slots__ = ()
+
     category = category.PREPOSITION_PHRASE
 
     def __init__(self, head=None, *compl, features=None, parent=None, **kwargs):
@@ -980,6 +1650,8 @@ class PrepositionPhrase(Phrase):
 
 
 class AdverbPhrase(Phrase):
+    __slots__ = ()
+
     category = category.ADVERB_PHRASE
 
     def __init__(self, head=None, *compl, features=None, parent=None, **kwargs):
@@ -989,6 +1661,8 @@ class AdverbPhrase(Phrase):
 
 
 class AdjectivePhrase(Phrase):
+    __slots__ = ()
+
     category = category.ADJECTIVE_PHRASE
 
     def __init__(self, head=None, *compl, features=None, parent=None, **kwargs):
@@ -1014,36 +1688,44 @@ class Clause(Phrase):
 
     """
 
-    _subject = None
-    _predicate = None
+    __slots__ = ('front_modifiers', '_subject', '_predicate')
+
     category = category.CLAUSE
+    _constituent_attributes = (
+        'front_modifiers', 'subject', 'premodifiers', 'predicate', 'complements', 'postmodifiers'
+    )
 
     def __init__(
         self, subject=None, predicate=None, objekt=None, features=None, parent=None, **kwargs
     ):
+        self._subject = None
+        self._predicate = None
         super().__init__(features, parent=parent, **kwargs)
-        fm = kwargs.pop('front_modifiers', [])
-        self.front_modifiers = ElementList(parent=self) + fm
+        fm = kwargs.pop('front_modifiers', ())
+        self.front_modifiers = ElementList(_items(fm), parent=self)
         self.subject = subject
         self.predicate = predicate
         if objekt:
             self.object = objekt
 
     def __eq__(self, other):
-        return (
-            super().__eq__(other) and self.premodifiers == other.premodifiers and
-            self.subject == other.subject and self.predicate == other.predicate and
-            self.complements == other.complements and self.postmodifiers == other.postmodifiers
-        )
+        # premodifiers, complements, postmodifiers and the predicate (head)
+        # are compared by `Phrase.__eq__`
+        return super().__eq__(other) and self.subject == other.subject
 
     def __hash__(self):
-        if self.hash == -1:
-            self.hash = hash(str(self))
-        return self.hash
+        rv = self.hash
+        if rv == -1:
+            rv = self.hash = self._structural_hash()
+        return rv
+
+    def _structural_hash(self):
+        # the predicate is the head of the phrase; front modifiers are not compared
+        return hash((super()._structural_hash(), self.subject))
 
     def __add__(self, other):
-        other_ = deepcopy(other)
-        self_ = deepcopy(self)
+        other_ = other.clone() if isinstance(other, Element) else deepcopy(other)
+        self_ = self.clone()
         if isinstance(other, Clause):
             return Coordination(self_, other_)
         if is_adjective_type(other):
@@ -1071,7 +1753,7 @@ class Clause(Phrase):
         rv = self.__class__(id=self.id)
         memo[id(self)] = rv
         rv.parent = memo.get(id(self.parent), None)
-        rv.features = deepcopy(self.features, memo=memo)
+        rv.features = self.features.copy()
         rv.front_modifiers = deepcopy(self.front_modifiers, memo=memo)
         rv.subject = deepcopy(self.subject, memo=memo)
         rv.premodifiers = deepcopy(self.premodifiers, memo=memo)
@@ -1167,28 +1849,34 @@ class Clause(Phrase):
         :param str itself: yield `self` as one of the elements; values in (None, 'first', 'last')
 
         """
+        if recursive:
+            yield from walk(self, itself)
+            return
+
         if itself == 'first':
             yield self
 
-        yield from self.front_modifiers.elements(recursive, itself)
-        if recursive:
-            yield from self.subject.elements(recursive, itself)
-        else:
-            if self.subject != NounPhrase(parent=self):
-                yield self.subject
-        yield from self.premodifiers.elements(recursive, itself)
-        if recursive:
-            yield from self.predicate.elements(recursive, itself)
-        else:
-            if self.predicate != VerbPhrase(parent=self):
-                yield self.predicate
-        yield from self.complements.elements(recursive, itself)
-        yield from self.postmodifiers.elements(recursive, itself)
+        yield from self.front_modifiers
+        if self.subject != _EMPTY_NOUN_PHRASE:
+            yield self.subject
+        yield from self.premodifiers
+        if self.predicate != _EMPTY_VERB_PHRASE:
+            yield self.predicate
+        yield from self.complements
+        yield from self.postmodifiers
 
         if itself == 'last':
             yield self
 
-    def replace(self, one, another, key=lambda x: x):
+    def _push_constituents(self, stack):
+        stack.extend(reversed(self.postmodifiers))
+        stack.extend(reversed(self.complements))
+        stack.append(self.predicate)
+        stack.extend(reversed(self.premodifiers))
+        stack.append(self.subject)
+        stack.extend(reversed(self.front_modifiers))
+
+    def replace(self, one, another, key=lambda x: x, recursive=True):
         """Replace first occurrence of `one` with `another` and
         return True if successful.
 
@@ -1200,17 +1888,38 @@ class Clause(Phrase):
             transfer_features(self.subject, another)
             self.subject = another
             return True
-        if self.subject.replace(one, another, key):
+        if recursive and self.subject.replace(one, another, key):
             return True
 
         if key(self.predicate) == key(one):
             transfer_features(self.predicate, another)
             self.predicate = another
             return True
-        if self.predicate.replace(one, another, key):
+        if recursive and self.predicate.replace(one, another, key):
             return True
 
-        return super().replace(one, another, key)
+        return super().replace(one, another, key, recursive)
+
+    def _replaced(self, one, another, key):
+        if key(self.subject) == key(one):
+            subject = _adopted(self.subject, another, DISCOURSE_FUNCTION.subject, raise_to_np)
+            return self._frozen_copy(_subject=subject)
+        rv = self.subject._replaced(one, another, key)
+        if rv is not None:
+            return self._frozen_copy(_subject=rv)
+
+        if key(self.predicate) == key(one):
+            predicate = _adopted(
+                self.predicate, another, DISCOURSE_FUNCTION.predicate, raise_to_vp
+            )
+            return self._frozen_copy(_predicate=predicate)
+        rv = self.predicate._replaced(one, another, key)
+        if rv is not None:
+            return self._frozen_copy(_predicate=rv)
+
+        # the head of the phrase is the predicate
+        names = ('premodifiers', 'complements', 'postmodifiers')
+        return self._replaced_in_lists(names, one, another, key)
 
     def update_parents(self, parent=_sentinel):
         if parent is not _sentinel:
@@ -1222,6 +1931,288 @@ class Clause(Phrase):
         super().update_parents(parent)
 
 
+class _FrozenElement(object):
+    """A mixin of the frozen counterparts of the element classes. """
+
+    __slots__ = ()
+
+    frozen = True
+
+    def __setattr__(self, name, value):
+        # the cached hash can still be computed and the parent reset
+        if name == 'hash' or name == '_arguments' or name == 'parent' and value is None:
+            object.__setattr__(self, name, value)
+        else:
+            self._invalidate()
+
+    def __delattr__(self, name):
+        self._invalidate()
+
+    def __setstate__(self, state):
+        # used by pickle instead of setting the attributes one by one
+        for dct in state if isinstance(state, tuple) else (state,):
+            for name, value in (dct or {}).items():
+                object.__setattr__(self, name, value)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _invalidate(self):
+        msg = 'Cannot change a frozen {}; use `replaced()` or `clone()`.'
+        raise AttributeError(msg.format(self._mutable_class.__name__))
+
+
+class _FrozenElementList(ElementList):
+    """An element list of a frozen element. """
+
+    __slots__ = ()
+
+    frozen = True
+    _mutable_class = ElementList
+
+    def _invalidate(self, *args, **kwargs):
+        raise AttributeError('Cannot change a frozen ElementList; use `clone()`.')
+
+    append = insert = extend = remove = pop = clear = sort = reverse = _invalidate
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _invalidate
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+_frozen_classes = {}
+
+
+def _frozen_class(cls):
+    """Return the frozen counterpart of the element class `cls`. """
+    try:
+        return _frozen_classes[cls]
+    except KeyError:
+        attributes = {'__slots__': (), '__module__': __name__, '_mutable_class': cls}
+        rv = type('_Frozen' + cls.__name__, (_FrozenElement, cls), attributes)
+        _frozen_classes[cls] = rv
+        return rv
+
+
+# the frozen classes are module attributes so that they can be pickled
+for _cls in (Element, Var, String, Word, Coordination, Phrase, NounPhrase, VerbPhrase,
+             PrepositionPhrase, AdverbPhrase, AdjectivePhrase, Clause):
+    globals()[_frozen_class(_cls).__name__] = _frozen_class(_cls)
+del _cls
+
+# empty constituents that `elements()` compares with
+_EMPTY_ELEMENT = Element().freeze()
+_EMPTY_NOUN_PHRASE = NounPhrase().freeze()
+_EMPTY_VERB_PHRASE = VerbPhrase().freeze()
+
+# marks the position of a node on the stack of `walk()` in post-order
+_POST_ORDER = object()
+
+
+def walk(element, itself=None):
+    """Return a generator yielding the elements in the tree of `element`
+    in depth-first order (the same as `element.elements(recursive=True, itself=itself)`).
+
+    The tree is traversed using an explicit stack so its depth is not limited
+    by the recursion limit. Phrases, clauses and coordinations are yielded
+    before their constituents if `itself` is 'first' (pre-order), after them
+    if `itself` is 'last' (post-order) or not at all. Other elements are yielded
+    unless they are empty `Element`s and `itself` is not set.
+    If `element` is an `ElementList`, its elements are walked.
+
+    """
+    stack = [element] if isinstance(element, Element) else list(reversed(element))
+    pop = stack.pop
+    while stack:
+        node = pop()
+        if node is _POST_ORDER:
+            yield pop()
+            continue
+        push_constituents = type(node)._push_constituents
+        if push_constituents is None:
+            if itself or node.category != category.ELEMENT:
+                yield node
+            continue
+        if itself == 'first':
+            yield node
+        elif itself == 'last':
+            stack.append(node)
+            stack.append(_POST_ORDER)
+        push_constituents(node, stack)
+
+
+class ParentIndex(object):
+    """The parents of the constituents of a tree found by traversing it.
+
+    Use it to look up parents in trees built in the 'none' parent mode
+    (see `set_parent_mode()`) or in frozen trees. The index reflects
+    the tree at the time it was created. A constituent shared by several
+    elements (e.g., in frozen trees) has the parent that was found last.
+
+    >>> np = NounPhrase('dog', 'the')
+    >>> ParentIndex(np).parent(np.head) is np
+    True
+
+    """
+
+    __slots__ = ('root', '_parents')
+
+    def __init__(self, root):
+        self.root = root
+        parents = {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            for _, x in node._constituents():
+                parents[_object_id(x)] = node
+                stack.append(x)
+        self._parents = parents
+
+    def parent(self, node):
+        """Return the parent of `node` or None if it is the root or not in the tree. """
+        return self._parents.get(_object_id(node))
+
+    def ancestors(self, node):
+        """Return a generator yielding the ancestors of `node` from its parent up to the root. """
+        node = self.parent(node)
+        while node is not None:
+            yield node
+            node = self.parent(node)
+
+
+# modes of referring to parents (see `set_parent_mode()`)
+PARENT_MODES = ('strong', 'weak', 'none')
+
+_parent_mode = 'strong'
+
+# slots replaced by properties in the weak and none modes; the references to
+# parents and owners of feature sets and the caches invalidated through them
+_mode_slots = {
+    (cls, name): cls.__dict__[name]
+    for cls, name in ((Element, 'parent'), (ElementList, 'parent'), (FeatureSet, '_owner'),
+                      (Element, 'hash'), (Element, '_arguments'))
+}
+
+
+# True once the slots were replaced by properties (see `set_parent_mode()`)
+_replaced_slots = False
+
+
+def _reference(slot, mode):
+    """Return a property storing the references in `slot` as `mode` requires;
+    the references stored in the other modes are read as well.
+
+    """
+    def get(self):
+        value = slot.__get__(self, None)
+        return value() if type(value) is weakref.ref else value
+
+    if mode == 'weak':
+        def set(self, value):
+            slot.__set__(self, None if value is None else weakref.ref(value))
+    elif mode == 'none':
+        def set(self, value):
+            slot.__set__(self, None)
+    else:
+        def set(self, value):
+            slot.__set__(self, value)
+
+    return property(get, set)
+
+
+def _uncached(slot, empty):
+    # frozen elements never change so they can keep their caches; the caches
+    # of mutable elements (e.g., filled in another mode) are ignored
+    def get(self):
+        return slot.__get__(self, None) if self.frozen else empty
+
+    def set(self, value):
+        slot.__set__(self, value if self.frozen else empty)
+
+    return property(get, set)
+
+
+def set_parent_mode(mode):
+    """Set how elements refer to their parents and return the previous mode.
+
+    * 'strong' (the default) - `parent` is a plain reference so each tree
+      is a reference cycle freed only by the cyclic garbage collector
+    * 'weak' - `parent` (and the owner of a feature set) is a weak reference
+      so trees are freed as soon as they are no longer used; a constituent
+      kept after its tree was freed has no parent
+    * 'none' - new parents are not stored and the `parent` of the elements
+      created in this mode is None; use `ParentIndex` to find the parents.
+      Methods following the parents (e.g., `locate()` and `replace_argument()`)
+      fall back to searching the tree. As changes of constituents cannot reach their
+      ancestors, the hashes and arguments of mutable elements are not cached
+      (and hashing trees nested deeper than the recursion limit fails).
+      The owner of a feature set is a weak reference.
+
+    The mode applies to all elements. Trees created in the 'strong'
+    and 'weak' modes can be used in any mode. Trees created in the 'none' mode
+    have no parents in the other modes either, so the hashes cached
+    after switching would not be reset by changes of their constituents;
+    call `reset_parents()` on such trees first.
+
+    The 'strong' mode uses plain slots unless another mode was set before.
+
+    """
+    global _parent_mode, _replaced_slots
+    if mode not in PARENT_MODES:
+        raise ValueError('Unknown parent mode {!r}; use one of {}'.format(mode, PARENT_MODES))
+    _replaced_slots = _replaced_slots or mode != 'strong'
+    for (cls, name), slot in _mode_slots.items():
+        cached = name in ('hash', '_arguments')
+        if mode == 'strong' and not _replaced_slots or mode != 'none' and cached:
+            value = slot
+        elif cached:
+            value = _uncached(slot, -1 if name == 'hash' else None)
+        else:
+            value = _reference(slot, 'weak' if name == '_owner' and mode == 'none' else mode)
+        setattr(cls, name, value)
+    previous, _parent_mode = _parent_mode, mode
+    return previous
+
+
+def reset_parents(element):
+    """Set the parents of the constituents of `element` in the current mode
+    (see `set_parent_mode()`) and drop the cached hashes and arguments.
+
+    Use it for trees created in the 'none' mode after switching to another mode.
+    Frozen elements have no parents and are left as they are.
+
+    """
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        if node.frozen:
+            continue
+        object.__setattr__(node, 'hash', -1)
+        object.__setattr__(node, '_arguments', None)
+        node.features._owner = node
+        for name in _slot_names(type(node)):
+            value = getattr(node, name)
+            if isinstance(value, Element):
+                value.parent = node
+                stack.append(value)
+            elif isinstance(value, ElementList):
+                value.parent = node
+                for x in value:
+                    x.parent = node
+                stack.extend(value)
+
+
+def get_parent_mode():
+    """Return the current parent mode (see `set_parent_mode()`). """
+    return _parent_mode
+
+
 def is_adjective_type(element, strict=False):
     """Return True if `element` is adjective modifier (adj or AdjP)"""
     check = all if strict else any
@@ -1292,6 +2283,9 @@ def raise_to_element(element):
         return Element()
     if not isinstance(element, Element):
         return String(element)
+    if element.frozen:
+        # mutable elements can only contain mutable constituents
+        return element.clone()
     return element
 
 
@@ -1392,15 +2386,25 @@ def transfer_features(source, target):
 class ElementEncoder(json.JSONEncoder):
 
     def default(self, python_object):
-        if isinstance(python_object, (Element, ElementList)):
-            dct = python_object.__dict__
-            if 'parent' in dct:
-                dct['parent'] = None
-            return {'__class__': str(type(python_object)), '__value__': dct}
+        cls = _mutable_class(type(python_object))
+        if isinstance(python_object, Element):
+            dct = python_object.to_dict()
+            for k, v in dct.items():
+                # element lists are lists so the encoder doesn't call `default()` for them
+                if isinstance(v, ElementList):
+                    dct[k] = self.default(v)
+            return {'__class__': str(cls), '__value__': dct}
+        elif isinstance(python_object, ElementList):
+            return {'__class__': str(cls), '__value__': python_object.to_dict()}
         elif isinstance(python_object, FeatureSet):
             return {'__class__': str(type(python_object)), '__value__': python_object.as_dict()}
         return super(ElementEncoder, self).default(python_object)
 
+    def iterencode(self, o, _one_shot=False):
+        if isinstance(o, ElementList):
+            o = self.default(o)
+        return super(ElementEncoder, self).iterencode(o, _one_shot)
+
 
 class ElementDecoder(json.JSONDecoder):
 
@@ -1410,41 +2414,50 @@ class ElementDecoder(json.JSONDecoder):
 
     @staticmethod
     def from_json(json_object):
-        prefix = "<class 'nlglib.microplanning.struct."
         if '__class__' in json_object:
             cls = json_object['__class__']
-            if cls == ("%sElement'>" % prefix):
-                rv = Element.from_dict(json_object['__value__'])
-            elif cls == ("%sElementList'>" % prefix):
-                rv = ElementList.from_dict(json_object['__value__'])
-            elif cls == ("%sString'>" % prefix):
-                rv = String.from_dict(json_object['__value__'])
-            elif cls == ("%sWord'>" % prefix):
-                rv = Word.from_dict(json_object['__value__'])
-            elif cls == ("%sVar'>" % prefix):
-                rv = Var.from_dict(json_object['__value__'])
-            elif cls == ("%sPhrase'>" % prefix):
-                rv = Phrase.from_dict(json_object['__value__'])
-            elif cls == ("%sNounPhrase'>" % prefix):
-                rv = NounPhrase.from_dict(json_object['__value__'])
-            elif cls == ("%sVerbPhrase'>" % prefix):
-                rv = VerbPhrase.from_dict(json_object['__value__'])
-            elif cls == ("%sPrepositionPhrase'>" % prefix):
-                rv = PrepositionPhrase.from_dict(json_object['__value__'])
-            elif cls == ("%sAdjectivePhrase'>" % prefix):
-                rv = AdjectivePhrase.from_dict(json_object['__value__'])
-            elif cls == ("%sAdverbPhrase'>" % prefix):
-                rv = AdverbPhrase.from_dict(json_object['__value__'])
-            elif cls == ("%sCoordination'>" % prefix):
-                rv = Coordination.from_dict(json_object['__value__'])
-            elif cls == ("%sClause'>" % prefix):
-                rv = Clause.from_dict(json_object['__value__'])
-            elif cls == "<class 'nlglib.features.feature.FeatureSet'>":
-                rv = FeatureSet()
-                rv.update(json_object['__value__'])
-            else:
-                raise TypeError('Unknown class "{}"'.format(cls))
-            if hasattr(rv, 'update_parents'):
-                rv.update_parents()
+            try:
+                decode = _json_decoders[cls]
+            except KeyError:
+                raise TypeError('Unknown class "{}"'.format(cls)) from None
+            rv = decode(json_object['__value__'])
+            if isinstance(rv, Element) and rv._push_constituents is not None:
+                _adopt_constituents(rv)
             return rv
         return json_object
+
+
+def _decode_feature_set(cls):
+    def decode(dct):
+        rv = cls()
+        rv.update(dct)
+        return rv
+    return decode
+
+
+# decoders of the classes encoded by `ElementEncoder` by their `str()`
+_json_decoders = {
+    str(cls): cls.from_dict
+    for cls in (Element, ElementList, String, Word, Var, Phrase, NounPhrase, VerbPhrase,
+                PrepositionPhrase, AdjectivePhrase, AdverbPhrase, Coordination, Clause)
+}
+_json_decoders.update(
+    (str(cls), _decode_feature_set(cls)) for cls in (FeatureSet, CompactFeatureSet)
+)
+
+
+def _adopt_constituents(element):
+    """Set the parent of the immediate constituents of `element` to `element`.
+
+    The decoder builds trees bottom-up so the constituents of the nested
+    elements already have their parents set.
+
+    """
+    for name in _slot_names(type(element)):
+        value = getattr(element, name)
+        if isinstance(value, ElementList):
+            value.parent = element
+            for x in value:
+                x.parent = element
+        elif isinstance(value, Element):
+            value.parent = element
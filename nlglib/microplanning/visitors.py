@@ -1,13 +1,16 @@
 """This package contains visitor classes (see the visitor pattern) and helpers."""
 
+import inspect
+from functools import lru_cache
 from urllib.parse import quote_plus
 
 from nlglib.features import DISCOURSE_FUNCTION, ASPECT, category, FeatureGroup
 from nlglib.features import NON_COMPARABLE_FEATURES
-from nlglib.microplanning.struct import Element, Word, String, Clause
+from nlglib.microplanning.struct import Element, Clause
 from nlglib.microplanning.struct import Phrase, Coordination, NounPhrase
 
 __all__ = [
+    'Visitor',
     'PrintVisitor',
     'XmlVisitor',
     'ReprVisitor',
@@ -22,7 +25,51 @@ __all__ = [
 ]
 
 
-class PrintVisitor:
+class Visitor:
+    """A base class of visitors of elements (see `Element.accept()`).
+
+    A visitor handles an element by its method named after the lower case
+    category of the element (e.g., `noun_phrase()` for NounPhrase).
+    The method is looked up once per class of visitor and class of element
+    so methods should not be added to or replaced on the class after
+    it visited elements (call `clear_handlers()` if they are). Handlers
+    set on visitor instances are not used.
+
+    """
+
+    # handlers (functions) by element class; each subclass has its own dict
+    _handlers = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._handlers = {}
+
+    @classmethod
+    def handler(cls, element_class):
+        """Return the function handling elements of the class `element_class`. """
+        try:
+            return cls._handlers[element_class]
+        except KeyError:
+            pass
+        name = element_class.category.lower()
+        m = getattr(cls, name)
+        if not hasattr(m, '__call__'):
+            msg = 'Error: cannot call undefined method: %s on visitor'
+            raise ValueError(msg % name)
+        if not inspect.isfunction(inspect.getattr_static(cls, name)):
+            # e.g., a static or class method; call it bound to the visitor
+            def m(visitor, element, **kwargs):
+                return getattr(visitor, name)(element, **kwargs)
+        cls._handlers[element_class] = m
+        return m
+
+    @classmethod
+    def clear_handlers(cls):
+        """Forget the handlers looked up by `handler()`. """
+        cls._handlers.clear()
+
+
+class PrintVisitor(Visitor):
     """ An abstract visitor class that maintains indentation info. """
 
     def __init__(self, depth=0, indent='  ', sep='\n'):
@@ -100,27 +147,81 @@ xsi:schemaLocation="http://simplenlg.googlecode.com/svn/trunk/res/xml ">
 </nlg:NLGSpec>
 '''
 
-    def __init__(self, xml='', depth=0, indent='  ', sep='\n'):
+    # the header and the footer without the whitespace between tags
+    compact_header = (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<nlg:NLGSpec xmlns="http://simplenlg.googlecode.com/svn/trunk/res/xml" '
+        'xmlns:nlg="http://simplenlg.googlecode.com/svn/trunk/res/xml" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        'xsi:schemaLocation="http://simplenlg.googlecode.com/svn/trunk/res/xml ">'
+        '<nlg:Request><Document cat="PARAGRAPH">'
+    )
+    compact_footer = '</Document></nlg:Request></nlg:NLGSpec>'
+
+    def __init__(self, xml='', depth=0, indent='  ', sep='\n', sink=None, compact=False,
+                 feature_map=None):
+        """Create a visitor writing the XML to `sink` (a file-like object
+        with a `write()` method taking strings) or to a list of strings
+        joined by `xml` if `sink` is None.
+
+        If `compact` is true, the XML has no indentation or newlines.
+        The features are converted to attributes by `feature_map`
+        (`simplenlg_features` by default; see `features_to_xml_attributes()`).
+
+        """
+        if compact:
+            indent = sep = ''
         super(XmlVisitor, self).__init__(depth, indent, sep)
-        self.xml = xml
+        self.compact = compact
+        self.sink = sink
+        self.feature_map = feature_map
+        # a custom `feature_map` compiled once and the attribute strings
+        # by (category, fingerprint of features) of this visitor
+        self._convert = None if feature_map is None else _compile_feature_map(feature_map)
+        self._attributes_cache = {}
+        self._chunks = []
+        self._write = self._chunks.append if sink is None else sink.write
+        if xml:
+            self._write(xml)
         self.ancestors.append('child')
 
+    @property
+    def xml(self):
+        """Return the XML of the visited elements (without the header and the footer). """
+        if self.sink is not None:
+            raise ValueError('The XML was written to {!r}'.format(self.sink))
+        if len(self._chunks) > 1:
+            self._chunks[:] = [''.join(self._chunks)]
+        return self._chunks[0] if self._chunks else ''
+
+    @xml.setter
+    def xml(self, value):
+        if self.sink is not None:
+            raise ValueError('The XML was written to {!r}'.format(self.sink))
+        self._chunks[:] = [value] if value else []
+
+    def _start(self, xsi_type, features, attributes=''):
+        """Write the start tag of an element. """
+        self._write('{0}<{1} xsi:type="{2}"{3}{4}>{5}'.format(
+            self.indent * self.depth, self.ancestors[-1], xsi_type, features, attributes, self.sep))
+
+    def _end(self):
+        """Write the end tag of an element. """
+        self._write('{0}</{1}>{2}'.format(self.indent * self.depth, self.ancestors[-1], self.sep))
+
+    def _base(self, word):
+        """Write the base of a word. """
+        self._write('{0}<base>{1}</base>{2}'.format(
+            self.indent * (self.depth + 1), quote_plus(word), self.sep))
+
     def element(self, _):
         pass
 
     def string(self, node):
         # neg = 'not ' if node.negated == 'true' else ''
-        neg = ''
-        features = self.features_to_xml_attributes(node)
-        text = (
-            '{outer}<{tag} xsi:type="WordElement" '
-            'canned="true" {f}>{sep}'
-            '{inner}<base>{neg}{word}</base>{sep}'
-            '{outer}</{tag}>{sep}'
-        ).format(
-            word=quote_plus(node.value), neg=neg, **self._get_args(f=features)
-        )
-        self.xml += text
+        self._start('WordElement', ' canned="true" ', self._attributes(node))
+        self._base(node.value)
+        self._end()
 
     def word(self, node):
         # a bug in simplenlg treats 'is' differently from 'be'
@@ -128,52 +229,40 @@ xsi:schemaLocation="http://simplenlg.googlecode.com/svn/trunk/res/xml ">
         # but change it to 'be' for simplenlg
         word = node.word
         if word == 'is': word = 'be'
-        features = self.features_to_xml_attributes(node)
         id = ' id="{}"'.format(node.id) if node.id else ''
-        text = (
-            '{outer}<{tag} xsi:type="WordElement"{f}{id}>{sep}'
-            '{inner}<base>{word}</base>{sep}'
-            '{outer}</{tag}>{sep}'
-        ).format(
-            word=quote_plus(word), id=id, **self._get_args(f=features)
-        )
-        self.xml += text
+        self._start('WordElement', self._attributes(node), id)
+        self._base(word)
+        self._end()
 
     def var(self, node):
         node.value.accept(self)
 
     def clause(self, node):
-        features = self.features_to_xml_attributes(node)
-        self.xml += '{outer}<{tag} xsi:type="SPhraseSpec"{f}>{sep}' \
-            .format(**self._get_args(f=features))
+        self._start('SPhraseSpec', self._attributes(node))
         self._process_elements(node, 'front_modifiers', name='frontMod')
         self._process_element(node, 'subject', name='subj')
         self._process_elements(node, 'premodifiers', name='preMod')
         self._process_element(node, 'predicate', name='vp')
         self._process_elements(node, 'complements', name='compl')
         self._process_elements(node, 'postmodifiers', name='postMod')
-        self.xml += '{outer}</{tag}>{sep}'.format(**self._get_args())
+        self._end()
 
     def noun_phrase(self, node):
-        features = self.features_to_xml_attributes(node)
-        self.xml += '{outer}<{tag} xsi:type="NPPhraseSpec"{f}>{sep}' \
-            .format(**self._get_args(f=features))
+        self._start('NPPhraseSpec', self._attributes(node))
         self._process_element(node, 'specifier', 'spec')
         self._process_elements(node, 'premodifiers', 'preMod')
         self._process_element(node, 'head')
         self._process_elements(node, 'complements', 'compl')
         self._process_elements(node, 'postmodifiers', 'postMod')
-        self.xml += '{outer}</{tag}>{sep}'.format(**self._get_args())
+        self._end()
 
     def phrase(self, node, typ):
-        features = self.features_to_xml_attributes(node)
-        self.xml += '{outer}<{tag} xsi:type="{type}"{f}>{sep}' \
-            .format(type=typ, **self._get_args(f=features))
+        self._start(typ, self._attributes(node))
         self._process_elements(node, 'premodifiers', 'preMod')
         self._process_element(node, 'head')
         self._process_elements(node, 'complements', 'compl')
         self._process_elements(node, 'postmodifiers', 'postMod')
-        self.xml += '{outer}</{tag}>{sep}'.format(**self._get_args())
+        self._end()
 
     def verb_phrase(self, node):
         self.phrase(node, 'VPPhraseSpec')
@@ -188,13 +277,23 @@ xsi:schemaLocation="http://simplenlg.googlecode.com/svn/trunk/res/xml ">
         self.phrase(node, 'AdvPhraseSpec')
 
     def coordination(self, node):
-        features = self.features_to_xml_attributes(node)
-        self.xml += '{outer}<{tag} xsi:type="CoordinatedPhraseElement"{f} conj="{conj}">{sep}' \
-            .format(conj=str(node.conj), **self._get_args(f=features))
+        conj = ' conj="{0}"'.format(node.conj)
+        self._start('CoordinatedPhraseElement', self._attributes(node), conj)
         self._process_elements(node, 'coords', 'coord')
-        self.xml += '{outer}</{tag}>{sep}'.format(**self._get_args())
+        self._end()
+
+    def write_request(self, element):
+        """Write the header, `element` and the footer, i.e., the same XML
+        as `to_xml()` returns after visiting `element`.
+
+        """
+        self._write(self.compact_header if self.compact else self.header)
+        element.accept(self)
+        self._write(self.compact_footer if self.compact else self.footer.rstrip())
 
     def to_xml(self):
+        if self.compact:
+            return self.compact_header + self.xml + self.compact_footer
         return (self.header + self.xml + self.footer).strip()
 
     def clear(self):
@@ -204,33 +303,89 @@ xsi:schemaLocation="http://simplenlg.googlecode.com/svn/trunk/res/xml ">
         return self.to_xml()
 
     def __repr__(self):
+        if self.sink is not None:
+            return 'XmlVisitor(sink={0!r})'.format(self.sink)
         return 'XmlVisitor({0})'.format(self.xml)
 
+    def _attributes(self, node):
+        """Return the SimpleNLG attributes of `node` (see `features_to_xml_attributes()`). """
+        if self._convert is None:
+            return self.features_to_xml_attributes(node)
+        cat = _xml_category(node)
+        key = (cat, node.features.fingerprint())
+        rv = self._attributes_cache.get(key)
+        if rv is None:
+            rv = self._attributes_cache[key] = _xml_attributes(cat, node.features, self._convert)
+        return rv
+
     @staticmethod
     def features_to_xml_attributes(element, feature_map=None):
-        features = ""
-        feature_map = simplenlg_features if feature_map is None else feature_map
-        if isinstance(element, Word):
-            cat = element.pos
-        elif isinstance(element, String):
-            cat = category.ANY
+        """Return the SimpleNLG attributes of the category and the features of `element`.
+
+        The attributes for `simplenlg_features` (the default `feature_map`)
+        are cached per category and set of features (see `FeatureSet.fingerprint()`).
+        Other maps are compiled on each call; pass them to `XmlVisitor`
+        to compile them once.
+
+        """
+        cat = _xml_category(element)
+        if feature_map is not None:
+            return _xml_attributes(cat, element.features, _compile_feature_map(feature_map))
+        return _simplenlg_attributes(cat, element.features.fingerprint())
+
+
+def _xml_category(element):
+    """Return the SimpleNLG category of `element`. """
+    # categories rather than classes so that `StoredElement` views work too
+    if element.category == category.WORD:
+        return element.pos
+    elif element.category == category.STRING:
+        return category.ANY
+    return element.category
+
+
+def _xml_attributes(cat, features, convert):
+    """Return the attributes of the category `cat` and `features`
+    converted by `convert` (see `_compile_feature_map()`).
+
+    """
+    attributes = {'cat': cat}
+    for f in features:
+        attributes.update(convert(f))
+    return ' ' + ' '.join('%s="%s"' % (quote_plus(str(k)), quote_plus(str(attributes[k])))
+                          for k in sorted(attributes))
+
+
+def _default_attributes(f):
+    # if feature or feature group is not in the map, just return a dict with K:V
+    value = f.value.lower()
+    return {f.name.upper(): value if value in ('true', 'false') else f.value.upper()}
+
+
+def _compile_feature_map(feature_map):
+    """Return a function converting a feature to SimpleNLG attributes by `feature_map`.
+
+    The values of `feature_map` (see `simplenlg_features`) are wrapped in functions
+    and indexed by the names (and values) of the features and groups
+    they convert, which is how the features were looked up in `feature_map`.
+
+    """
+    by_feature = {}
+    by_group = {}
+    for key, converted in feature_map.items():
+        # returned value is either a dict or a lambda taking `f`
+        if not hasattr(converted, '__call__'):
+            converted = (lambda attributes: lambda f: attributes)(dict(converted))
+        if isinstance(key, FeatureGroup):
+            by_group[key.name] = converted
         else:
-            cat = element.category
-        features_dict = {'cat': cat}
-        for f in element.features:
-            # if feature or feature group is not in dict, just return a dict with K:V
-            value = f.value.lower()
-            default_value = value if value in ('true', 'false') else f.value.upper()
-            converted = feature_map.get(f, {f.name.upper(): default_value})
-            # returned value is either a dict or a lambda taking `f`
-            if hasattr(converted, '__call__'):
-                converted = converted(f)
-            features_dict.update(converted)
-        if features_dict:
-            for k in sorted(features_dict.keys()):
-                features += '%s="%s" ' % (quote_plus(str(k)), quote_plus(str(features_dict[k])))
-            return ' ' + features.strip()
-        return ''
+            by_feature[(key.name, key.value)] = converted
+
+    def convert(f):
+        fn = by_feature.get((f.name, f.value)) or by_group.get(f.name, _default_attributes)
+        return fn(f)
+
+    return convert
 
 
 # either a dict or a lambda taking Feature and returning a dict
@@ -245,6 +400,21 @@ simplenlg_features = {
     FeatureGroup('COMPLEMENTISER'): lambda f: {f.name: f.value},
 }
 
+# `simplenlg_features` compiled by `_compile_feature_map()`
+_simplenlg_feature_map = _compile_feature_map(simplenlg_features)
+
+# the maximum number of attribute strings cached by `XmlVisitor.features_to_xml_attributes()`
+XML_ATTRIBUTES_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=XML_ATTRIBUTES_CACHE_SIZE)
+def _simplenlg_attributes(cat, fingerprint):
+    """Return the attributes of the category `cat` and the features
+    in `fingerprint` converted by `simplenlg_features`.
+
+    """
+    return _xml_attributes(cat, fingerprint, _simplenlg_feature_map)
+
 
 class ReprVisitor(PrintVisitor):
     """ Create a string representation of an element and its subelements.
@@ -635,7 +805,7 @@ class SimpleStrVisitor(PrintVisitor):
         return 'StrVisitor({0})'.format(self.data)
 
 
-class ElementVisitor:
+class ElementVisitor(Visitor):
     """ This visitor collects all leaf elements of a syntax tree. """
 
     def __init__(self):
@@ -691,7 +861,7 @@ class ElementVisitor:
         self._process_elements(node, 'coords')
 
 
-class ConstituentVisitor:
+class ConstituentVisitor(Visitor):
     """ This visitor collects all elements of a syntax tree. """
 
     def __init__(self):
@@ -1,7 +1,7 @@
 import logging
 
 from nlglib.macroplanning import Document, Paragraph
-from nlglib.microplanning import is_clause_type
+from nlglib.microplanning import is_clause_type, Visitor
 from nlglib.features import category, NUMBER, GENDER, CASE, TENSE, NEGATED, MODAL, FeatureGroup
 from nlglib.utils import flatten
 
@@ -54,6 +54,9 @@ class Realiser(object):
     def element(self, elt, **kwargs):
         """ Realise NLG element. """
         self.logger.debug('Realising element (simple realisation):\n{0}'.format(repr(elt)))
+        if elt.frozen:
+            # the visitor propagates features of clauses to their predicates
+            elt = elt.clone()
         v = RealisationVisitor()
         elt.accept(v)
         result = str(v).replace(' ,', ',')
@@ -107,7 +110,7 @@ class Realiser(object):
 
 
 # TODO: Move to visitors?
-class RealisationVisitor:
+class RealisationVisitor(Visitor):
     """ A visitor that collects the strings in the NLG structure
     and performs a simple surface realisation.
 
@@ -1,3 +1,4 @@
+import io
 import os
 import socket
 import struct
@@ -50,6 +51,8 @@ class Socket:
     def _send(self, msg, length):
         """ Send a sequence of bytes of the specified length. """
         total_sent = 0
+        # slices of a memoryview do not copy the data
+        msg = memoryview(msg)
         while total_sent < length:
             sent = self.socket.send(msg[total_sent:])
             if sent == 0:
@@ -69,13 +72,17 @@ class Socket:
 
     def send_string(self, msg, encoding='utf-8'):
         """ Send a string message. """
+        return self.send_bytes(msg.encode(encoding))
+
+    def send_bytes(self, msg):
+        """ Send a bytes-like message (e.g., the buffer of a `RequestBuffer`). """
+        msg = memoryview(msg).cast('B')
         # first sent the length of the message
         msg_size = hton(len(msg))
         self._send(msg_size, len(msg_size))
 
         # now send the message
-        msg_data = bytearray(msg, encoding)
-        length = self._send(msg_data, len(msg_data))
+        length = self._send(msg, len(msg))
         return length
 
     def recv_string(self, encoding='utf-8'):
@@ -107,6 +114,22 @@ class Socket:
         self.close()
 
 
+class RequestBuffer(io.BytesIO):
+    """ A binary buffer of a request that strings can be written to
+    (e.g., by `XmlVisitor`) so that the request is sent without copying.
+
+    """
+
+    def __init__(self, encoding='utf-8'):
+        super(RequestBuffer, self).__init__()
+        self.encoding = encoding
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode(self.encoding)
+        return super(RequestBuffer, self).write(data)
+
+
 class SimplenlgClient:
     """ A class that acts as a client to a simplenlg server.
         The host and port are configured through the settings file.
@@ -120,8 +143,18 @@ class SimplenlgClient:
         self.socket = Socket(self.host, self.port)
 
     def xml_request(self, data):
+        """ Send the XML `data` (a string, a bytes-like object or a `RequestBuffer`)
+        and return the realisation.
+
+        """
         with self.socket as sock:
-            sock.send_string(data)
+            if isinstance(data, str):
+                sock.send_string(data)
+            elif isinstance(data, RequestBuffer):
+                with data.getbuffer() as buffer:
+                    sock.send_bytes(buffer)
+            else:
+                sock.send_bytes(data)
             result = sock.recv_string()
             if 'Exception: XML unmarshal error' == result:
                 raise ServerError(result)
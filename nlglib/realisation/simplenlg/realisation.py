@@ -11,7 +11,7 @@ import logging
 
 from nlglib.microplanning import *
 
-from nlglib.realisation.simplenlg.client import SimplenlgClient
+from nlglib.realisation.simplenlg.client import SimplenlgClient, RequestBuffer
 from nlglib.realisation.basic import Realiser as BasicRealiser
 
 __all__ = ['Realiser']
@@ -20,17 +20,25 @@ __all__ = ['Realiser']
 class Realiser(BasicRealiser):
     """Realiser that uses SimpleNLG over TCP (XML serialisation)."""
 
-    def __init__(self, client=None, host='localhost', port=40000, logger=None):
+    def __init__(self, client=None, host='localhost', port=40000, logger=None, compact=False):
+        """Create a realiser sending requests to `client` (or to a new client
+        connecting to `host`:`port`). If `compact` is true, the XML of the requests
+        has no indentation or newlines; enable it only for servers that accept it.
+
+        """
         self.logger = logger or logging.getLogger(__name__)
         self.client = client if client else SimplenlgClient(host, port)
+        self.compact = compact
 
     def element(self, elt, **kwargs):
         """ Realise NLG element. """
         self.logger.debug('Realising element:\n{0}'.format(repr(elt)))
         if not elt.string:
             return ''
-        v = XmlVisitor()
-        elt.accept(v)
-        self.logger.debug('XML for realisation:\n{0}'.format(v.to_xml()))
-        result = self.client.xml_request(v.to_xml())
+        request = RequestBuffer()
+        XmlVisitor(sink=request, compact=self.compact).write_request(elt)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            xml = request.getvalue().decode(request.encoding)
+            self.logger.debug('XML for realisation:\n{0}'.format(xml))
+        result = self.client.xml_request(request)
         return result.replace(' ,', ',')
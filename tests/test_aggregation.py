@@ -74,6 +74,14 @@ class TestAggregation(unittest.TestCase):
             VP('wrote', NP('an', 'article')))
         self.assertEqual(expected, c3)
 
+    def test_try_to_aggregate_equal_constituents(self):
+        # the object is equal to the replaced noun phrase but stays as it is
+        c1 = Clause('Roman', VP('put', NP('the', 'box'), PP('on', NP('the', 'box'))))
+        c2 = Clause('Roman', VP('put', NP('the', 'box'), PP('on', NP('the', 'table'))))
+        c3 = self.aggregator.try_to_aggregate(c1, c2)
+        self.assertEqual(NP('the', 'box'), c3.predicate.complements[0])
+        self.assertEqual('Roman put the box on the box and table', str(c3))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,112 @@
+import io
+import pickle
+import unittest
+
+from copy import copy, deepcopy
+
+from nlglib import binary
+from nlglib.features import NUMBER
+from nlglib.macroplanning import Document, Paragraph, RhetRel, MsgSpec, StringMsg
+from nlglib.microplanning import *
+
+
+def make_clause():
+    c = Clause(NP('the', 'man', features=[NUMBER.plural]),
+               VP('put', NP('the', 'piano'), PP('into', NP('the', 'truck'))),
+               features={'TENSE': 'past', 'foo': 'bar'})
+    c.complements.append(Var('x', 'y'))
+    return c
+
+
+class DummyMessage(MsgSpec):
+
+    def __init__(self, name, value):
+        super().__init__(name)
+        self.value = value
+        self.numbers = {1: 2.5, -3: (True, None)}
+
+
+class TestBinary(unittest.TestCase):
+
+    def test_round_trip(self):
+        c = make_clause()
+        c2 = binary.loads(binary.dumps(c))
+        self.assertEqual(c, c2)
+        self.assertEqual('bar', c2['foo'].value)
+        self.assertIs(c2, c2.subject.parent)
+        self.assertIs(c2.predicate, c2.predicate.complements[0].parent)
+
+    def test_does_not_modify_the_element(self):
+        c = make_clause()
+        parent = c.subject.parent
+        binary.dumps(c)
+        self.assertIs(parent, c.subject.parent)
+
+    def test_element_list(self):
+        lst = ElementList([String('a'), Word('b', 'NOUN')], features={'NUMBER': 'plural'})
+        lst2 = binary.loads(binary.dumps(lst))
+        self.assertEqual(lst, lst2)
+        self.assertEqual(lst._features, lst2._features)
+
+    def test_frozen(self):
+        c = make_clause().freeze()
+        c2 = binary.loads(binary.dumps(c))
+        self.assertEqual(c, c2)
+        self.assertTrue(c2.frozen)
+        self.assertTrue(c2.subject.frozen)
+
+    def test_deep_tree(self):
+        np = NounPhrase('x')
+        for _ in range(5000):
+            parent = NounPhrase('x')
+            parent.postmodifiers.append(np)
+            np = parent
+        np2 = binary.loads(binary.dumps(np))
+        self.assertEqual(5001, sum(1 for x in np2.elements(recursive=True, itself='first')
+                                   if isinstance(x, NounPhrase)))
+
+    def test_document(self):
+        msg = DummyMessage('dummy', NP('dog'))
+        rel = RhetRel('Elaboration', msg, StringMsg('text'), features={'NEGATED': 'true'})
+        doc = Document('Title', rel, Paragraph(make_clause(), 'text'))
+        doc2 = binary.loads(binary.dumps(doc))
+        self.assertEqual(doc, doc2)
+        rel2 = doc2.sections[0]
+        self.assertIsInstance(rel2.nucleus, DummyMessage)
+        self.assertEqual(msg.value, rel2.nucleus.value)
+        self.assertEqual(msg.numbers, rel2.nucleus.numbers)
+        self.assertEqual(rel.features, rel2.features)
+        # objects referred to from several attributes are stored once
+        self.assertIs(rel2.nucleus, rel2.order[0])
+
+    def test_dump_and_load(self):
+        fp = io.BytesIO()
+        binary.dump(make_clause(), fp)
+        fp.seek(0)
+        self.assertEqual(make_clause(), binary.load(fp))
+
+    def test_pickle(self):
+        doc = Document('Title', Paragraph(make_clause()))
+        data = pickle.dumps(doc)
+        self.assertIn(b'nlglib.binary', data)
+        self.assertEqual(doc, pickle.loads(data))
+        self.assertEqual(doc, deepcopy(doc))
+        self.assertIs(doc.sections, copy(doc).sections)
+
+    def test_pickle_unknown_element_class(self):
+        class Sentence(Clause):
+            __slots__ = ()
+
+        with self.assertRaises(TypeError):
+            binary.dumps(Sentence('dog', 'bark'))
+        self.assertEqual(Clause('dog', 'bark'), deepcopy(Sentence('dog', 'bark')))
+
+    def test_invalid_data(self):
+        with self.assertRaises(ValueError):
+            binary.loads(b'{"version": 1}')
+        with self.assertRaises(ValueError):
+            binary.loads(binary.MAGIC + bytes([binary.VERSION + 1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import io
+import json
+import unittest
+
+from nlglib import codec
+from nlglib.features import NUMBER, TENSE
+from nlglib.macroplanning import Document, Paragraph
+from nlglib.microplanning import *
+
+
+def make_clause():
+    c = Clause(NP('the', 'man', features=[NUMBER.plural]),
+               VP('put', NP('the', 'piano'), PP('into', NP('the', 'truck'))),
+               features=[TENSE.past])
+    c.complements.append(Var('x', 'y'))
+    return c
+
+
+class TestCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        c = make_clause()
+        c2 = codec.loads(codec.dumps(c))
+        self.assertEqual(c, c2)
+        self.assertIs(Clause, type(c2))
+        self.assertIs(c2, c2.subject.parent)
+        self.assertIs(c2.predicate, c2.predicate.complements[0].parent)
+
+    def test_round_trip_without_omitting_defaults(self):
+        c = make_clause()
+        s = codec.dumps(c, omit_defaults=False)
+        self.assertEqual(c, codec.loads(s))
+        self.assertGreater(len(s), len(codec.dumps(c)))
+
+    def test_omits_defaults(self):
+        data = json.loads(codec.dumps(String('dog')))
+        self.assertEqual({'version': codec.VERSION, 'nodes': [{'t': 'S', 'v': 'dog'}]}, data)
+
+    def test_does_not_modify_the_element(self):
+        c = make_clause()
+        parent = c.subject.parent
+        codec.dumps(c)
+        self.assertIs(parent, c.subject.parent)
+
+    def test_multi_valued_features(self):
+        np = NP('the', 'man')
+        np.features.add(NUMBER.plural)
+        np.features.add(NUMBER.both)
+        np2 = codec.loads(codec.dumps(np))
+        self.assertEqual(np, np2)
+        self.assertIn(NUMBER.plural, np2.features)
+        self.assertIn(NUMBER.both, np2.features)
+
+    def test_coordination(self):
+        cc = Coordination(NP('cat'), NP('dog'), conj='or')
+        cc2 = codec.loads(codec.dumps(cc))
+        self.assertEqual(cc, cc2)
+        self.assertEqual('or', cc2.conj.value)
+
+    def test_deep_tree(self):
+        np = NounPhrase('x')
+        for _ in range(5000):
+            parent = NounPhrase('x')
+            parent.postmodifiers.append(np)
+            np = parent
+        np2 = codec.loads(codec.dumps(np))
+        self.assertEqual(5001, sum(1 for x in np2.elements(recursive=True, itself='first')
+                                   if isinstance(x, NounPhrase)))
+
+    def test_document(self):
+        doc = Document('Title', make_clause(), Document('Section', Clause(NP('dog'), VP('bark'))))
+        doc2 = codec.loads(codec.dumps(doc))
+        self.assertEqual(doc, doc2)
+        self.assertIsInstance(doc2.sections[1], Document)
+
+    def test_paragraph(self):
+        p = Paragraph(make_clause(), Clause(NP('dog'), VP('bark')))
+        self.assertEqual(p, codec.loads(codec.dumps(p)))
+
+    def test_dump_all_and_load_all(self):
+        objects = [make_clause(), Document('Title', String('text')), NP('dog')]
+        fp = io.StringIO()
+        codec.dump_all(objects, fp)
+        fp.seek(0)
+        self.assertEqual(objects, list(codec.load_all(fp)))
+
+    def test_loads_element_json(self):
+        c = make_clause()
+        self.assertEqual(c, codec.loads(c.to_json()))
+
+    def test_unsupported_version(self):
+        with self.assertRaises(ValueError):
+            codec.loads('{"version": 0, "nodes": []}')
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            codec.loads('{"version": 1, "nodes": [{"t": "?"}]}')
+        with self.assertRaises(TypeError):
+            codec.dumps(object())
+
+
+if __name__ == '__main__':
+    unittest.main()
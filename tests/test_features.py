@@ -1,6 +1,9 @@
+import copy
+import pickle
 import unittest
 
-from nlglib.features import Feature, FeatureGroup, FeatureSet
+from nlglib.features import Feature, FeatureGroup, FeatureSet, CompactFeatureSet
+from nlglib.features import NUMBER, TENSE, DISCOURSE_FUNCTION
 
 
 # noinspection PyUnresolvedReferences
@@ -24,6 +27,20 @@ class TestFeature(unittest.TestCase):
         singular = Feature('NUMBER', 'singular')
         self.assertEqual('<Feature NUMBER: singular>', repr(singular))
 
+    def test_interned(self):
+        number = FeatureGroup('NUMBER', 'singular', 'plural')
+        self.assertIs(number.plural, Feature('NUMBER', 'plural'))
+        self.assertIs(Feature('NUMBER', 'plural'), copy.deepcopy(Feature('NUMBER', 'plural')))
+        self.assertIs(Feature('NUMBER', 'plural'), pickle.loads(pickle.dumps(number.plural)))
+        self.assertIsNot(Feature('number', 'plural'), Feature('NUMBER', 'plural'))
+        self.assertEqual(Feature('number', 'plural'), Feature('NUMBER', 'plural'))
+
+    def test_immutable(self):
+        singular = Feature('NUMBER', 'singular')
+        with self.assertRaises(AttributeError):
+            singular.value = 'plural'
+        self.assertEqual('singular', Feature('NUMBER', 'singular').value)
+
 
 # noinspection PyUnresolvedReferences
 class TestFeatureGroup(unittest.TestCase):
@@ -70,6 +87,32 @@ class TestFeatureGroup(unittest.TestCase):
         self.assertEqual(fg, pl)
         self.assertNotEqual(sg, pl)
 
+    def test_transformed_attribute(self):
+        number = FeatureGroup('NUMBER', 'singular', 'plural', transform='lower')
+        self.assertIs(number.plural, number.PLURAL)
+        self.assertIs(number.plural, number.Plural)
+        with self.assertRaises(AttributeError):
+            number.DUAL
+        self.assertIs(FeatureGroup, type(number))
+        self.assertIs(number.plural, number.__dict__['PLURAL'])
+
+    def test_reserved_values(self):
+        group = FeatureGroup('X', 'values', 'name', '__len__', 'plain')
+        self.assertEqual('X', group.name)
+        self.assertEqual(['values', 'name', '__len__', 'plain'], group.values)
+        self.assertEqual(4, len(group))
+        self.assertEqual(Feature('X', 'name'), group._features['name'])
+        self.assertIn(Feature('X', 'values'), group)
+        self.assertEqual(Feature('X', 'plain'), group.plain)
+        upper = FeatureGroup('Y', 'name', transform='lower')
+        self.assertEqual(Feature('Y', 'name'), upper.NAME)
+        self.assertEqual('Y', upper.name)
+
+    def test_pickle(self):
+        number = pickle.loads(pickle.dumps(NUMBER))
+        self.assertEqual(NUMBER, number)
+        self.assertIs(NUMBER.plural, number.PLURAL)
+
 
 # noinspection PyUnresolvedReferences
 class TestFeatureSet(unittest.TestCase):
@@ -148,6 +191,116 @@ class TestFeatureSet(unittest.TestCase):
         expected = FeatureSet([self.number.plural, self.person.first])
         self.assertEqual(expected, fs)
 
+    def test_contains_group_name(self):
+        fs = FeatureSet([self.number.singular])
+        self.assertIn('NUMBER', fs)
+        self.assertNotIn('TENSE', fs)
+        self.assertNotIn(('NUMBER', 'singular'), fs)
+
+    def test_equals_ignores_order_within_group(self):
+        fs1 = FeatureSet([self.number.singular, self.number.plural])
+        fs2 = FeatureSet([self.number.plural, self.number.singular])
+        self.assertEqual(fs1, fs2)
+        self.assertNotEqual(fs1, FeatureSet([self.number.plural]))
+
+    def test_discard(self):
+        fs = FeatureSet([self.number.singular, self.number.plural, self.person.first])
+        removed = fs.discard(self.number)
+        self.assertEqual({self.number.singular, self.number.plural}, removed)
+        self.assertEqual(FeatureSet([self.person.first]), fs)
+        self.assertEqual(set(), fs.discard('TENSE'))
+
+    def test_copy(self):
+        fs = FeatureSet([self.number.singular])
+        fs2 = fs.copy()
+        fs2.replace(self.number.plural)
+        self.assertIn(self.number.singular, fs)
+        self.assertIn(self.number.plural, fs2)
+        self.assertNotIn(self.number.singular, fs2)
+
+    def test_copy_shares_storage_until_written(self):
+        fs = FeatureSet([self.number.singular, self.person.first])
+        fs2 = copy.deepcopy(fs)
+        self.assertIs(fs._groups, fs2._groups)
+        fs2.discard('TENSE')
+        self.assertIs(fs._groups, fs2._groups)
+        fs.add(self.tense.past)
+        self.assertIsNot(fs._groups, fs2._groups)
+        self.assertNotIn(self.tense, fs2)
+        self.assertEqual(FeatureSet([self.number.singular, self.person.first]), fs2)
+
+    def test_fingerprint(self):
+        exclude = [self.tense]
+        fs = FeatureSet([self.number.singular, self.tense.past])
+        fp = fs.fingerprint(exclude)
+        self.assertEqual(frozenset([self.number.singular]), fp)
+        self.assertIs(fp, fs.fingerprint(exclude))
+        self.assertEqual(frozenset([self.number.singular, self.tense.past]), fs.fingerprint())
+        fs.replace(self.number.plural)
+        self.assertEqual(frozenset([self.number.plural]), fs.fingerprint(exclude))
+        self.assertEqual(fs.fingerprint(), CompactFeatureSet(fs).fingerprint())
+
+
+class TestCompactFeatureSet(unittest.TestCase):
+
+    def test_registered_features_use_bits(self):
+        fs = CompactFeatureSet([NUMBER.plural, TENSE.past])
+        self.assertNotEqual(0, fs._bits)
+        self.assertEqual({}, fs._groups)
+        self.assertEqual(2, len(fs))
+        self.assertEqual({NUMBER.plural, TENSE.past}, set(fs))
+
+    def test_contains(self):
+        fs = CompactFeatureSet([NUMBER.plural, Feature('foo', 'bar')])
+        self.assertIn(NUMBER.plural, fs)
+        self.assertIn(NUMBER, fs)
+        self.assertIn('NUMBER', fs)
+        self.assertIn('foo', fs)
+        self.assertIn(Feature('foo', 'bar'), fs)
+        self.assertNotIn(NUMBER.singular, fs)
+        self.assertNotIn(TENSE, fs)
+
+    def test_replace(self):
+        fs = CompactFeatureSet([NUMBER.plural])
+        fs.replace(NUMBER.singular)
+        self.assertEqual(NUMBER.singular, fs[NUMBER])
+        self.assertEqual(1, len(fs))
+        # a value outside of the registered group replaces the registered one
+        fs['NUMBER'] = 'dual'
+        self.assertEqual(Feature('NUMBER', 'dual'), fs[NUMBER])
+        self.assertEqual(1, len(fs))
+        fs.replace(NUMBER.plural)
+        self.assertEqual([NUMBER.plural], list(fs))
+
+    def test_discard(self):
+        fs = CompactFeatureSet([NUMBER.plural, NUMBER.singular, DISCOURSE_FUNCTION.head])
+        self.assertEqual({NUMBER.plural, NUMBER.singular}, fs.discard(NUMBER))
+        self.assertEqual(CompactFeatureSet([DISCOURSE_FUNCTION.head]), fs)
+
+    def test_equals(self):
+        features = [NUMBER.plural, TENSE.past, Feature('foo', 'bar')]
+        self.assertEqual(CompactFeatureSet(features), CompactFeatureSet(reversed(features)))
+        self.assertEqual(FeatureSet(features), CompactFeatureSet(features))
+        self.assertEqual(CompactFeatureSet(features), FeatureSet(features))
+        self.assertNotEqual(CompactFeatureSet(features[:2]), CompactFeatureSet(features))
+
+    def test_copy(self):
+        fs = CompactFeatureSet([NUMBER.plural, Feature('foo', 'bar')])
+        fs2 = fs.copy()
+        fs2.replace(NUMBER.singular)
+        fs2['foo'] = 'baz'
+        self.assertEqual(CompactFeatureSet([NUMBER.plural, Feature('foo', 'bar')]), fs)
+
+    def test_fingerprint_invalidated(self):
+        fs = CompactFeatureSet([NUMBER.plural])
+        self.assertEqual(frozenset([NUMBER.plural]), fs.fingerprint())
+        fs.add(TENSE.past)
+        self.assertEqual(frozenset([NUMBER.plural, TENSE.past]), fs.fingerprint())
+        fs.discard(NUMBER)
+        self.assertEqual(frozenset([TENSE.past]), fs.fingerprint())
+        fs.replace(TENSE.present)
+        self.assertEqual(frozenset([TENSE.present]), fs.fingerprint())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -41,6 +41,16 @@ class TestLexicalisation(unittest.TestCase):
         expected = list(Clause('Boris', 'is', 'fast').elements(recursive=True))
         self.assertEqual(expected, list(res.elements(recursive=True)))
 
+    def test_frozen_template(self):
+        """Test that frozen templates are shared and not changed. """
+        template = Clause(Var('arg_subject'), 'is', 'fast').freeze()
+        frozen_lex = Lexicaliser(templates={'dummy': template})
+        res = frozen_lex.message_specification(DummyMsg())
+        self.assertEqual(Clause('Boris', 'is', 'fast'), res)
+        self.assertIs(template.predicate, res.predicate)
+        self.assertEqual(Var('arg_subject'), template.subject)
+        self.assertEqual('Boris is fast.', realiser(res))
+
     def test_lexicalise_rst_relation(self):
         """ Test lexicalisation of RhetRel. """
         # a rhet relation with 3 nuclei
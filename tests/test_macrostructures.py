@@ -31,6 +31,39 @@ class TestMessageSpec(unittest.TestCase):
         self.assertEqual('bar', tm.value_for('foo'))
         self.assertRaises(ValueError, tm.value_for, 'baz')
 
+    def test_accept(self):
+        class MessageVisitor:
+            def visit_message_specification(self, node):
+                return 'message'
+
+        class ElementVisitor:
+            def visit_message_specification(self, node, element):
+                return element
+
+        tm = DummyMessage('some_name')
+        self.assertEqual('message', tm.accept(MessageVisitor()))
+        self.assertEqual('message', tm.accept(MessageVisitor(), 'foo'))
+        self.assertEqual('foo', tm.accept(ElementVisitor(), 'foo'))
+
+    def test_accept_other_handlers(self):
+        class StaticVisitor:
+            @staticmethod
+            def visit_message_specification(node, element):
+                return element
+
+        class ClassVisitor:
+            @classmethod
+            def visit_message_specification(cls, node):
+                return cls.__name__
+
+        tm = DummyMessage('some_name')
+        self.assertEqual('foo', tm.accept(StaticVisitor(), 'foo'))
+        self.assertEqual('ClassVisitor', tm.accept(ClassVisitor()))
+        v = StaticVisitor()
+        v.visit_message_specification = lambda node: 'instance'
+        self.assertEqual('instance', tm.accept(v))
+        self.assertEqual('foo', tm.accept(StaticVisitor(), 'foo'))
+
 
 class TestRhetRel(unittest.TestCase):
     expected1 = """\
@@ -1,6 +1,8 @@
+import io
 import unittest
 
 from nlglib.microplanning import *
+from nlglib.features import FeatureGroup
 
 
 class TestXmlFormatting(unittest.TestCase):
@@ -210,6 +212,57 @@ class TestXmlFormatting(unittest.TestCase):
         actual = v.xml
         self.assertEqual(expected, actual)
 
+    def test_sink(self):
+        s = Clause(NP(Noun('Arthur')), VP(Verb('smiled'), features={'TENSE': 'PAST'}))
+        v = XmlVisitor()
+        s.accept(v)
+        sink = io.StringIO()
+        XmlVisitor(sink=sink).write_request(s)
+        self.assertEqual(v.to_xml(), sink.getvalue())
+        with self.assertRaises(ValueError):
+            XmlVisitor(sink=sink).xml
+
+    def test_compact(self):
+        s = Clause(NP(Noun('Arthur')), VP(Verb('smiled')))
+        v = XmlVisitor(compact=True)
+        s.accept(v)
+        self.assertNotIn('\n', v.to_xml())
+        self.assertTrue(v.to_xml().startswith(v.compact_header + '<child xsi:type="SPhraseSpec"'))
+        sink = io.StringIO()
+        XmlVisitor(sink=sink, compact=True).write_request(s)
+        self.assertEqual(v.to_xml(), sink.getvalue())
+        expected = XmlVisitor(indent='', sep='')
+        s.accept(expected)
+        self.assertEqual(expected.xml, v.xml)
+
+    def test_features_to_xml_attributes(self):
+        import nlglib.microplanning.visitors as visitors
+        w = Word('run', 'VERB', features={'ASPECT': 'perfect_progressive', 'TENSE': 'past'})
+        expected = ' PERFECT="true" PROGRESSIVE="true" TENSE="PAST" cat="VERB"'
+        self.assertEqual(expected, XmlVisitor.features_to_xml_attributes(w))
+        hits = visitors._simplenlg_attributes.cache_info().hits
+        self.assertEqual(expected, XmlVisitor.features_to_xml_attributes(w))
+        self.assertEqual(hits + 1, visitors._simplenlg_attributes.cache_info().hits)
+        # the cached string is not used for other features
+        w['TENSE'] = 'present'
+        self.assertIn('TENSE="PRESENT"', XmlVisitor.features_to_xml_attributes(w))
+        # group names are case-sensitive
+        np = NP('dog', features={'conj': 'or', 'CONJ': 'and'})
+        self.assertEqual(' CONJ="AND" cat="NOUN_PHRASE" conj="or"',
+                         XmlVisitor.features_to_xml_attributes(np))
+        feature_map = {FeatureGroup('TENSE'): {'tense': 'other'}}
+        self.assertEqual(' ASPECT="PERFECT_PROGRESSIVE" cat="VERB" tense="other"',
+                         XmlVisitor.features_to_xml_attributes(w, feature_map))
+
+    def test_feature_map(self):
+        feature_map = {FeatureGroup('TENSE'): {'tense': 'other'}}
+        v = XmlVisitor(feature_map=feature_map)
+        c = Clause(NP('dog'), VP('run', features={'TENSE': 'past'}), features={'TENSE': 'past'})
+        c.accept(v)
+        self.assertIn('<child xsi:type="SPhraseSpec" cat="CLAUSE" tense="other">', v.xml)
+        self.assertIn('DISCOURSE_FUNCTION="PREDICATE" cat="VERB_PHRASE" tense="other"', v.xml)
+        self.assertNotIn('TENSE="PAST"', v.xml)
+
 
 class TestRepresentation(unittest.TestCase):
 
@@ -411,5 +464,57 @@ class TestElementVisitor(unittest.TestCase):
         self.assertEqual(expected, actual)
 
 
+class TestVisitor(unittest.TestCase):
+
+    def test_handlers(self):
+        class CountVisitor(Visitor):
+            def __init__(self):
+                self.words = 0
+
+            def word(self, node):
+                self.words += 1
+
+            def noun_phrase(self, node):
+                for x in node.elements():
+                    x.accept(self)
+
+            def element(self, node):
+                pass
+
+        v = CountVisitor()
+        NP('the', 'life').accept(v)
+        NP('the', 'life').freeze().accept(v)
+        self.assertEqual(4, v.words)
+        self.assertIs(CountVisitor.word, CountVisitor.handler(Word))
+        self.assertNotIn(Word, Visitor._handlers)
+
+    def test_static_handlers(self):
+        class StaticVisitor(Visitor):
+            @staticmethod
+            def word(node):
+                return node.word
+
+            @classmethod
+            def string(cls, node):
+                return cls.__name__
+
+        self.assertEqual('life', Word('life').accept(StaticVisitor()))
+        self.assertEqual('StaticVisitor', String('life').accept(StaticVisitor()))
+
+    def test_plain_visitor(self):
+        class PlainVisitor:
+            def __init__(self):
+                self.words = []
+
+            def word(self, node):
+                self.words.append(node.word)
+
+        v = PlainVisitor()
+        Word('life').accept(v)
+        self.assertEqual(['life'], v.words)
+        with self.assertRaises(AttributeError):
+            String('life').accept(v)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,15 @@
+import gc
 import json
+import pickle
 import unittest
+import warnings
+import weakref
 
 from copy import copy, deepcopy
 
 from nlglib.microplanning import *
 
-from nlglib.features import DISCOURSE_FUNCTION, category
+from nlglib.features import DISCOURSE_FUNCTION, NUMBER, category
 
 
 class TestElement(unittest.TestCase):
@@ -26,6 +30,20 @@ class TestElement(unittest.TestCase):
         self.assertEqual(self.e, e2)
         self.assertNotEqual(id(self.e.features), id(e2.features))
 
+    def test_deepcopy_shares_features_until_written(self):
+        e2 = deepcopy(self.e)
+        self.assertIs(self.e.features._groups, e2.features._groups)
+        e2['foo'] = 'baz'
+        self.assertEqual('bar', self.e['foo'].value)
+        self.assertEqual('baz', e2['foo'].value)
+
+    def test_eq_ignores_non_comparable_features(self):
+        e2 = deepcopy(self.e)
+        e2[DISCOURSE_FUNCTION] = DISCOURSE_FUNCTION.subject
+        self.assertEqual(self.e, e2)
+        e2['foo'] = 'baz'
+        self.assertNotEqual(self.e, e2)
+
     def test_to_json(self):
         s = self.e.to_json()
         self.assertIn('<class \'nlglib.microplanning.struct.Element\'>', s)
@@ -158,6 +176,23 @@ class TestElementList(unittest.TestCase):
         expected = expected[:2] + expected[3:]
         self.assertEqual(expected, tmp)
 
+    def test_parents(self):
+        np = NounPhrase('dog', premodifiers=['big'])
+        self.assertIs(np, np.premodifiers[0].parent)
+        np.premodifiers.extend(['black', 'hairy'])
+        np.premodifiers[1:2] = ['brown']
+        self.assertTrue(all(x.parent is np for x in np.premodifiers))
+        self.assertEqual('big brown hairy dog', str(np))
+        # slicing doesn't change the parents of the items
+        self.assertIsInstance(np.premodifiers[:1], ElementList)
+        self.assertIs(np, np.premodifiers[0].parent)
+
+    def test_features(self):
+        el = ElementList(['big'], features={'foo': 'bar'})
+        el.append('black')
+        self.assertEqual('bar', el[1]['foo'].value)
+        self.assertIsNone(ElementList()._features)
+
 
 class TestVar(unittest.TestCase):
     def setUp(self):
@@ -209,6 +244,24 @@ class TestVar(unittest.TestCase):
         p2.set_value('drum')
         self.assertEqual(p1, p2)
 
+    def test_value_changes(self):
+        v1 = Var('x', 'dog')
+        c = Clause(NounPhrase(v1, 'the'), VerbPhrase('bark'))
+        h = hash(c)
+        v1.value.value = 'cat'
+        v1.value['NUMBER'] = 'plural'
+        self.assertNotEqual(h, hash(c))
+        v2 = Var('x', String('cat', features={'NUMBER': 'plural'}))
+        self.assertEqual(v2, v1)
+        self.assertEqual(Clause(NounPhrase(v2, 'the'), VerbPhrase('bark')), c)
+
+    def test_unhashable_value(self):
+        self.assertEqual(Var('x', {'a': 1}), Var('x', {'a': 1}))
+        self.assertNotEqual(Var('x', {'a': 1}), Var('x', {'a': 2}))
+        self.assertEqual(hash(Var('x', [1, 2])), hash(Var('x', [1, 2])))
+        self.assertEqual(Var('x', [1, 2]).freeze(), Var('x', [1, 2]).freeze())
+        self.assertEqual(hash(Element(id=['x'])), hash(Element(id=['x'])))
+
     def test_repr(self):
         """ Test debug printing. """
         expected = "Var('obj1', Word('obj1', 'NOUN'))"
@@ -401,6 +454,17 @@ class TestCoordination(unittest.TestCase):
         expected = [String('apple'), String('banana'), String('and'), String('pear')]
         self.assertEqual(expected, list(p.elements()))
 
+    def test_elements_deep(self):
+        """Test iterating through coordinations nested deeper than the recursion limit. """
+        c = Coordination(Var('x'), 'y')
+        for _ in range(3000):
+            c = Coordination(c, 'y', conj='')
+        self.assertEqual([Var('x')], c.arguments())
+        actual = list(c.elements(recursive=True, itself='last'))
+        self.assertEqual(3001 + 3003, len(actual))
+        self.assertIs(c, actual[-1])
+        self.assertIs(c, next(c.elements(recursive=True, itself='first')))
+
 
 class TestPhrase(unittest.TestCase):
     def setUp(self):
@@ -937,6 +1001,14 @@ xsi:schemaLocation="http://simplenlg.googlecode.com/svn/trunk/res/xml ">
         expected = [String('Alas!'), String('Roman'), String('is slow!')]
         actual = list(c.elements(recursive=True))
         self.assertEqual(expected, actual)
+        self.assertEqual(actual, list(walk(c)))
+
+        expected = [c, String('Alas!'), c.subject, c.subject.specifier, String('Roman'),
+                    c.predicate, String('is slow!')]
+        self.assertEqual(expected, list(c.elements(recursive=True, itself='first')))
+        expected = [String('Alas!'), c.subject.specifier, String('Roman'), c.subject,
+                    String('is slow!'), c.predicate, c]
+        self.assertEqual(expected, list(c.elements(recursive=True, itself='last')))
 
     def test_replace(self):
         """ Test replacing elements. """
@@ -953,14 +1025,441 @@ xsi:schemaLocation="http://simplenlg.googlecode.com/svn/trunk/res/xml ">
         ph2 = Var('arg_place')
         p2 = Phrase()
         p2.head = ph2
-        p.vp = p2
+        p.predicate = p2
 
         p.replace(Var('arg_place'), Word('Aberdeen', 'NOUN'))
         self.assertEqual(False, Var('arg_place') in list(p.elements()))
 
+    def test_eq_after_mutation(self):
+        c1 = Clause(NounPhrase('dog', 'the'), VerbPhrase('chase', NounPhrase('cat', 'a')))
+        c2 = deepcopy(c1)
+        self.assertEqual(c1, c2)
+        c2.predicate.complements[0].head['NUMBER'] = 'plural'
+        self.assertNotEqual(c1, c2)
+        c1.predicate.complements[0].head['NUMBER'] = 'plural'
+        self.assertEqual(c1, c2)
+        c1.front_modifiers.append('today')
+        self.assertEqual(c1, c2)
+
+    def test_clone(self):
+        c = Clause(NounPhrase('dog', 'the'), VerbPhrase('chase', NounPhrase('cat', 'a')),
+                   features={'TENSE': 'past'}, front_modifiers=['today'])
+        c.parent = Element()
+        c2 = c.clone()
+        self.assertEqual(c, c2)
+        self.assertEqual(repr(c), repr(c2))
+        self.assertIsNone(c2.parent)
+        self.assertIs(c2, c2.subject.parent)
+        self.assertIs(c2, c2.front_modifiers[0].parent)
+        self.assertIs(c2.predicate, c2.predicate.complements[0].parent)
+        c2.predicate.complements[0].head['NUMBER'] = 'plural'
+        c2.front_modifiers.append('now')
+        self.assertNotEqual(c, c2)
+        self.assertEqual(1, len(c.front_modifiers))
+        self.assertNotIn('NUMBER', c.predicate.complements[0].head)
+
+    def test_clone_deep_tree(self):
+        np = NounPhrase('x')
+        for _ in range(5000):
+            parent = NounPhrase('x')
+            parent.postmodifiers.append(np)
+            np = parent
+        cp = np.clone()
+        for _ in range(5000):
+            self.assertIs(cp, cp.postmodifiers[0].parent)
+            cp = cp.postmodifiers[0]
+        self.assertEqual('x', cp.head.value)
+
+    def test_eq_shared_constituent(self):
+        np = NounPhrase('dog', 'the')
+        c1 = Clause(np, VerbPhrase('bark'))
+        c2 = Clause(np, VerbPhrase('bark'))
+        # `np` is a constituent of both clauses but its parent is `c2`
+        self.assertIs(c2, np.parent)
+        expected = Clause(NounPhrase('dog', 'the'), VerbPhrase('bark'))
+        self.assertEqual(expected, c1)
+        np.head['NUMBER'] = 'plural'
+        expected.subject.head['NUMBER'] = 'plural'
+        self.assertEqual(expected, c1)
+        self.assertEqual(expected, c2)
+
+    def test_slots(self):
+        c = Clause('Roman', 'is slow!')
+        self.assertFalse(hasattr(c, '__dict__'))
+        with self.assertRaises(AttributeError):
+            c.vp = VerbPhrase('is')
+
+    def test_pickle(self):
+        c = Clause(NounPhrase('dog', 'the'), VerbPhrase('bark'), features={'TENSE': 'past'})
+        c2 = pickle.loads(pickle.dumps(c))
+        self.assertEqual(c, c2)
+        self.assertIs(c2, c2.subject.parent)
+
+    def test_json_keeps_parents(self):
+        c = Clause(NounPhrase('dog', 'the'), VerbPhrase('bark'))
+        self.assertEqual(c, Clause.from_json(c.to_json()))
+        self.assertIs(c, c.subject.parent)
+
+    def test_hash(self):
+        def make():
+            return Clause(NounPhrase('dog', 'the'), VerbPhrase('chase', NounPhrase('cat', 'a')))
+        c = make()
+        self.assertEqual(hash(make()), hash(c))
+        h = hash(c)
+        c.front_modifiers.append('today')
+        self.assertEqual(h, hash(c))
+        c.subject.head['NUMBER'] = 'plural'
+        self.assertNotEqual(h, hash(c))
+        c.subject.head.features.discard('NUMBER')
+        self.assertEqual(h, hash(c))
+        c.replace(String('cat'), String('mouse'))
+        self.assertNotEqual(hash(make()), hash(c))
+        c.replace(String('mouse'), String('cat'))
+        self.assertEqual(hash(make()), hash(c))
+        c.predicate.complements.append(Word('today', 'ADVERB'))
+        self.assertNotEqual(hash(make()), hash(c))
+        c.predicate.complements.pop()
+        self.assertEqual(hash(make()), hash(c))
+        c.subject = 'Roman'
+        self.assertEqual(hash(Clause('Roman', make().predicate)), hash(c))
+
+    def test_arguments_cache(self):
+        c = Clause(Var('who'), VerbPhrase('chase', NounPhrase(Var('what'), 'a')))
+        self.assertEqual([Var('who'), Var('what')], c.arguments())
+        c.predicate.complements.append(Var('where'))
+        self.assertEqual([Var('who'), Var('what'), Var('where')], c.arguments())
+        self.assertTrue(c.replace_argument('what', NounPhrase(Var('kind'), 'cat')))
+        self.assertEqual([Var('who'), Var('kind'), Var('where')], c.arguments())
+        c.replace_arguments(who='Roman', kind='big', where='home')
+        self.assertEqual([], c.arguments())
+        expected = Clause('Roman', VerbPhrase('chase', NounPhrase(NounPhrase('big', 'cat'), 'a'), 'home'))
+        self.assertEqual(expected, c)
+        self.assertFalse(c.replace_argument('who', 'Boris'))
+
+    def test_freeze(self):
+        c = Clause(NounPhrase('dog', 'the'), VerbPhrase('chase', NounPhrase('cat', 'a')))
+        expected = c.clone()
+        self.assertIs(c, c.freeze())
+        self.assertTrue(c.frozen and c.predicate.complements[0].frozen)
+        self.assertEqual(expected, c)
+        with self.assertRaises(AttributeError):
+            c.subject = 'Roman'
+        with self.assertRaises(AttributeError):
+            c.predicate.complements.append('today')
+        with self.assertRaises(AttributeError):
+            c.subject.head['NUMBER'] = 'plural'
+        self.assertEqual(expected, c)
+        thawed = c.clone()
+        self.assertFalse(thawed.frozen or thawed.subject.head.frozen)
+        thawed.subject = 'Roman'
+        self.assertIs(thawed, thawed.subject.parent)
+
+    def test_replaced(self):
+        c = Clause(Var('who'), VerbPhrase('chase', NounPhrase(Var('what'), 'a')))
+        c.freeze()
+        rv = c.replaced(Var('what'), 'cat')
+        self.assertEqual(Clause(Var('who'), VerbPhrase('chase', NounPhrase('cat', 'a'))), rv)
+        self.assertTrue(rv.frozen)
+        self.assertIs(c.subject, rv.subject)
+        self.assertIs(c.predicate.head, rv.predicate.head)
+        self.assertIsNot(c.predicate, rv.predicate)
+        self.assertEqual(Var('what'), c.predicate.complements[0].head)
+        rv = rv.replaced(Var('who'), 'Roman')
+        expected = Clause('Roman', VerbPhrase('chase', NounPhrase('cat', 'a')))
+        self.assertEqual(expected, rv)
+        self.assertEqual(expected, c.clone().replaced(Var('what'), 'cat').replaced(Var('who'), 'Roman'))
+        self.assertIs(c, c.replaced(Var('nobody'), 'Roman'))
+
+    def test_locate(self):
+        c = Clause(NounPhrase('dog', 'the'),
+                   VerbPhrase('chase', NounPhrase('dog', 'the'), NounPhrase('dog', 'the')))
+        c.front_modifiers.append('yesterday')
+        second = c.predicate.complements[1]
+        path = c.locate(second)
+        self.assertEqual((('predicate', None), ('complements', 1)), path)
+        self.assertIs(second, c.element_at(path))
+        self.assertEqual((), c.locate(c))
+        self.assertIsNone(c.locate(NounPhrase('dog', 'the')))
+        self.assertTrue(c.replace_at(path, NounPhrase('cat', 'a')))
+        self.assertEqual('yesterday the dog chase the dog a cat', str(c))
+        self.assertTrue(c.replace_at(c.locate(c.front_modifiers[0]), 'today'))
+        self.assertEqual('today the dog chase the dog a cat', str(c))
+        self.assertFalse(c.replace_at((), 'today'))
+        # frozen trees have no parents and are searched
+        f = c.clone().freeze()
+        self.assertEqual(path, f.locate(f.predicate.complements[1]))
+        cc = Coordination('cat', 'dog')
+        self.assertTrue(cc.replace_at(cc.locate(cc.conj), 'or'))
+        self.assertEqual('cat or dog', str(cc))
+
+    def test_pickle_frozen(self):
+        c = Clause(NounPhrase('dog', 'the'), VerbPhrase('bark')).freeze()
+        c2 = pickle.loads(pickle.dumps(c))
+        self.assertEqual(c, c2)
+        self.assertTrue(c2.frozen)
+        self.assertEqual(c, Clause.from_json(c.to_json()))
+
+
+class TestTreeStore(unittest.TestCase):
+
+    def setUp(self):
+        subject = NounPhrase('dog', 'the', features={'NUMBER': 'plural'})
+        subject.premodifiers.append(Word('big', 'ADJECTIVE'))
+        self.clause = Clause(subject, VerbPhrase('chase', NounPhrase(Var('x', 'cat'), 'a')),
+                             features={'NEGATED': 'true', 'foo': 'bar'})
+        self.coordination = Coordination('apples', 'pears', conj='or', id='fruit')
+        self.store = TreeStore([self.clause, self.coordination])
+
+    def test_columns(self):
+        store = self.store
+        self.assertEqual(2, len(store.roots))
+        self.assertEqual(len(store), len(store.parents))
+        for i in range(len(store)):
+            for c in store.children(i):
+                self.assertEqual(i, store.parents[c])
+        # 'the' is stored once
+        self.assertEqual(1, store.values.count('the'))
+
+    def test_element(self):
+        clause, coordination = list(self.store.elements())
+        self.assertEqual(self.clause, clause)
+        self.assertEqual(repr(self.clause), repr(clause))
+        self.assertEqual('bar', clause['foo'].value)
+        self.assertIs(clause, clause.subject.parent)
+        self.assertIs(clause.subject, clause.subject.premodifiers[0].parent)
+        self.assertEqual(self.coordination, coordination)
+        self.assertEqual('fruit', coordination.id)
+        self.assertEqual('or', str(coordination.conj))
+
+    def test_unhashable_values(self):
+        store = TreeStore()
+        v1, v2 = Var('x', [1, 2]), Var('y', {'a': 1})
+        e = Element(id=['z'])
+        for x in (v1, v2, e):
+            self.assertEqual(x, store.element(store.add(x)))
+
+    def test_visit(self):
+        view = self.store.node(self.store.roots[0])
+        self.assertEqual(category.CLAUSE, view.category)
+        self.assertEqual('dog', view.subject.head.value)
+        visitor = XmlVisitor()
+        view.accept(visitor)
+        self.assertEqual(self.clause.to_xml(), str(visitor.xml))
+        self.assertEqual(str(self.clause), str(view))
+        with self.assertRaises(AttributeError):
+            view.object_of_desire
+
+
+class TestParentModes(unittest.TestCase):
+
+    def setUp(self):
+        self.mode = get_parent_mode()
+
+    def tearDown(self):
+        set_parent_mode(self.mode)
+
+    def make(self):
+        return Clause(NounPhrase('dog', 'the'), VerbPhrase('chase', NounPhrase(Var('what'), 'a')))
+
+    def test_mode(self):
+        self.assertEqual(self.mode, set_parent_mode('weak'))
+        self.assertEqual('weak', get_parent_mode())
+        with self.assertRaises(ValueError):
+            set_parent_mode('soft')
+
+    def test_weak(self):
+        set_parent_mode('weak')
+        c = self.make()
+        self.assertIs(c, c.subject.parent)
+        self.assertIs(c.predicate, c.predicate.complements[0].parent)
+        self.assertTrue(c.replace_argument('what', 'cat'))
+        self.assertEqual('the dog chase a cat', str(c))
+        ref = weakref.ref(c)
+        subject = c.subject
+        gc.disable()
+        try:
+            del c
+            self.assertIsNone(ref())
+        finally:
+            gc.enable()
+        self.assertIsNone(subject.parent)
+
+    def test_none(self):
+        set_parent_mode('none')
+        c = self.make()
+        self.assertIsNone(c.subject.parent)
+        h = hash(c)
+        c.subject.head['NUMBER'] = 'plural'
+        self.assertNotEqual(h, hash(c))
+        self.assertEqual([Var('what')], c.arguments())
+        self.assertTrue(c.replace_argument('what', 'cat'))
+        self.assertEqual([], c.arguments())
+        self.assertEqual(('predicate', None), c.locate(c.predicate)[0])
+        c.freeze()
+        with self.assertRaises(AttributeError):
+            c.subject.head['NUMBER'] = 'singular'
+
+    def test_switch_modes(self):
+        set_parent_mode('weak')
+        c = self.make()
+        set_parent_mode('strong')
+        self.assertIs(c, c.subject.parent)
+        self.assertIs(c.subject, c.subject.features._owner)
+        set_parent_mode('none')
+        c2 = self.make()
+        # changes are not cached in the 'none' mode
+        h = hash(c)
+        c.subject.head['NUMBER'] = 'plural'
+        self.assertNotEqual(h, hash(c))
+        set_parent_mode('strong')
+        self.assertIsNone(c2.subject.parent)
+        reset_parents(c2)
+        self.assertIs(c2, c2.subject.parent)
+        self.assertIs(c2.predicate, c2.predicate.complements[0].parent)
+        h = hash(c2)
+        c2.subject.head['NUMBER'] = 'plural'
+        self.assertNotEqual(h, hash(c2))
+        self.assertEqual(c, c2)
+        self.assertEqual(hash(c), hash(c2))
+
+    def test_parent_index(self):
+        set_parent_mode('none')
+        c = self.make()
+        index = ParentIndex(c)
+        np = c.predicate.complements[0]
+        self.assertIs(c.predicate, index.parent(np))
+        self.assertEqual([c.predicate, c], list(index.ancestors(np)))
+        self.assertIsNone(index.parent(c))
+
+
+class TestSubtreeTable(unittest.TestCase):
+
+    def test_intern(self):
+        table = SubtreeTable()
+        c1 = table.intern(Clause(NP('the', 'man'), VP('run', NP('the', 'dog'))))
+        c2 = table.intern(Clause(NP('the', 'man'), VP('walk', NP('the', 'dog'))))
+        self.assertTrue(c1.frozen)
+        self.assertIs(c1.subject, c2.subject)
+        self.assertIs(c1.predicate.complements[0], c2.predicate.complements[0])
+        self.assertIs(c1.subject.specifier, c1.predicate.complements[0].specifier)
+        self.assertIsNot(c1.predicate, c2.predicate)
+        self.assertEqual(Clause(NP('the', 'man'), VP('walk', NP('the', 'dog'))), c2)
+        self.assertIs(c1, table.intern(Clause(NP('the', 'man'), VP('run', NP('the', 'dog')))))
+        # mutable trees are not changed
+        c3 = Clause(NP('the', 'man'), VP('sing'))
+        self.assertIs(c1.subject, table.intern(c3).subject)
+        self.assertFalse(c3.frozen)
+        self.assertIs(c3, c3.subject.parent)
+        # frozen trees are interned as they are
+        c4 = Clause(NP('a', 'woman'), VP('sing')).freeze()
+        self.assertIs(c4, table.intern(c4))
+
+    def test_features(self):
+        table = SubtreeTable()
+        np1 = table.intern(NP('dog'))
+        np2 = NP('dog')
+        np2[DISCOURSE_FUNCTION] = DISCOURSE_FUNCTION.object
+        self.assertIsNot(np1, table.intern(np2))
+        self.assertIsNot(np1, table.intern(NP('dog', features={'NUMBER': 'plural'})))
+
+    def test_vars(self):
+        table = SubtreeTable()
+        c1 = table.intern(Clause(Var('x'), VP('run')))
+        c2 = table.intern(Clause(Var('x'), VP('run')))
+        self.assertIsNot(c1, c2)
+        self.assertIs(c1.predicate, c2.predicate)
+
+    def test_document(self):
+        from nlglib.macroplanning import Document
+        table = SubtreeTable()
+        doc = table.intern(Document('Title', Document('Part', Clause('dog', 'run')), Clause('dog', 'run')))
+        self.assertIs(doc.sections[0].sections[0], doc.sections[1])
+
+
+class TestRewriter(unittest.TestCase):
+
+    def test_rules(self):
+        rewriter = Rewriter([
+            ((category.WORD, lambda x: x.word == 'dog'), lambda x: Word('cat', x.pos)),
+            (NounPhrase, lambda x: x.features.add(NUMBER.plural)),
+        ])
+        c = Clause(NP('the', 'dog'), VP('chase', NP('a', 'dog'), PP('in', NP('the', 'park'))))
+        self.assertIs(c, rewriter(c))
+        self.assertEqual('the cat chase a cat in the park', str(c))
+        self.assertTrue(all(NUMBER.plural in x for x in c.elements(recursive=True)
+                            if isinstance(x, NounPhrase)))
+        self.assertIs(c.subject, c.subject.head.parent)
+        self.assertEqual(DISCOURSE_FUNCTION.head, c.subject.head[DISCOURSE_FUNCTION])
+
+    def test_order(self):
+        seen = []
+        rewriter = Rewriter()
+
+        @rewriter.rule(Element)
+        def visit(x):
+            seen.append(x.category)
+
+        @rewriter.rule(category.NOUN_PHRASE)
+        def replace(x):
+            return String('it')
+
+        @rewriter.rule(NounPhrase)
+        def not_called(x):
+            self.fail('the noun phrase was replaced')
+
+        c = rewriter(Clause(NP('the', 'dog'), VP('run')))
+        self.assertEqual('it run', str(c))
+        self.assertEqual([category.WORD, category.WORD, category.NOUN_PHRASE,
+                          category.WORD, category.VERB_PHRASE, category.CLAUSE], seen)
+
+    def test_remove(self):
+        rewriter = Rewriter([(String, lambda x: REMOVE)])
+        c = Clause('dog', VP('run', 'fast', 'slowly', NP('the', 'park')))
+        rewriter(c)
+        self.assertEqual([NP('the', 'park')], list(c.predicate.complements))
+        self.assertEqual(Element(), rewriter(String('x')))
+
+    def test_frozen(self):
+        rewriter = Rewriter([(Word, lambda x: Word(x.word.upper(), x.pos))])
+        np = NP('the', 'dog').freeze()
+        np2 = rewriter(np)
+        self.assertEqual('the dog', str(np))
+        self.assertEqual('THE DOG', str(np2))
+        self.assertFalse(np2.frozen)
+
+    def test_deep_tree(self):
+        np = NounPhrase('x')
+        for _ in range(5000):
+            parent = NounPhrase('x')
+            parent.postmodifiers.append(np)
+            np = parent
+        Rewriter([(String, lambda x: String('y'))])(np)
+        self.assertEqual({'y'}, {x.value for x in np.elements(recursive=True) if isinstance(x, String)})
+
 
 class TestUtils(unittest.TestCase):
 
+    def test_replace_element_order(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            # the subject precedes the object
+            c = Clause(NP('dog'), VP('chase', NP('dog')))
+            self.assertTrue(replace_element(c, NP('dog'), NP('cat')))
+            self.assertEqual('cat chase dog', str(c))
+            # element lists are searched from the end
+            np = NP('house', postmodifiers=[PP('in', NP('park')), PP('in', NP('park'))])
+            pp = np.postmodifiers[0]
+            self.assertTrue(replace_element(np, PP('in', NP('park'))))
+            self.assertEqual(1, len(np.postmodifiers))
+            self.assertIs(pp, np.postmodifiers[0])
+            # postmodifiers precede complements
+            vp = VP('put', 'it', postmodifiers=['it'])
+            self.assertTrue(replace_element(vp, String('it'), String('that')))
+            self.assertEqual('put it that', str(vp))
+            # front modifiers are not searched
+            c = Clause(NP('dog'), VP('bark'), front_modifiers=['today'])
+            self.assertFalse(replace_element(c, String('today'), String('now')))
+
     def test_raise_to_element(self):
         """ Test converting strings to Strings. """
         expected = [String('late'), Word('evening', 'NOUN')]
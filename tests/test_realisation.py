@@ -47,6 +47,13 @@ class TestRealiser(unittest.TestCase):
         expected = Document(None, 'Hello.', 'You say hello.')
         self.assertEqual(expected, text)
 
+    def test_tree_store(self):
+        realiser = Realiser()
+        negated = Clause('dog', 'bark', features={'NEGATED': 'true'})
+        store = TreeStore([get_clause(), negated])
+        self.assertEqual(['You say hello.', 'Dog does not bark.'], [realiser(x) for x in store])
+        self.assertEqual(realiser(negated), realiser(store.node(store.roots[1])))
+
 
 class TestStringRealisation(unittest.TestCase):
 